@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from backend.auth_models import TokenData
 from backend.db import UserDB, get_db
+from chinochau.metrics import timed
 
 # Security configuration
 SECRET_KEY = "your-secret-key-change-this-in-production"  # Change this in production!
@@ -19,11 +20,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
+@timed("bcrypt")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+@timed("bcrypt")
 def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
@@ -86,3 +89,14 @@ async def get_current_active_user(
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_current_admin_user(
+    current_user: UserDB = Depends(get_current_active_user),
+) -> UserDB:
+    """Get current active user, requiring admin rights."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return current_user
@@ -10,18 +10,23 @@ from backend.auth import (
     authenticate_user,
     create_access_token,
     get_current_active_user,
+    get_current_admin_user,
     get_password_hash,
     get_user_by_email,
 )
 from backend.auth_models import Token, UserCreate, UserResponse
-from backend.db import UserDB, get_db
+from backend.core.tracing import TracedRoute
+from backend.db import RESERVED_EMAILS, UserDB, get_db
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TracedRoute)
 
 
+# Sync handlers: bcrypt and the queries run in the threadpool, not on the loop
 @router.post("/register", response_model=UserResponse)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
+    if user.email.lower() in RESERVED_EMAILS:
+        raise HTTPException(status_code=400, detail="Email is reserved")
     # Check if user already exists
     db_user = get_user_by_email(db, email=user.email)
     if db_user:
@@ -40,7 +45,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(
+def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
 ):
     """Login user and return access token."""
@@ -65,12 +70,12 @@ async def read_users_me(current_user: UserDB = Depends(get_current_active_user))
 
 
 @router.get("/users", response_model=List[UserResponse])
-async def read_users(
+def read_users(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: UserDB = Depends(get_current_active_user),
+    current_user: UserDB = Depends(get_current_admin_user),
 ):
-    """Get all users (admin functionality - you might want to restrict this)."""
+    """Get all users (admins only)."""
     users = db.query(UserDB).offset(skip).limit(limit).all()
     return [UserResponse.from_orm(user) for user in users]
@@ -0,0 +1,181 @@
+"""
+Response compression with Accept-Encoding negotiation.
+
+Supports gzip and, when the optional `brotli` package is installed, br.
+Bodies are compressed message by message as the app sends them, so a
+streaming response is compressed and sent in chunks rather than buffered
+whole. Only the first bytes are held back: until `minimum_size` bytes
+have arrived, a response that ends early is sent as is, because small
+responses do not benefit from compression.
+"""
+import zlib
+from typing import Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Already compressed, or must reach the client unbuffered
+SKIP_CONTENT_TYPES = ("image/", "audio/", "video/", "application/zip")
+SKIP_CONTENT_TYPES += ("application/gzip", "text/event-stream")
+
+
+def available_encodings() -> Sequence[str]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header: str, encodings: Sequence[str]) -> Optional[str]:
+    """Best of `encodings` (in server preference order) the client accepts."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        output = self._compressor.process(data)
+        if final:
+            return output + self._compressor.finish()
+        return output + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Compress response bodies with the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Sequence[str] = ("br", "gzip"),
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.encodings = [e for e in encodings if e in available_encodings()]
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = choose_encoding(headers.get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+
+class _CompressionResponder:
+    """Per-response state: holds back the start until the size is known."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.pending = b""
+        self.compressor = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough or message["type"] not in (
+            "http.response.start",
+            "http.response.body",
+        ):
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or content_type.startswith(SKIP_CONTENT_TYPES)
+            ):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            self.pending += body
+            if more_body and len(self.pending) < self.middleware.minimum_size:
+                return
+            if len(self.pending) < self.middleware.minimum_size:
+                # The whole response is small: send it unchanged
+                await self._send(self.start)
+                await self._send({**message, "body": self.pending})
+                return
+
+            self.compressor = self.middleware.compressor(self.encoding)
+            body, self.pending = self.pending, b""
+            compressed = self.compressor.compress(body, final=not more_body)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start)
+            await self._send({**message, "body": compressed})
+            return
+
+        compressed = self.compressor.compress(body, final=not more_body)
+        await self._send({**message, "body": compressed})
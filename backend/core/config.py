@@ -1,15 +1,58 @@
 """
 Core configuration and settings for the Chinochau API.
 """
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.core.compression import CompressionMiddleware
+from backend.core.loop_monitor import loop_monitor
+from backend.core.metrics import MetricsMiddleware
+from backend.core.popularity import keep_popular_words_warm
+from backend.core.profiling import ProfilingMiddleware
+from backend.core.queries import QueryStatsMiddleware
+from backend.core.tracing import TracingMiddleware
+from backend.core.warmup import warm_up
+
+# Response compression, in order of preference; set to "" to disable.
+# br is used only when the optional brotli package is installed.
+COMPRESSION_ENCODINGS = [
+    encoding.strip()
+    for encoding in os.environ.get("CHINOCHAU_COMPRESSION", "br,gzip").split(",")
+    if encoding.strip()
+]
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("CHINOCHAU_COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("CHINOCHAU_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("CHINOCHAU_BROTLI_QUALITY", "4"))
+# Sampling interval for requests profiled with the X-Profile header
+PROFILE_INTERVAL_MS = float(os.environ.get("CHINOCHAU_PROFILE_INTERVAL_MS", "1"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up, then keep popular words warm, in the background while serving."""
+    loop_monitor.start()
+    tasks = [
+        asyncio.create_task(run_in_threadpool(warm_up)),
+        asyncio.create_task(keep_popular_words_warm()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    loop_monitor.stop()
+
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(
         title="Chinochau API",
         description="Chinese flashcard learning API with authentication",
+        lifespan=lifespan,
     )
 
     # Add CORS middleware
@@ -21,4 +64,24 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=COMPRESSION_ENCODINGS,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY,
+    )
+
+    app.add_middleware(QueryStatsMiddleware)
+
+    # Sampled or slow requests only are kept, but every one is traced
+    app.add_middleware(TracingMiddleware)
+
+    # Around everything but profiling, so request times include compression
+    # and tracing; profiling only runs when an admin asks for it
+    app.add_middleware(MetricsMiddleware)
+
+    # Admin-only and off unless asked for; profiles include every layer
+    app.add_middleware(ProfilingMiddleware, interval=PROFILE_INTERVAL_MS / 1000)
+
     return app
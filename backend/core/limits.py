@@ -0,0 +1,173 @@
+"""
+Admission control for example generation.
+
+Each DeepSeek call holds a worker thread for seconds, so one user asking for
+examples in a loop can take every slot and slow everybody else down. A
+request is admitted only if the user's token bucket has a token for each
+example asked for and fewer than the global cap are generating; otherwise it
+fails at once with a 429 and a Retry-After header instead of queueing. Tokens
+taken for a generation that fails are given back.
+
+Buckets and the cap are kept in each worker process's memory, so with N
+workers a user can get up to N times the allowance and N times the cap can
+run on the host. Size CHINOCHAU_EXAMPLES_CONCURRENCY per worker.
+"""
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict
+
+from fastapi import HTTPException, status
+
+from chinochau.metrics import Counter, Gauge
+
+# Examples a user can ask for at once, and how fast the allowance refills
+EXAMPLES_BURST = float(os.getenv("CHINOCHAU_EXAMPLES_BURST", "30"))
+EXAMPLES_PER_MINUTE = float(os.getenv("CHINOCHAU_EXAMPLES_PER_MINUTE", "10"))
+# Generations running at the same time, for all users
+EXAMPLES_CONCURRENCY = int(os.getenv("CHINOCHAU_EXAMPLES_CONCURRENCY", "8"))
+# Beyond this many users, buckets that have refilled are forgotten
+MAX_BUCKETS = 10000
+
+admissions = Counter(
+    "chinochau_example_admissions_total",
+    "Example generation requests by outcome: admitted, rate_limited or busy,"
+    " in this worker.",
+    ["outcome"],
+)
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class ExampleLimiter:
+    """Per-user token buckets and a cap on running generations, per process."""
+
+    def __init__(
+        self,
+        burst: float = EXAMPLES_BURST,
+        per_minute: float = EXAMPLES_PER_MINUTE,
+        concurrency: int = EXAMPLES_CONCURRENCY,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.concurrency = concurrency
+        self.clock = clock
+        self.in_flight = 0
+        # Recent generation time, the wait suggested when all slots are busy
+        self.average_seconds = 1.0
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _refill(self, bucket: TokenBucket, now: float) -> None:
+        elapsed = now - bucket.updated
+        bucket.tokens = min(self.burst, bucket.tokens + elapsed * self.rate)
+        bucket.updated = now
+
+    def take(self, user_id: int, cost: float) -> float:
+        """Take `cost` tokens; 0 if taken, else seconds until there are enough."""
+        now = self.clock()
+        # Larger requests than the burst wait for a full bucket
+        cost = min(cost, self.burst)
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._forget_full_buckets(now)
+            bucket = self._buckets[user_id] = TokenBucket(self.burst, now)
+        else:
+            self._refill(bucket, now)
+        if bucket.tokens >= cost:
+            bucket.tokens -= cost
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (cost - bucket.tokens) / self.rate
+
+    def refund(self, user_id: int, cost: float) -> None:
+        """Give back tokens taken for a generation that failed."""
+        bucket = self._buckets.get(user_id)
+        if bucket is not None:
+            bucket.tokens = min(self.burst, bucket.tokens + min(cost, self.burst))
+
+    def _forget_full_buckets(self, now: float) -> None:
+        for user_id, bucket in list(self._buckets.items()):
+            self._refill(bucket, now)
+            if bucket.tokens >= self.burst:
+                del self._buckets[user_id]
+
+    @staticmethod
+    def _reject(outcome: str, detail: str, retry_after: float) -> HTTPException:
+        admissions.inc(outcome)
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    @asynccontextmanager
+    async def admit(self, user_id: int, count: int):
+        """Run a generation of `count` examples, or raise a 429."""
+        with self._lock:
+            if self.in_flight >= self.concurrency:
+                raise self._reject(
+                    "busy",
+                    "Too many examples are being generated, please retry shortly",
+                    self.average_seconds,
+                )
+            wait = self.take(user_id, count)
+            if wait:
+                raise self._reject(
+                    "rate_limited",
+                    f"Example limit reached, {self.rate * 60:g} per minute",
+                    min(wait, 24 * 3600),
+                )
+            self.in_flight += 1
+        admissions.inc("admitted")
+        start = self.clock()
+        try:
+            yield
+        except BaseException:
+            # Failed generations don't use up the user's allowance
+            with self._lock:
+                self.refund(user_id, count)
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                elapsed = self.clock() - start
+                self.average_seconds = 0.8 * self.average_seconds + 0.2 * elapsed
+
+    def reset(self) -> None:
+        """Forget all buckets (running generations are kept)."""
+        with self._lock:
+            self._buckets.clear()
+
+
+example_limiter = ExampleLimiter()
+
+Gauge(
+    "chinochau_example_generations",
+    "Example generations running in this worker, and the most allowed at once.",
+    ["state"],
+    lambda: {
+        ("running",): example_limiter.in_flight,
+        ("limit",): example_limiter.concurrency,
+    },
+)
+Gauge(
+    "chinochau_example_rate_limit",
+    "Examples per user and worker: burst size and refill per minute.",
+    ["setting"],
+    lambda: {
+        ("burst",): example_limiter.burst,
+        ("per_minute",): example_limiter.rate * 60,
+    },
+)
@@ -0,0 +1,152 @@
+"""
+Event loop stall detection.
+
+A blocking call in an `async def` handler (a synchronous query, bcrypt)
+holds up every other request on the worker until it returns, and shows up
+only as latency everywhere. The monitor schedules a heartbeat on the loop;
+a watchdog thread notices when it is more than CHINOCHAU_LOOP_STALL_MS late
+and captures the loop thread's stack at that moment, which is the code
+blocking it. When the loop catches up the stall's duration is recorded by
+the code location, logged with the stack and kept for GET /admin/stalls.
+
+The cost is one callback on the loop and one wake-up of the watchdog per
+interval, so it stays on in production.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from chinochau.metrics import Histogram
+
+# Lateness of the heartbeat reported as a stall; 0 disables the monitor
+LOOP_STALL_MS = float(os.getenv("CHINOCHAU_LOOP_STALL_MS", "100"))
+# Stalls kept for GET /admin/stalls
+MAX_STALLS = 50
+# Source files whose frames name a stall's location
+APP_PACKAGES = (os.sep + "backend" + os.sep, os.sep + "chinochau" + os.sep)
+
+stall_duration = Histogram(
+    "chinochau_event_loop_stall_seconds",
+    "Time the event loop was blocked, by the code that blocked it.",
+    ["location"],
+)
+
+
+@dataclass
+class Stall:
+    started_at: datetime
+    seconds: float
+    location: str
+    # Innermost call last, as in a traceback
+    stack: List[str]
+
+
+def stall_location(stack: traceback.StackSummary) -> str:
+    """The innermost backend or chinochau function in `stack`."""
+    for frame in reversed(stack):
+        for package in APP_PACKAGES:
+            index = frame.filename.rfind(package)
+            if index >= 0:
+                return f"{frame.filename[index + 1:]}:{frame.name}"
+    return "unknown"
+
+
+class LoopMonitor:
+    """Detect and report event loop stalls longer than `threshold` seconds."""
+
+    def __init__(self, threshold: float = LOOP_STALL_MS / 1000):
+        self.threshold = threshold
+        self.stalls: deque = deque(maxlen=MAX_STALLS)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._interval = 0.0
+        self._expected = 0.0
+        # Stack captured by the watchdog during the stall in progress
+        self._captured: Optional[traceback.StackSummary] = None
+        self._handle: Optional[asyncio.Handle] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._watchdog is not None
+
+    def start(self) -> None:
+        """Watch the running event loop; call from a coroutine on it."""
+        if self.threshold <= 0 or self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        # Checked often enough to catch a stall while it is still going on
+        self._interval = min(self.threshold / 2, 0.05)
+        self._stopped.clear()
+        self._schedule()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stopped.set()
+        self._watchdog.join()
+        self._watchdog = None
+        if self._handle is not None:
+            self._handle.cancel()
+
+    def _schedule(self) -> None:
+        with self._lock:
+            self._expected = time.monotonic() + self._interval
+        self._handle = self._loop.call_later(self._interval, self._beat)
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            late = now - self._expected
+            captured, self._captured = self._captured, None
+        if late > self.threshold:
+            self._record(late, captured)
+        if not self._stopped.is_set():
+            self._schedule()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._interval):
+            with self._lock:
+                if self._captured is not None:
+                    continue
+                if time.monotonic() - self._expected <= self.threshold:
+                    continue
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    self._captured = traceback.extract_stack(frame)
+
+    def _record(self, seconds: float, stack: Optional[traceback.StackSummary]) -> None:
+        stack = stack or traceback.StackSummary()
+        location = stall_location(stack)
+        stall = Stall(
+            started_at=datetime.utcnow() - timedelta(seconds=seconds),
+            seconds=seconds,
+            location=location,
+            stack=[line.rstrip() for line in stack.format()],
+        )
+        self.stalls.append(stall)
+        stall_duration.observe(seconds, location)
+        print(
+            f"⚠️ Event loop blocked for {seconds * 1000:.0f} ms in {location}\n"
+            + "\n".join(stall.stack[-10:])
+        )
+
+    def clear(self) -> None:
+        self.stalls.clear()
+
+
+loop_monitor = LoopMonitor()
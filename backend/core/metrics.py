@@ -0,0 +1,171 @@
+"""
+Request, SQL and resource metrics for the /metrics endpoint.
+
+Requests are labelled with the route template ("/flashcards/{chinese}"),
+not the raw path, so the number of series stays bounded. Pool, threadpool
+and cache figures are read when metrics are scraped.
+"""
+import time
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.db import decode_definitions, engine
+from chinochau import definitions, pinyin_cache
+from chinochau.metrics import (
+    CollectedCounter,
+    Counter,
+    Gauge,
+    Histogram,
+    record_dependency,
+)
+
+request_count = Counter(
+    "chinochau_http_requests_total",
+    "HTTP requests served.",
+    ["method", "route", "status"],
+)
+request_duration = Histogram(
+    "chinochau_http_request_duration_seconds",
+    "Time to serve HTTP requests, including streaming the body.",
+    ["method", "route", "status"],
+)
+
+
+def route_label(scope: Scope) -> str:
+    """Route template of a handled request."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (/openapi.json, /docs) have fixed paths
+    if "endpoint" in scope:
+        return scope["path"]
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Count and time every HTTP request by route and status."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            labels = (scope["method"], route_label(scope), status)
+            request_count.inc(*labels)
+            request_duration.observe(time.perf_counter() - start, *labels)
+
+
+# SQL statements, timed as an external dependency
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_start
+    record_dependency(elapsed, "sql", "ok")
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(exception_context):
+    start = getattr(exception_context.execution_context, "_metrics_start", None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        record_dependency(elapsed, "sql", "error")
+
+
+def _pool_connections():
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        ("checked_out",): pool.checkedout(),
+        ("checked_in",): pool.checkedin(),
+        ("overflow",): max(pool.overflow(), 0),
+        ("size",): pool.size(),
+    }
+
+
+def _threadpool():
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        # Not scraped from within the event loop
+        return {}
+    return {
+        ("busy",): limiter.borrowed_tokens,
+        ("max",): limiter.total_tokens,
+        ("waiting",): limiter.statistics().tasks_waiting,
+    }
+
+
+def _caches():
+    return {
+        "pinyin": pinyin_cache.cache_info(),
+        "definitions_decode": decode_definitions.cache_info(),
+    }
+
+
+def _cache_ratios():
+    ratios = {}
+    for name, info in _caches().items():
+        lookups = info.hits + info.misses
+        ratios[(name,)] = info.hits / lookups if lookups else 0.0
+    return ratios
+
+
+Gauge(
+    "chinochau_db_pool_connections",
+    "Database connections by pool state.",
+    ["state"],
+    _pool_connections,
+)
+Gauge(
+    "chinochau_threadpool_threads",
+    "Worker threads running sync endpoints: busy, max and tasks waiting.",
+    ["state"],
+    _threadpool,
+)
+CollectedCounter(
+    "chinochau_cache_hits_total",
+    "Cache hits.",
+    ["cache"],
+    lambda: {(name,): info.hits for name, info in _caches().items()},
+)
+CollectedCounter(
+    "chinochau_cache_misses_total",
+    "Cache misses.",
+    ["cache"],
+    lambda: {(name,): info.misses for name, info in _caches().items()},
+)
+Gauge(
+    "chinochau_cache_hit_ratio",
+    "Share of cache lookups that were hits.",
+    ["cache"],
+    _cache_ratios,
+)
+CollectedCounter(
+    "chinochau_definition_lookups_total",
+    "Definitions resolved by each stage: dictionary, composed or google.",
+    ["stage"],
+    lambda: {(stage,): count for stage, count in definitions.counters.items()},
+)
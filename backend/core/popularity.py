@@ -0,0 +1,161 @@
+"""
+Word popularity and pre-warming of upstream results.
+
+Many users add the same common words. Every CHINOCHAU_POPULARITY_INTERVAL
+seconds one aggregate query counts the cards and users per word into the
+small word_stats table, then the most popular words are resolved ahead of
+time: their definitions (so words outside the dictionary are translated
+into the shared cache) and a few shared examples for the very top ones. A
+new user adding a common word then finds everything cached.
+
+The job runs at low priority: one upstream call at a time with a pause in
+between, examples only while no user is generating any, and translations
+stop for the run when Google's circuit is open. With several workers the
+first to find the stats out of date refreshes them; the others skip.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, bindparam, func, select, text
+from sqlalchemy.orm import Session
+
+from backend.core import warmup
+from backend.core.limits import example_limiter
+from backend.db import SessionLocal, WordStatsDB
+from backend.services.example_service import add_to_pool, pooled_examples
+from chinochau.deepseek import get_examples_deepseek
+from chinochau.definitions import get_definitions
+from chinochau.metrics import Counter
+from chinochau.translate_google import TranslationUnavailable
+
+# Seconds between refreshes; 0 disables the job
+POPULARITY_INTERVAL = float(os.getenv("CHINOCHAU_POPULARITY_INTERVAL", "3600"))
+# Words kept in word_stats, all of them pre-resolved
+POPULAR_WORDS = int(os.getenv("CHINOCHAU_POPULAR_WORDS", "500"))
+# Top words given shared examples, and how many each
+POPULAR_EXAMPLE_WORDS = int(os.getenv("CHINOCHAU_POPULAR_EXAMPLE_WORDS", "50"))
+POPULAR_EXAMPLES = int(os.getenv("CHINOCHAU_POPULAR_EXAMPLES", "4"))
+# Seconds between words, so the job never competes with requests for long
+PREWARM_PAUSE = 0.05
+
+prewarmed = Counter(
+    "chinochau_prewarmed_total",
+    "Popular words pre-resolved, by kind: definitions, examples or skipped.",
+    ["kind"],
+)
+
+REFRESH_STATS = text(
+    f"""
+INSERT INTO {WordStatsDB.__tablename__} (chinese, cards, users, updated_at)
+SELECT chinese_key, COUNT(*), COUNT(DISTINCT user_id), :now
+FROM flashcards
+WHERE chinese_key IS NOT NULL
+GROUP BY chinese_key
+ORDER BY COUNT(DISTINCT user_id) DESC, COUNT(*) DESC
+LIMIT :limit
+"""
+).bindparams(bindparam("now", type_=DateTime))
+
+
+def refresh_word_stats(db: Session, limit: int = POPULAR_WORDS) -> int:
+    """Recount the most popular words; returns how many were kept."""
+    db.query(WordStatsDB).delete()
+    db.execute(REFRESH_STATS, {"now": datetime.utcnow(), "limit": limit})
+    db.commit()
+    return db.query(WordStatsDB).count()
+
+
+def popular_words(db: Session, limit: int = POPULAR_WORDS) -> List[WordStatsDB]:
+    """The words most users have cards for, most popular first."""
+    return (
+        db.query(WordStatsDB)
+        .order_by(WordStatsDB.users.desc(), WordStatsDB.cards.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def stats_age(db: Session) -> Optional[timedelta]:
+    """Time since the stats were last refreshed, None if never."""
+    updated_at = db.execute(select(func.max(WordStatsDB.updated_at))).scalar()
+    if updated_at is None:
+        return None
+    return datetime.utcnow() - updated_at
+
+
+async def prewarm_examples(word: str) -> bool:
+    """Top up the word's shared examples; False if users are generating."""
+    missing = POPULAR_EXAMPLES - len(pooled_examples(word))
+    if missing <= 0:
+        return True
+    if example_limiter.in_flight:
+        prewarmed.inc("skipped")
+        return False
+    examples = await run_in_threadpool(get_examples_deepseek, word, missing)
+    add_to_pool(word, examples)
+    prewarmed.inc("examples")
+    return True
+
+
+async def prewarm(words: List[str], example_words: int = POPULAR_EXAMPLE_WORDS):
+    """Resolve definitions of `words`, and examples of the first ones."""
+    translate = True
+    for word in words:
+        if translate:
+            try:
+                await get_definitions(word)
+                prewarmed.inc("definitions")
+            except TranslationUnavailable:
+                # Try again next run rather than hammer a failing service
+                translate = False
+        await asyncio.sleep(PREWARM_PAUSE)
+    for word in words[:example_words]:
+        try:
+            if not await prewarm_examples(word):
+                break
+        except Exception as e:
+            print(f"⚠️ Pre-generating examples for {word} failed: {e}")
+            break
+        await asyncio.sleep(PREWARM_PAUSE)
+
+
+def _refresh_if_stale(interval: float) -> Optional[List[str]]:
+    with SessionLocal() as db:
+        age = stats_age(db)
+        # Another worker may have just refreshed them
+        if age is not None and age.total_seconds() < interval * 0.9:
+            return None
+        refresh_word_stats(db)
+        return [stats.chinese for stats in popular_words(db)]
+
+
+async def run_once(interval: float = POPULARITY_INTERVAL) -> Optional[List[str]]:
+    """Refresh the stats if they are out of date and pre-warm their words."""
+    words = await run_in_threadpool(_refresh_if_stale, interval)
+    if words is None:
+        return None
+    started = time.perf_counter()
+    await prewarm(words)
+    print(
+        f"🔥 Pre-warmed {len(words)} popular words"
+        f" in {time.perf_counter() - started:.1f}s"
+    )
+    return words
+
+
+async def keep_popular_words_warm(interval: float = POPULARITY_INTERVAL) -> None:
+    """Run the job every `interval` seconds, once warm-up is over."""
+    if interval <= 0:
+        return
+    while not warmup.status.ready:
+        await asyncio.sleep(1)
+    while True:
+        try:
+            await run_once(interval)
+        except Exception as e:
+            print(f"❌ Popularity job failed: {e}")
+        await asyncio.sleep(interval)
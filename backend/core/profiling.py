@@ -0,0 +1,350 @@
+"""
+Opt-in profiling of single requests, for admins.
+
+A request sent with an admin bearer token and an ``X-Profile: 1`` header is
+run under a sampling profiler. The response carries an ``X-Profile-Id``
+header, and the report can be read from ``GET /admin/profiles/{id}``.
+Reports are kept in the memory of the worker that served the request, and
+the id starts with its pid: with several workers, repeat the GET until it
+lands on that worker.
+
+The report has the call tree of the sampled stacks and the time split into
+sql, external, validation, serialization, compression and app code. Time in
+which no thread was running the request is "waiting": awaiting the network
+or a free worker thread. Exact SQL and dependency timings are added next to
+the sampled estimates.
+
+Threads say themselves when they work on the request: the middleware notes
+its own frame on the event loop, and every span the request opens (see
+chinochau.tracing) notes the outermost frame of request code on the thread
+opening it. A thread's samples count while one of its noted frames is on
+its stack, so worker threads are seen from the first span of each call
+handed to them, and not at all when tracing is disabled. Profiled requests
+are always sampled by the tracer, so their spans are recorded and kept.
+
+Requests without the header only pay for the header lookup.
+"""
+import inspect
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwt
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.auth import ALGORITHM, SECRET_KEY, get_user_by_email
+from backend.db import SessionLocal
+from chinochau import tracing
+from chinochau.metrics import dependency_timings
+
+PROFILE_HEADER = b"x-profile"
+# Reports kept in memory, most recent last
+PROFILES_KEPT = 20
+
+# Top-level modules whose frames are counted as a category. Checked from the
+# innermost frame outwards, so a query issued while validating counts as sql.
+CATEGORY_MODULES = {
+    "sqlalchemy": "sql",
+    "sqlite3": "sql",
+    "httpx": "external",
+    "httpcore": "external",
+    "openai": "external",
+    "googletrans": "external",
+    "socket": "external",
+    "ssl": "external",
+    "zlib": "compression",
+    "brotli": "compression",
+    "backend.core.compression": "compression",
+}
+SERIALIZATION_FUNCTIONS = {
+    "serialize",
+    "serialize_json",
+    "jsonable_encoder",
+    "model_dump",
+    "model_dump_json",
+    "dump_python",
+    "dump_json",
+    "render",
+}
+VALIDATION_FUNCTIONS = {
+    "validate",
+    "validate_python",
+    "validate_json",
+    "model_validate",
+    "request_body_to_args",
+    "request_params_to_args",
+}
+CATEGORIES = ("sql", "external", "validation", "serialization", "compression")
+CATEGORIES += ("app", "waiting")
+# Top-level modules of the loops threads run work from, not request code
+RUN_LOOP_MODULES = {"threading", "concurrent", "anyio", "asyncio", "starlette"}
+
+_current_profile: ContextVar[Optional["Profile"]] = ContextVar(
+    "current_profile", default=None
+)
+
+profiles: Deque[dict] = deque(maxlen=PROFILES_KEPT)
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    """A stored profile report by id."""
+    for report in profiles:
+        if report["id"] == profile_id:
+            return report
+    return None
+
+
+def profile_worker(profile_id: str) -> Optional[int]:
+    """Pid of the worker keeping a profile, from its id."""
+    pid, _, _ = profile_id.partition("-")
+    return int(pid) if pid.isdigit() else None
+
+
+def token_email(authorization: str) -> Optional[str]:
+    """The user an Authorization header's valid bearer token names."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+def is_admin(email: str) -> bool:
+    """Whether `email` is an active admin, looked up like get_current_admin_user."""
+    with SessionLocal() as db:
+        user = get_user_by_email(db, email)
+        return bool(user and user.is_active and user.is_admin)
+
+
+def _module(frame) -> str:
+    return frame.f_globals.get("__name__", "")
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({_module(frame)}:{code.co_firstlineno})"
+
+
+def categorize(stack: list) -> str:
+    """Category of a sampled stack, listed from the outermost frame."""
+    for frame in reversed(stack):
+        module = _module(frame)
+        category = CATEGORY_MODULES.get(module) or CATEGORY_MODULES.get(
+            module.partition(".")[0]
+        )
+        if category:
+            return category
+        name = frame.f_code.co_name
+        if name in SERIALIZATION_FUNCTIONS:
+            return "serialization"
+        if name in VALIDATION_FUNCTIONS or module.startswith("pydantic"):
+            return "validation"
+    return "app"
+
+
+class Profile:
+    """Samples the threads working on one request."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.ticks = 0
+        self.counts = dict.fromkeys(CATEGORIES, 0)
+        self.tree: Dict = {}
+        self.dependencies: Dict[str, float] = {}
+        # Frames running the request, by thread; only written by that thread
+        self.entries: Dict[int, Set] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        # Finished frames keep their locals alive
+        self.entries.clear()
+
+    def check_in(self, frame) -> None:
+        """Note, from the calling thread, that `frame` runs request code."""
+        self.entries.setdefault(threading.get_ident(), set()).add(frame)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = [
+                stack
+                for ident, entries in list(self.entries.items())
+                if ident in frames
+                and (stack := self._request_stack(frames[ident], entries))
+            ]
+            self.ticks += 1
+            if not stacks:
+                self.counts["waiting"] += 1
+            for stack in stacks:
+                self.counts[categorize(stack)] += 1
+                node = self.tree
+                for frame in stack:
+                    child = node.setdefault(_label(frame), [0, {}])
+                    child[0] += 1
+                    node = child[1]
+
+    @staticmethod
+    def _request_stack(frame, entries: Set) -> list:
+        """Frames run for the request, or [] if the thread is doing other work.
+
+        The event loop runs other requests between the steps of this one, and
+        a worker thread moves on to other calls: only the frames from the
+        outermost noted one inwards belong to the request.
+        """
+        stack = []
+        entry = None
+        while frame is not None:
+            stack.append(frame)
+            if frame in entries:
+                entry = len(stack)
+            frame = frame.f_back
+        if entry is None:
+            return []
+        stack = stack[:entry]
+        stack.reverse()
+        # The middleware itself is not part of the call tree
+        if stack[0].f_code is _MIDDLEWARE_CODE:
+            stack = stack[1:]
+        return stack
+
+    def _tree(self, label: str, node: list) -> dict:
+        samples, children = node
+        return {
+            "function": label,
+            "samples": samples,
+            "children": sorted(
+                (self._tree(name, child) for name, child in children.items()),
+                key=lambda child: -child["samples"],
+            ),
+        }
+
+    def report(self, scope: Scope, status: int, started: datetime, duration: float):
+        # Scale samples to the request's duration: the sampler runs less often
+        # than asked for while request threads hold the GIL
+        per_tick = duration / self.ticks if self.ticks else 0.0
+        stacks = sum(self.counts.values()) - self.counts["waiting"]
+        return {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "started_at": started,
+            "duration_ms": duration * 1000,
+            "samples": self.ticks,
+            "breakdown_ms": {
+                category: count * per_tick * 1000
+                for category, count in self.counts.items()
+            },
+            "dependencies_ms": {
+                name: seconds * 1000 for name, seconds in self.dependencies.items()
+            },
+            "call_tree": self._tree("request", [stacks, self.tree]),
+        }
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it with an admin token."""
+
+    def __init__(self, app: ASGIApp, interval: float = 0.001):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not await self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        profile = Profile(self.interval)
+        status = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        profile_token = _current_profile.set(profile)
+        timings_token = dependency_timings.set(profile.dependencies)
+        sampling_token = tracing.force_sampling.set(True)
+        profile.check_in(inspect.currentframe())
+        started = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration = time.perf_counter() - start
+            profile.stop()
+            tracing.force_sampling.reset(sampling_token)
+            dependency_timings.reset(timings_token)
+            _current_profile.reset(profile_token)
+            report = profile.report(scope, status, started, duration)
+            profiles.append({"id": profile_id, **report})
+
+    @staticmethod
+    async def _requested(scope: Scope) -> bool:
+        authorization = ""
+        requested = False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                requested = value not in (b"", b"0")
+            elif name == b"authorization":
+                authorization = value.decode("latin-1")
+        if not requested:
+            return False
+        # Without an admin token the header is ignored
+        email = token_email(authorization)
+        if email is None:
+            return False
+        return await run_in_threadpool(is_admin, email)
+
+
+def _check_in() -> None:
+    """Note the thread opening a span as working on the profiled request.
+
+    Unless a frame noted before is on the stack, the outermost frame below
+    the thread's run loop is noted, so the whole call handed to a worker
+    thread is sampled.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    entries = profile.entries.get(threading.get_ident(), ())
+    stack = []
+    # The span's caller, not this listener
+    frame = inspect.currentframe().f_back
+    while frame is not None:
+        if frame in entries:
+            return
+        stack.append(frame)
+        frame = frame.f_back
+    for frame in reversed(stack):
+        if _module(frame).partition(".")[0] not in RUN_LOOP_MODULES:
+            profile.check_in(frame)
+            return
+
+
+tracing.span_listeners.append(_check_in)
+
+_MIDDLEWARE_CODE = ProfilingMiddleware.__call__.__code__
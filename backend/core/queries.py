@@ -0,0 +1,201 @@
+"""
+SQL query statistics per request: counts, slow queries and repeated queries.
+
+Every statement run through SQLAlchemy is counted and timed against the
+request that ran it, including queries from sync handlers in the threadpool,
+which inherit the request's context. Statements slower than
+CHINOCHAU_SLOW_QUERY_MS are logged with their EXPLAIN QUERY PLAN and kept for
+GET /admin/slow-queries. A request running the same statement shape more
+than CHINOCHAU_QUERY_REPEAT_LIMIT times is logged as a likely N+1: a query
+per row where one query for all rows would do.
+
+Tests assert query budgets with `count_queries()`, which sees every
+statement run while it is open, whichever thread runs it.
+"""
+import os
+import re
+import threading
+import time
+from collections import Counter as Tally
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.core.metrics import route_label
+from chinochau.metrics import Counter, Histogram
+
+# Statements slower than this are logged with their plan; 0 disables it
+SLOW_QUERY_MS = float(os.getenv("CHINOCHAU_SLOW_QUERY_MS", "100"))
+# Runs of one statement shape in a request above which it is reported
+QUERY_REPEAT_LIMIT = int(os.getenv("CHINOCHAU_QUERY_REPEAT_LIMIT", "10"))
+# Slow queries kept for GET /admin/slow-queries
+MAX_SLOW_QUERIES = 50
+# Statements worth explaining; DDL and transaction control are not
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+queries_per_request = Histogram(
+    "chinochau_sql_queries_per_request",
+    "SQL statements run to serve a request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+slow_queries_total = Counter(
+    "chinochau_sql_slow_queries_total",
+    "SQL statements slower than the slow query threshold.",
+)
+repeated_queries_total = Counter(
+    "chinochau_sql_repeated_queries_total",
+    "Requests running one statement shape more often than the repeat limit.",
+    ["route"],
+)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and multi-row VALUES vary in length with the data
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace, literals and IN lists normalized."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+@dataclass
+class SlowQuery:
+    started_at: datetime
+    seconds: float
+    statement: str
+    parameters: str
+    # EXPLAIN QUERY PLAN details, empty when the statement can't be explained
+    plan: List[str]
+
+
+@dataclass
+class QueryStats:
+    """Statements run by one request, or while `count_queries()` is open."""
+
+    count: int = 0
+    seconds: float = 0.0
+    # Runs per statement shape
+    shapes: Tally = field(default_factory=Tally)
+    slow: List[SlowQuery] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, shape: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.shapes[shape] += 1
+
+    def repeated(self, limit: int) -> List[str]:
+        """Statement shapes run more than `limit` times."""
+        return [shape for shape, runs in self.shapes.items() if runs > limit]
+
+
+request_queries: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_queries", default=None
+)
+# Open count_queries() blocks
+_collectors: List[QueryStats] = []
+
+slow_queries: Deque[SlowQuery] = deque(maxlen=MAX_SLOW_QUERIES)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Collect every statement run until the block exits, in any thread."""
+    stats = QueryStats()
+    _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors.remove(stats)
+
+
+def explain(conn, cursor, statement: str, parameters) -> List[str]:
+    """SQLite's plan for a statement, run on the connection that ran it."""
+    if conn.dialect.name != "sqlite":
+        return []
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return []
+    try:
+        rows = cursor.connection.execute(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).fetchall()
+    except Exception:
+        return []
+    return [row[-1] for row in rows]
+
+
+def _record_slow(conn, cursor, statement, parameters, seconds, stats) -> None:
+    query = SlowQuery(
+        started_at=datetime.utcnow(),
+        seconds=seconds,
+        statement=statement,
+        parameters=repr(parameters)[:200],
+        plan=explain(conn, cursor, statement, parameters),
+    )
+    slow_queries.append(query)
+    slow_queries_total.inc()
+    for collected in stats:
+        collected.slow.append(query)
+    print(
+        f"🐢 Slow query ({seconds * 1000:.0f} ms): {statement_shape(statement)}\n"
+        + "\n".join(f"  {detail}" for detail in query.plan)
+    )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    context._queries_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._queries_start
+    stats = list(_collectors)
+    current = request_queries.get()
+    if current is not None:
+        stats.append(current)
+    if stats:
+        shape = statement_shape(statement)
+        for collected in stats:
+            collected.add(shape, elapsed)
+    if SLOW_QUERY_MS > 0 and elapsed * 1000 > SLOW_QUERY_MS and not executemany:
+        _record_slow(conn, cursor, statement, parameters, elapsed, stats)
+
+
+class QueryStatsMiddleware:
+    """Count each request's SQL statements and report repeated ones."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = request_queries.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_queries.reset(token)
+            route = route_label(scope)
+            queries_per_request.observe(stats.count, route)
+            for shape in stats.repeated(QUERY_REPEAT_LIMIT):
+                repeated_queries_total.inc(route)
+                print(
+                    f"⚠️ {scope['method']} {route} ran the same query"
+                    f" {stats.shapes[shape]} times: {shape}"
+                )
@@ -0,0 +1,78 @@
+"""
+Request tracing: a trace per request, with spans for handlers and SQL.
+
+The spans themselves, their sampling and the exporters are in
+chinochau.tracing; service methods, upstream calls and bcrypt open theirs
+with `traced` and `metrics.track`. This module starts the trace for each
+HTTP request, names it after the route template, and adds a span around
+each route handler (dependencies, validation and serialization included)
+and one per SQL statement. Kept traces are listed at GET /admin/traces.
+"""
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.metrics import route_label
+from backend.core.queries import statement_shape
+from chinochau import tracing
+
+
+class TracedRoute(APIRoute):
+    """Route class recording a span around the handler."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        name = self.endpoint.__name__
+
+        async def traced_handler(request):
+            with tracing.span(name, "handler"):
+                return await handler(request)
+
+        return traced_handler
+
+
+class TracingMiddleware:
+    """Trace every HTTP request, named by method and route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing.enabled():
+            await self.app(scope, receive, send)
+            return
+
+        with tracing.trace(f"{scope['method']} {scope['path']}") as trace:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    trace.root.attributes["status"] = message["status"]
+                await send(message)
+
+            trace.root.attributes["path"] = scope["path"]
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # Known once the request has been routed
+                trace.root.name = f"{scope['method']} {route_label(scope)}"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    context._trace_span = tracing.start_span(
+        "sql", "sql", statement=statement_shape(statement)
+    )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    if context._trace_span is not None:
+        context._trace_span.finish()
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.finish(exception_context.original_exception)
@@ -0,0 +1,152 @@
+"""
+Warm-up after start, and readiness.
+
+Dictionaries, pinyin tables, the bcrypt backend and database connections are
+all set up on first use, so without warming the first requests after a
+deploy pay for them. The app's lifespan (in backend.core.config) runs the
+steps below in a worker thread as soon as the server starts; /ready answers
+503 until they have all succeeded, so the load balancer only sends traffic
+to warm instances.
+"""
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+
+from backend.auth import get_password_hash, verify_password
+from backend.db import (
+    DefinitionDB,
+    FlashcardDB,
+    SessionLocal,
+    decode_definitions,
+    engine,
+)
+from chinochau import pinyin_cache
+from chinochau.dictionary import get_dictionary
+from chinochau.metrics import Gauge
+
+# Most common words among all flashcards to load into the caches
+WARMUP_POPULAR_CARDS = int(os.getenv("CHINOCHAU_WARMUP_POPULAR_CARDS", "1000"))
+# Database connections opened ahead of traffic (at most the pool size)
+WARMUP_CONNECTIONS = int(os.getenv("CHINOCHAU_WARMUP_CONNECTIONS", "5"))
+# Text segmented, converted and looked up once, touching every index
+SAMPLE_TEXT = "我们每天晚上在圖書館学习中文"
+
+
+@dataclass
+class WarmupStatus:
+    ready: bool = False
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    seconds: Optional[float] = None
+    # Seconds taken by each step, in order
+    steps: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+status = WarmupStatus()
+
+
+def warm_dictionary() -> None:
+    dictionary = get_dictionary()
+    list(dictionary.segment(SAMPLE_TEXT))
+    dictionary.lookup("学习")
+    dictionary.script_converter.convert(SAMPLE_TEXT, "simplified")
+    dictionary.reverse_index.search("study", 1)
+    dictionary.prefix_index.suggest("xue", 1)
+
+
+def warm_pinyin() -> None:
+    for format in pinyin_cache.FORMATS:
+        pinyin_cache.get_table(format)
+    pinyin_cache.get(SAMPLE_TEXT)
+
+
+def warm_bcrypt() -> None:
+    # passlib picks and checks its bcrypt backend on first use
+    verify_password("warm-up", get_password_hash("warm-up"))
+
+
+def warm_connections() -> None:
+    size = getattr(engine.pool, "size", lambda: 1)()
+    connections = []
+    try:
+        for _ in range(min(WARMUP_CONNECTIONS, size)):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        # Returned to the pool, open
+        for connection in connections:
+            connection.close()
+
+
+def warm_popular_cards() -> None:
+    """Decode definitions and pinyin of the words most users have cards for."""
+    if WARMUP_POPULAR_CARDS <= 0:
+        return
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(FlashcardDB.chinese, DefinitionDB.content)
+            .join(FlashcardDB.definition)
+            .group_by(FlashcardDB.chinese, DefinitionDB.content)
+            .order_by(func.count().desc())
+            .limit(WARMUP_POPULAR_CARDS)
+        )
+        for chinese, content in rows:
+            decode_definitions(content)
+            pinyin_cache.get(chinese)
+
+
+STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("dictionary", warm_dictionary),
+    ("pinyin", warm_pinyin),
+    ("bcrypt", warm_bcrypt),
+    ("connections", warm_connections),
+    ("popular_cards", warm_popular_cards),
+]
+
+
+def warm_up() -> WarmupStatus:
+    """Run every step, recording its time; ready only if all succeed."""
+    status.ready = False
+    status.error = None
+    status.steps = {}
+    status.started_at = datetime.utcnow()
+    started = time.perf_counter()
+    for name, step in STEPS:
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            status.error = f"{name}: {e}"
+            print(f"❌ Warm-up failed at {name}: {e}")
+            break
+        finally:
+            status.steps[name] = time.perf_counter() - step_started
+    status.seconds = time.perf_counter() - started
+    status.finished_at = datetime.utcnow()
+    if status.error is None:
+        status.ready = True
+        print(f"🔥 Warmed up in {status.seconds:.2f}s")
+    return status
+
+
+Gauge(
+    "chinochau_warmup_seconds",
+    "Seconds taken by each warm-up step, and in total.",
+    ["step"],
+    lambda: {
+        **{(name,): seconds for name, seconds in status.steps.items()},
+        **({("total",): status.seconds} if status.seconds is not None else {}),
+    },
+)
+Gauge(
+    "chinochau_ready",
+    "1 once warm-up has completed, else 0.",
+    [],
+    lambda: {(): int(status.ready)},
+)
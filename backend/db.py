@@ -1,8 +1,13 @@
 import json
+import os
+import sqlite3
 from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from passlib.context import CryptContext
 from sqlalchemy import (
+    DDL,
     Boolean,
     Column,
     DateTime,
@@ -10,11 +15,28 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    bindparam,
     create_engine,
+    event,
+    text,
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.orm import (
+    Session,
+    attributes,
+    declarative_base,
+    relationship,
+    sessionmaker,
+)
+
+from backend.search import (
+    CREATE_SEARCH_TABLE,
+    DROP_SEARCH_TABLE,
+    SEARCH_TABLE,
+    search_document,
+)
+from chinochau.script import normalize_key
 
-DATABASE_URL = "sqlite:///./flashcards.db"
+DATABASE_URL = os.getenv("CHINOCHAU_DATABASE_URL", "sqlite:///./flashcards.db")
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -36,6 +58,9 @@ class UserDB(Base):
     full_name = Column(String, nullable=True)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Granted by ensure_admin_user_exists or CHINOCHAU_ADMIN_EMAILS, never by
+    # registering
+    is_admin = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationship to flashcards
@@ -44,12 +69,34 @@ class UserDB(Base):
     )
 
 
+# Distinct definition lists are few (one per word), so all of them fit
+DEFINITIONS_CACHE_SIZE = 50000
+
+
+@lru_cache(maxsize=DEFINITIONS_CACHE_SIZE)
+def decode_definitions(content: str) -> Tuple[str, ...]:
+    """Decode a stored definitions list once per distinct list."""
+    return tuple(json.loads(content))
+
+
+class DefinitionDB(Base):
+    """A distinct list of definitions, shared by every card that has it."""
+
+    __tablename__ = "definitions"
+    id = Column(Integer, primary_key=True, index=True)
+    content = Column(Text, unique=True, nullable=False)  # Store as JSON string
+
+
 class FlashcardDB(Base):
     __tablename__ = "flashcards"
     id = Column(Integer, primary_key=True, index=True)
     chinese = Column(String, index=True, nullable=False)
+    # Simplified form of `chinese`, used for lookups across scripts
+    chinese_key = Column(String, index=True, nullable=True)
     pinyin = Column(String, nullable=False)
-    definitions = Column(Text, nullable=False)  # Store as JSON string
+    definition_id = Column(
+        Integer, ForeignKey("definitions.id"), index=True, nullable=False
+    )
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Relationships
@@ -57,13 +104,29 @@ class FlashcardDB(Base):
     examples = relationship(
         "ExampleDB", back_populates="flashcard", cascade="all, delete-orphan"
     )
+    # Set through `definitions`; loaded in the same query as the card
+    definition = relationship("DefinitionDB", lazy="joined", viewonly=True)
+
+    @property
+    def definitions(self) -> str:
+        """The definitions as a JSON string."""
+        pending = self.__dict__.get("_pending_definitions")
+        if pending is not None:
+            return pending
+        return self.definition.content
+
+    @definitions.setter
+    def definitions(self, value: str):
+        # Resolved to a shared definitions row when the card is flushed
+        self._pending_definitions = value
+        self.definition_id = None
 
     def to_dict(self):
         return {
             "id": self.id,
             "chinese": self.chinese,
             "pinyin": self.pinyin,
-            "definitions": json.loads(self.definitions),
+            "definitions": list(decode_definitions(self.definitions)),
         }
 
 
@@ -86,18 +149,306 @@ class ExampleDB(Base):
         }
 
 
+class WordStatsDB(Base):
+    """How many flashcards and users have a word, refreshed periodically."""
+
+    __tablename__ = "word_stats"
+    chinese = Column(String, primary_key=True)
+    cards = Column(Integer, nullable=False)
+    users = Column(Integer, nullable=False, index=True)
+    updated_at = Column(DateTime, nullable=False)
+
+
+@event.listens_for(FlashcardDB, "before_insert")
+@event.listens_for(FlashcardDB, "before_update")
+def _set_chinese_key(mapper, connection, target):
+    target.chinese_key = normalize_key(target.chinese)
+
+
+def definitions_id(connection, content: str) -> int:
+    """Id of the definitions row with this content, created if needed."""
+    connection.execute(
+        text("INSERT OR IGNORE INTO definitions (content) VALUES (:content)"),
+        {"content": content},
+    )
+    return connection.execute(
+        text("SELECT id FROM definitions WHERE content = :content"),
+        {"content": content},
+    ).scalar_one()
+
+
+@event.listens_for(FlashcardDB, "before_insert")
+@event.listens_for(FlashcardDB, "before_update")
+def _store_definitions(mapper, connection, target):
+    content = target.__dict__.get("_pending_definitions")
+    if content is not None:
+        # The row the card used to share may now be unused
+        for replaced in attributes.get_history(target, "definition_id").deleted:
+            if replaced is not None:
+                _check_definitions(connection, replaced)
+        target.definition_id = definitions_id(connection, content)
+
+
+def _check_definitions(connection, definition_id: int) -> None:
+    connection.info.setdefault(CHECK_DEFINITIONS, set()).add(definition_id)
+
+
+# Keep the full-text search index in sync with flashcards and examples
+event.listen(Base.metadata, "after_create", DDL(CREATE_SEARCH_TABLE))
+event.listen(Base.metadata, "after_drop", DDL(DROP_SEARCH_TABLE))
+
+
+CARDS_WITH_DEFINITIONS = (
+    "FROM flashcards JOIN definitions ON definitions.id = flashcards.definition_id"
+)
+
+
+# Key in Connection.info of the flashcards whose examples changed in a flush
+REINDEX_FLASHCARDS = "reindex_flashcards"
+# connection.info key of definitions rows to delete if no card uses them
+CHECK_DEFINITIONS = "check_definitions"
+DELETE_UNUSED_DEFINITIONS = (
+    "DELETE FROM definitions WHERE {rows} AND NOT EXISTS "
+    "(SELECT 1 FROM flashcards WHERE flashcards.definition_id = definitions.id)"
+)
+
+
+def _example_texts(connection, flashcard_id):
+    return connection.execute(
+        text("SELECT example_text FROM examples WHERE flashcard_id = :id"),
+        {"id": flashcard_id},
+    ).scalars()
+
+
+def _index_flashcard(connection, flashcard_id, chinese, definitions, user_id):
+    connection.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": flashcard_id}
+    )
+    document = search_document(
+        chinese, definitions, _example_texts(connection, flashcard_id), user_id
+    )
+    connection.execute(
+        text(
+            f"INSERT INTO {SEARCH_TABLE} "
+            "(rowid, chinese, pinyin, definitions, examples, owner) "
+            "VALUES (:id, :chinese, :pinyin, :definitions, :examples, :owner)"
+        ),
+        {"id": flashcard_id, **document},
+    )
+
+
+@event.listens_for(FlashcardDB, "after_insert")
+@event.listens_for(FlashcardDB, "after_update")
+def _flashcard_saved(mapper, connection, target):
+    definitions = target.__dict__.pop("_pending_definitions", None)
+    if definitions is None:
+        definitions = connection.execute(
+            text("SELECT content FROM definitions WHERE id = :id"),
+            {"id": target.definition_id},
+        ).scalar_one()
+    else:
+        # Stored: from now on read through the relationship, loaded again
+        # for the new definition_id rather than the row it replaced
+        target.__dict__.pop("definition", None)
+    _index_flashcard(connection, target.id, target.chinese, definitions, target.user_id)
+
+
+@event.listens_for(FlashcardDB, "after_delete")
+def _flashcard_deleted(mapper, connection, target):
+    connection.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": target.id}
+    )
+    _check_definitions(connection, target.definition_id)
+
+
+@event.listens_for(ExampleDB, "after_insert")
+@event.listens_for(ExampleDB, "after_update")
+@event.listens_for(ExampleDB, "after_delete")
+def _example_changed(mapper, connection, target):
+    # Re-indexed once per flush, however many of the card's examples changed
+    connection.info.setdefault(REINDEX_FLASHCARDS, set()).add(target.flashcard_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _reindex_changed_flashcards(session, flush_context):
+    connection = session.connection()
+    for flashcard_id in sorted(connection.info.pop(REINDEX_FLASHCARDS, ())):
+        card = connection.execute(
+            text(
+                f"SELECT chinese, content, user_id {CARDS_WITH_DEFINITIONS} "
+                "WHERE flashcards.id = :id"
+            ),
+            {"id": flashcard_id},
+        ).first()
+        # The flashcard itself may have gone away in the same flush
+        if card is not None:
+            _index_flashcard(connection, flashcard_id, *card)
+    unused = connection.info.pop(CHECK_DEFINITIONS, None)
+    if unused:
+        connection.execute(
+            text(DELETE_UNUSED_DEFINITIONS.format(rows="id IN :ids")).bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": sorted(unused)},
+        )
+
+
+def delete_unused_definitions(bind=engine) -> int:
+    """Delete definitions rows no flashcard uses, e.g. after bulk deletes."""
+    with bind.begin() as connection:
+        deleted = connection.execute(
+            text(DELETE_UNUSED_DEFINITIONS.format(rows="1"))
+        ).rowcount
+    if deleted:
+        print(f"🧹 Deleted {deleted} unused definitions row(s)")
+    return deleted
+
+
+def rebuild_search_index(bind=engine):
+    """Re-index every flashcard, e.g. for a database created before search."""
+    with bind.begin() as connection:
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+        cards = connection.execute(
+            text(
+                "SELECT flashcards.id, chinese, content, user_id "
+                + CARDS_WITH_DEFINITIONS
+            )
+        ).all()
+        for card in cards:
+            _index_flashcard(connection, *card)
+    return len(cards)
+
+
+# Columns added after the first release; create_all does not alter tables
+ADDED_COLUMNS = {
+    "flashcards": {"chinese_key": "VARCHAR", "definition_id": "INTEGER"},
+    "users": {"is_admin": "BOOLEAN NOT NULL DEFAULT 0"},
+}
+
+
+def add_missing_columns(bind=engine):
+    """Add columns that older databases are missing."""
+    with bind.begin() as connection:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {
+                row[1]
+                for row in connection.execute(text(f"PRAGMA table_info({table})"))
+            }
+            for column, column_type in columns.items():
+                if column not in existing:
+                    connection.execute(
+                        text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                    )
+                    connection.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} "
+                            f"ON {table} ({column})"
+                        )
+                    )
+
+
+def backup_database(bind=engine) -> Optional[str]:
+    """Copy a SQLite database file next to itself; returns the copy's path."""
+    path = bind.url.database
+    if bind.dialect.name != "sqlite" or not path or path == ":memory:":
+        return None
+    backup_path = (
+        f"{os.path.splitext(path)[0]}_backup_{datetime.now():%Y%m%d_%H%M%S}.db"
+    )
+    source = bind.raw_connection()
+    target = sqlite3.connect(backup_path)
+    try:
+        # The backup API copies a consistent snapshot, WAL contents included
+        source.driver_connection.backup(target)
+    finally:
+        target.close()
+        source.close()
+    print(f"✅ Database backed up to {backup_path}")
+    return backup_path
+
+
+def migrate_definitions(bind=engine):
+    """Move per-card JSON definitions into the shared definitions table.
+
+    The old column is dropped, so the database is backed up first.
+    """
+    with bind.connect() as connection:
+        columns = {
+            row[1] for row in connection.execute(text("PRAGMA table_info(flashcards)"))
+        }
+    if "definitions" not in columns:
+        return
+    backup_database(bind)
+    with bind.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT OR IGNORE INTO definitions (content) "
+                "SELECT DISTINCT definitions FROM flashcards"
+            )
+        )
+        connection.execute(
+            text(
+                "UPDATE flashcards SET definition_id = (SELECT id FROM definitions "
+                "WHERE content = flashcards.definitions)"
+            )
+        )
+        connection.execute(text("ALTER TABLE flashcards DROP COLUMN definitions"))
+        cards = connection.execute(text("SELECT COUNT(*) FROM flashcards")).scalar()
+        shared = connection.execute(text("SELECT COUNT(*) FROM definitions")).scalar()
+    print(f"🔄 Moved definitions of {cards} flashcard(s) into {shared} shared row(s)")
+
+
 # Create tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
+
+
+def ensure_flashcard_keys():
+    """Fill in lookup keys for flashcards created before they existed."""
+    with engine.begin() as connection:
+        cards = connection.execute(
+            text("SELECT id, chinese FROM flashcards WHERE chinese_key IS NULL")
+        ).all()
+        for card_id, chinese in cards:
+            connection.execute(
+                text("UPDATE flashcards SET chinese_key = :key WHERE id = :id"),
+                {"key": normalize_key(chinese), "id": card_id},
+            )
+    if cards:
+        print(f"🔄 Added lookup keys to {len(cards)} flashcard(s)")
+        # The search index is normalized the same way
+        rebuild_search_index()
+
+
+def ensure_search_index():
+    """Backfill the search index when flashcards exist but are not indexed."""
+    with engine.connect() as connection:
+        indexed = connection.execute(
+            text(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        ).scalar()
+        cards = connection.execute(text("SELECT COUNT(*) FROM flashcards")).scalar()
+    if cards and not indexed:
+        print(f"🔄 Indexing {cards} flashcard(s) for search...")
+        rebuild_search_index()
+
+
+# Default admin credentials
+ADMIN_EMAIL = "admin@chinochau.local"
+ADMIN_PASSWORD = "admin123"  # Change this after first login!
+ADMIN_NAME = "Default Admin User"
+# Existing accounts given admin rights on startup
+ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv("CHINOCHAU_ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
+# Addresses nobody can register: admin rights must not follow an address
+RESERVED_EMAILS = ADMIN_EMAILS | {ADMIN_EMAIL}
 
 
 def ensure_admin_user_exists():
     """Ensure that an admin user exists in the database for initial setup."""
 
-    # Default admin credentials
-    ADMIN_EMAIL = "admin@chinochau.local"
-    ADMIN_PASSWORD = "admin123"  # Change this after first login!
-    ADMIN_NAME = "Default Admin User"
-
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
     db = SessionLocal()
@@ -115,6 +466,7 @@ def ensure_admin_user_exists():
                 full_name=ADMIN_NAME,
                 hashed_password=hashed_password,
                 is_active=True,
+                is_admin=True,
                 created_at=datetime.utcnow(),
             )
 
@@ -140,5 +492,22 @@ def ensure_admin_user_exists():
         db.close()
 
 
+def grant_admins(emails=ADMIN_EMAILS, bind=engine) -> int:
+    """Give admin rights to the existing accounts with these addresses."""
+    if not emails:
+        return 0
+    with bind.begin() as connection:
+        granted = connection.execute(
+            text(
+                "UPDATE users SET is_admin = 1 "
+                "WHERE lower(email) IN :emails AND NOT is_admin"
+            ).bindparams(bindparam("emails", expanding=True)),
+            {"emails": sorted(emails)},
+        ).rowcount
+    if granted:
+        print(f"🔑 Granted admin rights to {granted} user(s)")
+    return granted
+
+
 # Note: Call ensure_admin_user_exists() manually when needed
 # or from the main application startup
@@ -1,19 +1,36 @@
 """
 Main FastAPI application entry point.
 """
-from backend.auth_routes import router as auth_router
 from backend.core.config import create_app
-from backend.db import ensure_admin_user_exists
-from backend.routes import examples, flashcards, translation
+from backend.db import (
+    delete_unused_definitions,
+    ensure_admin_user_exists,
+    ensure_flashcard_keys,
+    ensure_search_index,
+    grant_admins,
+    migrate_definitions,
+)
+from backend.routes import include_routers
+from chinochau.dictionary import install_reload_signal_handler
 
 # Create the FastAPI app
 app = create_app()
 
 # Include all routers
-app.include_router(auth_router)
-app.include_router(flashcards.router)
-app.include_router(examples.router)
-app.include_router(translation.router)
+include_routers(app)
+
+# Reload the dictionary data on SIGHUP
+install_reload_signal_handler()
+
+# Move definitions of databases from earlier versions into the shared table,
+# after a backup, and drop rows left unused by bulk deletes
+migrate_definitions()
+delete_unused_definitions()
 
 # Ensure admin user exists on startup
 ensure_admin_user_exists()
+grant_admins()
+
+# Index flashcards created before search or script normalization existed
+ensure_flashcard_keys()
+ensure_search_index()
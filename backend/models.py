@@ -1,7 +1,16 @@
 from datetime import datetime
-from typing import List
+from enum import Enum
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class Script(str, Enum):
+    """How to render Chinese text: as entered, simplified or traditional."""
+
+    original = "original"
+    simplified = "simplified"
+    traditional = "traditional"
 
 
 class FlashcardModel(BaseModel):
@@ -11,6 +20,13 @@ class FlashcardModel(BaseModel):
     definitions: List[str]
 
 
+class FlashcardSearchResponse(BaseModel):
+    results: List[FlashcardModel]
+    total: int
+    limit: int
+    offset: int
+
+
 class FlashcardCreateModel(BaseModel):
     chinese: str
 
@@ -19,6 +35,51 @@ class TextInput(BaseModel):
     chinese: str
 
 
+class PinyinBatchRequest(BaseModel):
+    texts: List[str] = Field(
+        ..., description="Chinese texts to convert", max_length=1000
+    )
+
+
+class PinyinBatchResponse(BaseModel):
+    pinyin: List[str]
+
+
+class SegmentToken(BaseModel):
+    text: str
+    pinyin: str
+    definitions: List[str]
+    is_word: bool = Field(..., description="Whether the token is a dictionary word")
+
+
+class SegmentResponse(BaseModel):
+    tokens: List[SegmentToken]
+
+
+class DictionaryEntryModel(BaseModel):
+    simplified: str
+    traditional: str
+    pinyin: str
+    definitions: List[str]
+    score: float
+
+
+class DictionarySearchResponse(BaseModel):
+    results: List[DictionaryEntryModel]
+    total: int
+
+
+class SuggestionModel(BaseModel):
+    simplified: str
+    traditional: str
+    pinyin: str
+    definitions: List[str]
+
+
+class SuggestResponse(BaseModel):
+    suggestions: List[SuggestionModel]
+
+
 class ExampleCreateRequest(BaseModel):
     flashcard_id: int = Field(
         ..., description="ID of the flashcard to generate examples for"
@@ -46,3 +107,107 @@ class FlashcardWithExamplesModel(BaseModel):
     definitions: List[str]
     examples: List[str] = []
     examples_count: int
+
+
+class DictionaryStatusModel(BaseModel):
+    path: Optional[str] = None
+    entries: int
+    build_seconds: Optional[float] = None
+    loaded_at: Optional[datetime] = None
+    reloading: bool
+    error: Optional[str] = None
+
+
+class DictionaryReloadRequest(BaseModel):
+    path: Optional[str] = Field(
+        None,
+        description="CEDICT file to load, within CHINOCHAU_CEDICT_DIR; "
+        "defaults to the current one",
+    )
+
+
+class WordStatsModel(BaseModel):
+    chinese: str
+    cards: int
+    users: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StallModel(BaseModel):
+    started_at: datetime
+    seconds: float
+    location: str
+    stack: List[str]
+
+
+class SlowQueryModel(BaseModel):
+    started_at: datetime
+    seconds: float
+    statement: str
+    parameters: str
+    plan: List[str]
+
+
+class SpanModel(BaseModel):
+    id: int
+    parent_id: Optional[int]
+    name: str
+    kind: str = Field(..., description="request, handler, service, sql or dependency")
+    start_ms: float = Field(..., description="Start since the request began")
+    duration_ms: float
+    attributes: Dict[str, Any]
+    error: Optional[str]
+
+
+class TraceSummaryModel(BaseModel):
+    id: str
+    name: str
+    started_at: datetime
+    duration_ms: float
+    sampled: bool = Field(..., description="False if kept for being slow")
+
+
+class TraceModel(TraceSummaryModel):
+    dropped_spans: int
+    critical_path: List[int] = Field(
+        ..., description="Span ids from the request down to the last to finish"
+    )
+    spans: List[SpanModel]
+
+
+class ReadinessModel(BaseModel):
+    ready: bool
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    seconds: Optional[float] = None
+    steps: Dict[str, float] = {}
+    error: Optional[str] = None
+
+
+class ProfileNodeModel(BaseModel):
+    function: str
+    samples: int
+    children: List["ProfileNodeModel"]
+
+
+class ProfileSummaryModel(BaseModel):
+    id: str
+    method: str
+    path: str
+    query: str
+    status: int
+    started_at: datetime
+    duration_ms: float
+
+
+class ProfileModel(ProfileSummaryModel):
+    samples: int
+    breakdown_ms: Dict[str, float] = Field(
+        ..., description="Sampled time by category, including waiting"
+    )
+    dependencies_ms: Dict[str, float] = Field(
+        ..., description="Measured time in SQL and external calls"
+    )
+    call_tree: ProfileNodeModel
@@ -0,0 +1,22 @@
+"""
+Fast JSON responses for list endpoints.
+
+A route that returns pydantic models has every row validated twice: once
+when the service builds the model and again when FastAPI checks it against
+`response_model`, before it is dumped and encoded. For lists of thousands
+of rows that dominates the request. List services build plain dicts from
+database rows instead, and the route wraps them in a RowsResponse, which
+pydantic-core encodes straight to JSON bytes. Routes keep their
+`response_model`, so the OpenAPI schema is unchanged.
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class RowsResponse(JSONResponse):
+    """JSON response for data that already matches the response model."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -0,0 +1,28 @@
+"""
+API routers, kept apart from backend.main so an app can be assembled without
+running its startup work (benchmarks do).
+"""
+from fastapi import FastAPI
+
+from backend.auth_routes import router as auth_router
+from backend.routes import (
+    admin,
+    dictionary,
+    examples,
+    flashcards,
+    health,
+    metrics,
+    translation,
+)
+
+
+def include_routers(app: FastAPI) -> None:
+    """Add every API router to `app`."""
+    app.include_router(auth_router)
+    app.include_router(flashcards.router)
+    app.include_router(examples.router)
+    app.include_router(translation.router)
+    app.include_router(dictionary.router)
+    app.include_router(admin.router)
+    app.include_router(metrics.router)
+    app.include_router(health.router)
@@ -0,0 +1,118 @@
+"""
+Admin API routes.
+"""
+import os
+from dataclasses import asdict
+from typing import List
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from backend.auth import get_current_admin_user
+from backend.core import popularity, profiling, queries
+from backend.core.loop_monitor import loop_monitor
+from backend.core.tracing import TracedRoute
+from backend.db import UserDB, get_db
+from backend.models import (
+    DictionaryReloadRequest,
+    DictionaryStatusModel,
+    ProfileModel,
+    ProfileSummaryModel,
+    SlowQueryModel,
+    StallModel,
+    TraceModel,
+    TraceSummaryModel,
+    WordStatsModel,
+)
+from chinochau import dictionary, tracing
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TracedRoute)
+
+
+@router.get("/dictionary", response_model=DictionaryStatusModel)
+def get_dictionary_status(current_user: UserDB = Depends(get_current_admin_user)):
+    """Report the loaded dictionary: source, entry count and build time."""
+    return asdict(dictionary.status)
+
+
+@router.post(
+    "/dictionary/reload", response_model=DictionaryStatusModel, status_code=202
+)
+def reload_dictionary(
+    data: DictionaryReloadRequest = Body(default=DictionaryReloadRequest()),
+    current_user: UserDB = Depends(get_current_admin_user),
+):
+    """Rebuild the dictionary in the background and swap it in when ready."""
+    path = None
+    if data.path is not None:
+        try:
+            path = dictionary.data_file(data.path)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if not dictionary.start_reload(path):
+        raise HTTPException(status_code=409, detail="A reload is already running")
+    return asdict(dictionary.status)
+
+
+@router.get("/profiles", response_model=List[ProfileSummaryModel])
+def list_profiles(current_user: UserDB = Depends(get_current_admin_user)):
+    """Requests recently profiled by this worker, newest first.
+
+    Send a request with an admin token and an ``X-Profile: 1`` header to
+    profile it.
+    """
+    return list(reversed(profiling.profiles))
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileModel)
+def get_profile(
+    profile_id: str, current_user: UserDB = Depends(get_current_admin_user)
+):
+    """Call tree and time breakdown of a profiled request."""
+    report = profiling.get_profile(profile_id)
+    if report is None:
+        worker = profiling.profile_worker(profile_id)
+        if worker is not None and worker != os.getpid():
+            raise HTTPException(
+                status_code=404,
+                detail=f"Profile kept by worker {worker}; retry to reach it",
+            )
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+
+@router.get("/popular-words", response_model=List[WordStatsModel])
+def get_popular_words(
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_admin_user),
+):
+    """Words with the most users, as last counted by the popularity job."""
+    return popularity.popular_words(db, limit)
+
+
+@router.get("/stalls", response_model=List[StallModel])
+def list_stalls(current_user: UserDB = Depends(get_current_admin_user)):
+    """Recent event loop stalls, newest first, with the stack that blocked it."""
+    return [asdict(stall) for stall in reversed(loop_monitor.stalls)]
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryModel])
+def list_slow_queries(current_user: UserDB = Depends(get_current_admin_user)):
+    """Recent slow SQL statements, newest first, with their query plans."""
+    return [asdict(query) for query in reversed(queries.slow_queries)]
+
+
+@router.get("/traces", response_model=List[TraceSummaryModel])
+def list_traces(current_user: UserDB = Depends(get_current_admin_user)):
+    """Recently kept request traces, sampled or slow, newest first."""
+    return list(reversed(tracing.memory_exporter.traces))
+
+
+@router.get("/traces/{trace_id}", response_model=TraceModel)
+def get_trace(trace_id: str, current_user: UserDB = Depends(get_current_admin_user)):
+    """Spans of a traced request and its critical path."""
+    report = tracing.memory_exporter.get(trace_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return report
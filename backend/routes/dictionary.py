@@ -0,0 +1,46 @@
+"""
+Dictionary API routes.
+"""
+from fastapi import APIRouter, Depends, Query
+
+from backend.auth import get_current_active_user
+from backend.core.tracing import TracedRoute
+from backend.db import UserDB
+from backend.models import (
+    DictionarySearchResponse,
+    SegmentResponse,
+    SuggestResponse,
+    TextInput,
+)
+from backend.services.dictionary_service import DictionaryService
+
+router = APIRouter(tags=["dictionary"], route_class=TracedRoute)
+
+
+@router.post("/segment", response_model=SegmentResponse)
+def segment_api(
+    data: TextInput, current_user: UserDB = Depends(get_current_active_user)
+):
+    """Split a Chinese text into dictionary words with pinyin and definitions."""
+    return {"tokens": DictionaryService.segment(data.chinese)}
+
+
+@router.get("/dictionary/search", response_model=DictionarySearchResponse)
+def search_dictionary(
+    q: str = Query(..., min_length=1, description="English words to look up"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserDB = Depends(get_current_active_user),
+):
+    """Find Chinese words whose definitions match an English query."""
+    results = DictionaryService.search(q, limit)
+    return {"results": results, "total": len(results)}
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+def suggest_words(
+    prefix: str = Query(..., min_length=1, description="Chinese or pinyin prefix"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: UserDB = Depends(get_current_active_user),
+):
+    """Suggest dictionary words as the user types Chinese or pinyin."""
+    return {"suggestions": DictionaryService.suggest(prefix, limit)}
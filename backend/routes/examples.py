@@ -5,15 +5,17 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from backend.auth import get_current_active_user
+from backend.core.tracing import TracedRoute
 from backend.db import UserDB, get_db
 from backend.models import (
     ExampleCreateRequest,
     ExamplesResponse,
     FlashcardWithExamplesModel,
 )
+from backend.responses import RowsResponse
 from backend.services.example_service import ExampleService
 
-router = APIRouter(tags=["examples"])
+router = APIRouter(tags=["examples"], route_class=TracedRoute)
 
 
 @router.post("/examples", response_model=ExamplesResponse)
@@ -22,7 +24,13 @@ async def create_examples(
     current_user: UserDB = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    """Generate and save new examples for a specific flashcard."""
+    """Generate and save new examples for a specific flashcard.
+
+    Examples are shared between users: sentences generated earlier for the
+    same word, by any user, are handed out first and DeepSeek is only asked
+    when there aren't enough the flashcard doesn't already have. Generated
+    examples only depend on the word, never on the user's own data.
+    """
     return await ExampleService.create_examples(
         db, request.flashcard_id, request.count, current_user
     )
@@ -35,7 +43,7 @@ def get_saved_examples(
     db: Session = Depends(get_db),
 ):
     """Retrieve examples for a specific flashcard from the database."""
-    return ExampleService.get_examples(db, flashcard_id, current_user)
+    return RowsResponse(ExampleService.get_examples(db, flashcard_id, current_user))
 
 
 @router.get("/flashcard-with-example", response_model=FlashcardWithExamplesModel)
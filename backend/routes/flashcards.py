@@ -3,34 +3,60 @@ Flashcard API routes.
 """
 from typing import List
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Query
 from sqlalchemy.orm import Session
 
 from backend.auth import get_current_active_user
+from backend.core.tracing import TracedRoute
 from backend.db import UserDB, get_db
-from backend.models import FlashcardCreateModel, FlashcardModel
+from backend.models import (
+    FlashcardCreateModel,
+    FlashcardModel,
+    FlashcardSearchResponse,
+    Script,
+)
+from backend.responses import RowsResponse
 from backend.services.flashcard_service import FlashcardService
 
-router = APIRouter(prefix="/flashcards", tags=["flashcards"])
+router = APIRouter(prefix="/flashcards", tags=["flashcards"], route_class=TracedRoute)
 
 
 @router.get("", response_model=List[FlashcardModel])
 def get_flashcards(
+    script: Script = Query(Script.original, description="Script for Chinese text"),
     current_user: UserDB = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """Get flashcards for the current user."""
-    return FlashcardService.get_user_flashcards(db, current_user)
+    return RowsResponse(FlashcardService.get_user_flashcards(db, current_user, script))
+
+
+@router.get("/search", response_model=FlashcardSearchResponse)
+def search_flashcards(
+    q: str = Query(..., min_length=1, description="Chinese, pinyin or English"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    script: Script = Query(Script.original, description="Script for Chinese text"),
+    current_user: UserDB = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """Search the current user's flashcards and their examples."""
+    return RowsResponse(
+        FlashcardService.search_flashcards(db, q, current_user, limit, offset, script)
+    )
 
 
 @router.get("/{chinese}", response_model=FlashcardModel)
 def get_flashcard(
     chinese: str,
+    script: Script = Query(Script.original, description="Script for Chinese text"),
     current_user: UserDB = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """Get a specific flashcard by Chinese text for the current user."""
-    flashcard = FlashcardService.get_flashcard_by_chinese(db, chinese, current_user)
+    flashcard = FlashcardService.get_flashcard_by_chinese(
+        db, chinese, current_user, script
+    )
     if flashcard:
         return flashcard
     from fastapi import HTTPException
@@ -41,10 +67,11 @@ def get_flashcard(
 @router.post("", response_model=FlashcardModel)
 async def get_or_create_flashcard(
     data: FlashcardCreateModel = Body(...),
+    script: Script = Query(Script.original, description="Script for Chinese text"),
     current_user: UserDB = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """Get or create a flashcard for the current user."""
     return await FlashcardService.get_or_create_flashcard(
-        db, data.chinese, current_user
+        db, data.chinese, current_user, script
     )
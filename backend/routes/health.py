@@ -0,0 +1,26 @@
+"""
+Health API routes.
+"""
+from dataclasses import asdict
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from backend.core import warmup
+from backend.core.tracing import TracedRoute
+from backend.models import ReadinessModel
+
+router = APIRouter(tags=["health"], route_class=TracedRoute)
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessModel,
+    responses={503: {"model": ReadinessModel, "description": "Still warming up"}},
+)
+def ready():
+    """200 once warm-up has completed, 503 until then, with step timings."""
+    body = ReadinessModel(**asdict(warmup.status))
+    if not body.ready:
+        return JSONResponse(body.model_dump(mode="json"), status_code=503)
+    return body
@@ -0,0 +1,20 @@
+"""
+Metrics API routes.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.core.tracing import TracedRoute
+from chinochau import metrics
+
+router = APIRouter(tags=["metrics"], route_class=TracedRoute)
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request, dependency, pool, threadpool and cache metrics for Prometheus."""
+    # async so that threadpool usage is read from the event loop
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
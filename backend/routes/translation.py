@@ -4,11 +4,12 @@ Translation API routes.
 from fastapi import APIRouter, Depends
 
 from backend.auth import get_current_active_user
+from backend.core.tracing import TracedRoute
 from backend.db import UserDB
-from backend.models import TextInput
+from backend.models import PinyinBatchRequest, PinyinBatchResponse, TextInput
 from backend.services.translation_service import TranslationService
 
-router = APIRouter(tags=["translation"])
+router = APIRouter(tags=["translation"], route_class=TracedRoute)
 
 
 @router.post("/translate")
@@ -27,3 +28,13 @@ async def pinyin_api(
     """Return the pinyin for a given Chinese text."""
     result = await TranslationService.get_pinyin(data.chinese)
     return {"pinyin": result}
+
+
+@router.post("/pinyin/batch", response_model=PinyinBatchResponse)
+async def pinyin_batch_api(
+    data: PinyinBatchRequest,
+    current_user: UserDB = Depends(get_current_active_user),
+):
+    """Return the pinyin for each of the given Chinese texts, in order."""
+    result = await TranslationService.get_pinyin_batch(data.texts)
+    return {"pinyin": result}
@@ -0,0 +1,100 @@
+"""
+Full-text search helpers for the flashcards FTS5 index.
+
+The index lives in the `flashcards_fts` virtual table, one row per
+flashcard (rowid = flashcard id). FTS5's unicode61 tokenizer treats a run of
+Chinese characters as a single token, so Chinese text is indexed with every
+character as its own token and queried as a phrase. Pinyin is indexed
+without tones both per syllable and as a whole word, so "xue", "xuexi",
+"xué xí" and "xue2xi2" all match 学习. Chinese is indexed and queried in
+simplified form, so 學習 matches too.
+
+The owner is an indexed token ("u42") rather than a filtered column, so a
+query only visits the current user's rows no matter how many cards other
+users have.
+"""
+import json
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+from chinochau import pinyin_cache
+from chinochau.reverse_index import STOPWORDS
+from chinochau.script import normalize_key
+
+SEARCH_TABLE = "flashcards_fts"
+
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    chinese, pinyin, definitions, examples, owner,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+DROP_SEARCH_TABLE = f"DROP TABLE IF EXISTS {SEARCH_TABLE}"
+
+# bm25() column weights: chinese, pinyin, definitions, examples, owner
+RANK_WEIGHTS = (10.0, 5.0, 2.0, 1.0, 0.0)
+
+_CJK_CHARS = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_CJK = re.compile(f"([{_CJK_CHARS}])")
+_QUERY_PART = re.compile(f"[{_CJK_CHARS}]+|\\w+")
+
+
+def chinese_text(text: str) -> str:
+    """Put every Chinese character in its own token, in simplified form."""
+    return _CJK.sub(r" \1 ", normalize_key(text))
+
+
+def pinyin_text(chinese: str) -> str:
+    """Toneless pinyin, per syllable and as one word."""
+    syllables = pinyin_cache.get(chinese, " ", "strip")
+    return f"{syllables} {syllables.replace(' ', '')}"
+
+
+def owner_token(user_id: int) -> str:
+    return f"u{user_id}"
+
+
+def search_document(
+    chinese: str, definitions: str, examples: Iterable[str], user_id: int
+) -> dict:
+    """Column values for a flashcard's row in the index."""
+    return {
+        "chinese": chinese_text(chinese),
+        "pinyin": pinyin_text(chinese),
+        "definitions": " ; ".join(json.loads(definitions)),
+        "examples": chinese_text(" ".join(examples)),
+        "owner": owner_token(user_id),
+    }
+
+
+def match_expression(query: str, user_id: int) -> Optional[str]:
+    """Turn user input into a safe FTS5 MATCH expression for one user.
+
+    Chinese runs become phrases of single characters, other words become
+    prefix terms with tones removed; all parts must match. English
+    stopwords are dropped unless nothing else is left.
+    """
+    phrases = []
+    words = []
+    for part in _QUERY_PART.findall(query.lower()):
+        if _CJK.match(part):
+            phrases.append('"' + " ".join(normalize_key(part)) + '"')
+            continue
+        # Tone marks, tone numbers ("ni3hao3") and ü are not indexed
+        part = unicodedata.normalize("NFD", part.replace("ü", "v"))
+        part = "".join(char for char in part if not unicodedata.combining(char))
+        part = re.sub(r"(?<=[a-z])[1-5]", "", part)
+        if part:
+            words.append(part)
+
+    meaningful = [word for word in words if word not in STOPWORDS]
+    if phrases or meaningful:
+        words = meaningful
+    # Single letters as prefixes would match most of the index
+    terms = phrases + [f'"{word}"*' if len(word) > 1 else f'"{word}"' for word in words]
+    if not terms:
+        return None
+    return f'owner:"{owner_token(user_id)}" AND ' + " ".join(terms)
@@ -0,0 +1,257 @@
+"""
+Pre-fork launcher: load the app once, then fork the workers.
+
+`uvicorn --workers N` starts every worker as a fresh interpreter, so each
+imports the app and builds its own CEDICT indexes and pinyin tables. Here
+the master process does that once, moves the loaded objects out of the
+garbage collector's reach with gc.freeze() (collections would otherwise
+write to every object header and unshare the pages), binds the socket and
+forks the workers, which share those pages copy-on-write.
+
+    poetry run python -m backend.serve --workers 4 --port 8000
+
+The master restarts workers that exit, passes SIGTERM and SIGINT on to
+them, and on SIGHUP reloads the dictionary in the workers and in itself, so
+later forks get the new one. It prints the memory report below once the
+workers are up and on SIGUSR1. Reading memory needs Linux's /proc.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Lines of /proc/<pid>/smaps_rollup read, in kB
+SMAPS_FIELDS = (
+    "Rss",
+    "Pss",
+    "Shared_Clean",
+    "Shared_Dirty",
+    "Private_Clean",
+    "Private_Dirty",
+)
+
+
+@dataclass
+class MemoryUsage:
+    """Resident memory of a process, in bytes."""
+
+    pid: int
+    rss: int
+    # Proportional set size: private pages plus a share of shared pages
+    pss: int
+    shared: int
+    unique: int
+
+
+def read_memory(pid: int) -> Optional[MemoryUsage]:
+    """Memory of `pid` from /proc, None if it has gone or there is no /proc."""
+    values = dict.fromkeys(SMAPS_FIELDS, 0)
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in values:
+                    values[name] = int(rest.split()[0]) * 1024
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return None
+    return MemoryUsage(
+        pid=pid,
+        rss=values["Rss"],
+        pss=values["Pss"],
+        shared=values["Shared_Clean"] + values["Shared_Dirty"],
+        unique=values["Private_Clean"] + values["Private_Dirty"],
+    )
+
+
+def _mib(size: int) -> str:
+    return f"{size / 2**20:10.1f}"
+
+
+def memory_report(master: int, workers: List[int]) -> str:
+    """Unique, shared and proportional memory of the master and workers."""
+    lines = [f"{'':<16}{'pid':>8}{'unique':>10}{'shared':>10}{'pss':>10}{'rss':>10}"]
+    usages = []
+    for name, pid in [("master", master)] + [
+        (f"worker {number}", pid) for number, pid in enumerate(workers, 1)
+    ]:
+        usage = read_memory(pid)
+        if usage is None:
+            continue
+        usages.append(usage)
+        lines.append(
+            f"{name:<16}{pid:>8}{_mib(usage.unique)}{_mib(usage.shared)}"
+            f"{_mib(usage.pss)}{_mib(usage.rss)}"
+        )
+    worker_usages = usages[1:]
+    if not worker_usages:
+        return "\n".join(lines + ["(memory is only reported on Linux)"])
+    per_worker = sum(usage.unique for usage in worker_usages) / len(worker_usages)
+    lines.append(
+        f"Total (pss) {_mib(sum(usage.pss for usage in usages)).strip()} MiB;"
+        f" each extra worker adds about {_mib(per_worker).strip()} MiB unique"
+    )
+    return "\n".join(lines)
+
+
+def preload():
+    """Import the app and build the data every worker reads."""
+    from backend.db import engine
+    from backend.main import app
+    from chinochau import pinyin_cache
+    from chinochau.dictionary import get_dictionary
+
+    get_dictionary()
+    for format in pinyin_cache.FORMATS:
+        pinyin_cache.get_table(format)
+    # Connections opened while starting up must not be shared with workers
+    engine.dispose()
+    freeze()
+    return app
+
+
+def freeze():
+    """Keep the garbage collector from touching what is loaded so far."""
+    gc.collect()
+    gc.freeze()
+
+
+class Master:
+    """Fork workers serving a shared socket, and keep them running."""
+
+    def __init__(self, sock: socket.socket, workers: int, app, log_level: str):
+        self.sock = sock
+        self.workers = workers
+        self.app = app
+        self.log_level = log_level
+        self.pids: Dict[int, int] = {}
+        self.stopping = False
+        self.report_requested = False
+        self.reload_requested = False
+
+    def spawn(self, number: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = number
+            return
+        from chinochau.dictionary import install_reload_signal_handler
+
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+            signal.signal(signum, signal.SIG_DFL)
+        # The master's SIGHUP handler would only signal the other workers
+        install_reload_signal_handler()
+        self.pids = {}
+        code = 0
+        try:
+            self.serve()
+        except BaseException as e:
+            print(f"❌ Worker {number} failed: {e!r}", file=sys.stderr)
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def serve(self) -> None:
+        import uvicorn
+
+        app = self.app
+        if app is None:
+            # Not preloaded: every worker loads everything itself
+            app = preload()
+        config = uvicorn.Config(app, log_level=self.log_level)
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def signal(self, signum: int) -> None:
+        for pid in self.pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        self.signal(signum)
+
+    def _report(self, signum, frame) -> None:
+        self.report_requested = True
+
+    def _reload(self, signum, frame) -> None:
+        self.reload_requested = True
+        self.signal(signum)
+
+    def run(self, report_after: float) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGUSR1, self._report)
+        signal.signal(signal.SIGHUP, self._reload)
+        for number in range(1, self.workers + 1):
+            self.spawn(number)
+        report_at = time.monotonic() + report_after if report_after else 0
+        while self.pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                number = self.pids.pop(pid)
+                if not self.stopping:
+                    print(f"⚠️ Worker {number} exited ({status}), restarting")
+                    self.spawn(number)
+                continue
+            if self.reload_requested and self.app is not None:
+                self.reload_requested = False
+                from chinochau.dictionary import reload_dictionary
+
+                reload_dictionary()
+                freeze()
+            due = report_at and time.monotonic() >= report_at
+            if self.report_requested or due:
+                self.report_requested, report_at = False, 0
+                report = memory_report(os.getpid(), self.worker_pids)
+                print(f"📊 Memory (MiB)\n{report}")
+                sys.stdout.flush()
+            time.sleep(0.2)
+        print("👋 All workers stopped")
+
+    @property
+    def worker_pids(self) -> List[int]:
+        return sorted(self.pids, key=self.pids.get)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="Load the app in each worker, to compare memory",
+    )
+    parser.add_argument(
+        "--report-after",
+        type=float,
+        default=10.0,
+        help="Seconds after starting to print the memory report (0: only on SIGUSR1)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    app = None if args.no_preload else preload()
+    if app is not None:
+        print(f"📦 Loaded the app in {time.perf_counter() - start:.1f}s")
+    sock = socket.create_server((args.host, args.port), backlog=2048)
+    host, port = sock.getsockname()[:2]
+    print(f"🚀 Serving on http://{host}:{port} with {args.workers} workers")
+    sys.stdout.flush()
+    Master(sock, args.workers, app, args.log_level).run(args.report_after)
+
+
+if __name__ == "__main__":
+    main()
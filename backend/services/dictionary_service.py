@@ -0,0 +1,54 @@
+"""
+Service layer for dictionary operations.
+"""
+from typing import List
+
+from backend.models import DictionaryEntryModel, SegmentToken, SuggestionModel
+from chinochau.dictionary import get_dictionary
+
+
+class DictionaryService:
+    """Service class for dictionary operations."""
+
+    @staticmethod
+    def segment(text: str) -> List[SegmentToken]:
+        """Split a Chinese text into dictionary words."""
+        dictionary = get_dictionary()
+        return [
+            SegmentToken(
+                text=token.text,
+                pinyin=token.pinyin,
+                definitions=token.definitions,
+                is_word=token.is_word,
+            )
+            for token in dictionary.segment(text)
+        ]
+
+    @staticmethod
+    def search(query: str, limit: int) -> List[DictionaryEntryModel]:
+        """Find Chinese words from an English description."""
+        index = get_dictionary().reverse_index
+        return [
+            DictionaryEntryModel(
+                simplified=result.entry.simplified,
+                traditional=result.entry.traditional,
+                pinyin=result.entry.pinyin,
+                definitions=list(result.entry.definitions),
+                score=result.score,
+            )
+            for result in index.search(query, limit)
+        ]
+
+    @staticmethod
+    def suggest(prefix: str, limit: int) -> List[SuggestionModel]:
+        """Complete a partially typed word, most common words first."""
+        index = get_dictionary().prefix_index
+        return [
+            SuggestionModel(
+                simplified=entry.simplified,
+                traditional=entry.traditional,
+                pinyin=entry.pinyin,
+                definitions=list(entry.definitions),
+            )
+            for entry in index.suggest(prefix, limit)
+        ]
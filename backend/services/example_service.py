@@ -1,25 +1,52 @@
 """
 Service layer for example operations.
 """
-from typing import List
+from typing import List, Tuple
 
 from fastapi import HTTPException
 from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from backend.core.limits import example_limiter
 from backend.db import ExampleDB, FlashcardDB, UserDB
 from backend.models import ExampleModel, ExamplesResponse, FlashcardWithExamplesModel
 from chinochau.deepseek import get_examples_deepseek
+from chinochau.script import normalize_key
+from chinochau.shared_cache import tiered_cache
+from chinochau.tracing import traced
+
+# Examples generated for each word, for all users and workers to reuse;
+# keyed by normalize_key so 學習 and 学习 share a pool
+EXAMPLE_POOL_SIZE = 20
+example_pool = tiered_cache("examples", 2000, 50000)
+
+
+def pooled_examples(word: str) -> List[str]:
+    """Examples generated for `word` before, in either script."""
+    return example_pool.get(normalize_key(word)) or []
+
+
+def add_to_pool(word: str, examples: List[str]) -> List[str]:
+    """Keep generated examples for reuse; returns the word's pool."""
+    key = normalize_key(word)
+    pool = example_pool.get(key) or []
+    new = [text for text in examples if text not in pool]
+    if new:
+        pool = (pool + new)[-EXAMPLE_POOL_SIZE:]
+        example_pool.set(key, pool)
+    return pool
 
 
 class ExampleService:
     """Service class for example operations."""
 
     @staticmethod
-    async def create_examples(
+    @traced()
+    def _pooled_examples(
         db: Session, flashcard_id: int, count: int, user: UserDB
-    ) -> ExamplesResponse:
-        """Generate and save new examples for a flashcard."""
+    ) -> Tuple[FlashcardDB, List[str]]:
+        """The user's flashcard, and up to `count` reusable examples for it."""
         # Check if the flashcard exists and belongs to the current user
         flashcard = (
             db.query(FlashcardDB)
@@ -32,24 +59,33 @@ class ExampleService:
         if not flashcard:
             raise HTTPException(status_code=404, detail="Flashcard not found")
 
-        # Generate examples using the flashcard's Chinese word
-        try:
-            examples_list = await run_in_threadpool(
-                get_examples_deepseek, flashcard.chinese, count
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=500, detail=f"Failed to generate examples: {str(e)}"
+        # Reuse examples generated for this word before that the flashcard
+        # doesn't have yet
+        existing = {
+            text
+            for (text,) in db.query(ExampleDB.example_text).filter(
+                ExampleDB.flashcard_id == flashcard_id
             )
+        }
+        pool = pooled_examples(flashcard.chinese)
+        return flashcard, [text for text in pool if text not in existing][:count]
 
-        # Save examples to database with flashcard reference
-        saved_examples = []
-        for example_text in examples_list:
-            example_db = ExampleDB(flashcard_id=flashcard_id, example_text=example_text)
-            db.add(example_db)
-            db.commit()
-            db.refresh(example_db)
-            saved_examples.append(ExampleModel(**example_db.to_dict()))
+    @staticmethod
+    @traced()
+    def _save_examples(
+        db: Session, flashcard: FlashcardDB, examples_list: List[str]
+    ) -> ExamplesResponse:
+        """Save examples to database with flashcard reference."""
+        examples = [
+            ExampleDB(flashcard_id=flashcard.id, example_text=example_text)
+            for example_text in examples_list
+        ]
+        db.add_all(examples)
+        # Ids and creation times are set by the flush; read them before the
+        # commit expires them, rather than reloading each example
+        db.flush()
+        saved_examples = [ExampleModel(**example.to_dict()) for example in examples]
+        db.commit()
 
         return ExamplesResponse(
             examples=saved_examples,
@@ -58,8 +94,40 @@ class ExampleService:
         )
 
     @staticmethod
-    def get_examples(db: Session, flashcard_id: int, user: UserDB) -> ExamplesResponse:
-        """Retrieve examples for a specific flashcard from the database."""
+    @traced()
+    async def create_examples(
+        db: Session, flashcard_id: int, count: int, user: UserDB
+    ) -> ExamplesResponse:
+        """Generate and save new examples for a flashcard."""
+        # Queries and the shared cache are blocking, keep them off the loop
+        flashcard, examples_list = await run_in_threadpool(
+            ExampleService._pooled_examples, db, flashcard_id, count, user
+        )
+
+        if len(examples_list) < count:
+            # Generate examples using the flashcard's Chinese word, if the
+            # user's allowance and the global concurrency limit permit (429
+            # otherwise)
+            async with example_limiter.admit(user.id, count):
+                try:
+                    examples_list = await run_in_threadpool(
+                        get_examples_deepseek, flashcard.chinese, count
+                    )
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to generate examples: {str(e)}",
+                    )
+            await run_in_threadpool(add_to_pool, flashcard.chinese, examples_list)
+
+        return await run_in_threadpool(
+            ExampleService._save_examples, db, flashcard, examples_list
+        )
+
+    @staticmethod
+    @traced()
+    def get_examples(db: Session, flashcard_id: int, user: UserDB) -> dict:
+        """Retrieve examples for a specific flashcard, as data for RowsResponse."""
         flashcard = (
             db.query(FlashcardDB)
             .filter(FlashcardDB.id == flashcard_id, FlashcardDB.user_id == user.id)
@@ -68,33 +136,32 @@ class ExampleService:
         if not flashcard:
             raise HTTPException(status_code=404, detail="Flashcard not found")
 
-        total_examples = (
-            db.query(ExampleDB).filter(ExampleDB.flashcard_id == flashcard_id).count()
-        )
+        # Get examples for this flashcard (ordered by creation time)
+        rows = db.execute(
+            select(
+                ExampleDB.id,
+                ExampleDB.flashcard_id,
+                ExampleDB.example_text,
+                ExampleDB.created_at,
+            )
+            .where(ExampleDB.flashcard_id == flashcard_id)
+            .order_by(ExampleDB.created_at.asc())
+        ).all()
 
-        if total_examples == 0:
+        if not rows:
             raise HTTPException(
                 status_code=404,
                 detail=f"No examples available for flashcard '{flashcard.chinese}'. Please generate some examples first using the POST /examples endpoint.",
             )
 
-        # Get examples for this flashcard (ordered by creation time)
-        examples = (
-            db.query(ExampleDB)
-            .filter(ExampleDB.flashcard_id == flashcard_id)
-            .order_by(ExampleDB.created_at.asc())
-            .all()
-        )
-
-        example_models = [ExampleModel(**example.to_dict()) for example in examples]
-
-        return ExamplesResponse(
-            examples=example_models,
-            total=total_examples,
-            flashcard_chinese=flashcard.chinese,
-        )
+        return {
+            "examples": [row._asdict() for row in rows],
+            "total": len(rows),
+            "flashcard_chinese": flashcard.chinese,
+        }
 
     @staticmethod
+    @traced()
     def get_flashcard_with_examples(
         db: Session, flashcard_id: int, user: UserDB
     ) -> FlashcardWithExamplesModel:
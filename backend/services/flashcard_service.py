@@ -4,41 +4,144 @@ Service layer for flashcard operations.
 import json
 from typing import List, Optional
 
-import pinyin
 from fastapi import HTTPException
 from fastapi.concurrency import run_in_threadpool
-from pinyin.cedict import translate_word
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
-from backend.db import FlashcardDB, UserDB
-from backend.models import FlashcardModel
-from chinochau.translate_google import translate_google
+from backend.db import DefinitionDB, FlashcardDB, UserDB, decode_definitions
+from backend.models import FlashcardModel, Script
+from backend.search import RANK_WEIGHTS, SEARCH_TABLE, match_expression
+from chinochau import pinyin_cache
+from chinochau.definitions import get_definitions
+from chinochau.dictionary import get_dictionary
+from chinochau.script import normalize_key
+from chinochau.tracing import traced
+from chinochau.translate_google import TranslationUnavailable
+
+
+def render(chinese: str, script: Script) -> str:
+    """Chinese text in the requested script."""
+    if script == Script.original:
+        return chinese
+    return get_dictionary().script_converter.convert(chinese, script.value)
+
+
+def to_model(card: FlashcardDB, script: Script = Script.original) -> FlashcardModel:
+    """Convert a flashcard row, rendering its Chinese in the given script."""
+    model = FlashcardModel(**card.to_dict())
+    model.chinese = render(model.chinese, script)
+    return model
 
 
 class FlashcardService:
     """Service class for flashcard operations."""
 
     @staticmethod
-    def get_user_flashcards(db: Session, user: UserDB) -> List[FlashcardModel]:
+    @traced()
+    def card_rows(
+        db: Session, condition, script: Script = Script.original
+    ) -> List[dict]:
+        """Flashcards matching `condition` as plain dicts, for RowsResponse."""
+        rows = db.execute(
+            select(
+                FlashcardDB.id,
+                FlashcardDB.chinese,
+                FlashcardDB.pinyin,
+                DefinitionDB.content,
+            )
+            .join(FlashcardDB.definition)
+            .where(condition)
+        )
+        return [
+            {
+                "id": id,
+                "chinese": render(chinese, script),
+                "pinyin": pinyin,
+                "definitions": decode_definitions(content),
+            }
+            for id, chinese, pinyin, content in rows
+        ]
+
+    @staticmethod
+    @traced()
+    def get_user_flashcards(
+        db: Session, user: UserDB, script: Script = Script.original
+    ) -> List[dict]:
         """Get all flashcards for a user."""
-        flashcards = db.query(FlashcardDB).filter(FlashcardDB.user_id == user.id).all()
-        return [FlashcardModel(**f.to_dict()) for f in flashcards]
+        return FlashcardService.card_rows(db, FlashcardDB.user_id == user.id, script)
 
     @staticmethod
-    def get_flashcard_by_chinese(
+    @traced()
+    def find_flashcard(
         db: Session, chinese: str, user: UserDB
-    ) -> Optional[FlashcardModel]:
-        """Get a specific flashcard by Chinese text for a user."""
-        card = (
+    ) -> Optional[FlashcardDB]:
+        """Find a user's flashcard by Chinese text in either script."""
+        return (
             db.query(FlashcardDB)
-            .filter(FlashcardDB.chinese == chinese, FlashcardDB.user_id == user.id)
+            .filter(
+                FlashcardDB.chinese_key == normalize_key(chinese),
+                FlashcardDB.user_id == user.id,
+            )
             .first()
         )
+
+    @staticmethod
+    @traced()
+    def get_flashcard_by_chinese(
+        db: Session, chinese: str, user: UserDB, script: Script = Script.original
+    ) -> Optional[FlashcardModel]:
+        """Get a specific flashcard by Chinese text for a user."""
+        card = FlashcardService.find_flashcard(db, chinese, user)
         if card:
-            return FlashcardModel(**card.to_dict())
+            return to_model(card, script)
         return None
 
     @staticmethod
+    @traced()
+    def search_flashcards(
+        db: Session,
+        query: str,
+        user: UserDB,
+        limit: int,
+        offset: int,
+        script: Script = Script.original,
+    ) -> dict:
+        """Full-text search over a user's flashcards, best matches first."""
+        expression = match_expression(query, user.id)
+        if expression is None:
+            return {"results": [], "total": 0, "limit": limit, "offset": offset}
+
+        params = {"query": expression}
+        matches = f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :query"
+        total = db.execute(text(f"SELECT COUNT(*) {matches}"), params).scalar()
+        weights = ", ".join(str(weight) for weight in RANK_WEIGHTS)
+        ids = (
+            db.execute(
+                text(
+                    f"SELECT rowid {matches} "
+                    f"ORDER BY bm25({SEARCH_TABLE}, {weights}) "
+                    "LIMIT :limit OFFSET :offset"
+                ),
+                {**params, "limit": limit, "offset": offset},
+            )
+            .scalars()
+            .all()
+        )
+
+        cards = {
+            card["id"]: card
+            for card in FlashcardService.card_rows(db, FlashcardDB.id.in_(ids), script)
+        }
+        return {
+            "results": [cards[id] for id in ids if id in cards],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }
+
+    @staticmethod
+    @traced()
     def get_flashcard_by_id(
         db: Session, flashcard_id: int, user: UserDB
     ) -> Optional[FlashcardDB]:
@@ -50,32 +153,56 @@ class FlashcardService:
         )
 
     @staticmethod
+    @traced()
+    def _existing_flashcard(
+        db: Session, chinese: str, user: UserDB, script: Script
+    ) -> Optional[FlashcardModel]:
+        return FlashcardService.get_flashcard_by_chinese(db, chinese, user, script)
+
+    @staticmethod
+    @traced()
+    def _save_flashcard(
+        db: Session,
+        chinese: str,
+        definitions: List[str],
+        user: UserDB,
+        script: Script,
+    ) -> FlashcardModel:
+        flashcard_db = FlashcardDB(
+            chinese=chinese,
+            pinyin=pinyin_cache.get(chinese),
+            definitions=json.dumps(definitions),
+            user_id=user.id,
+        )
+        db.add(flashcard_db)
+        db.commit()
+        db.refresh(flashcard_db)
+        return to_model(flashcard_db, script)
+
+    @staticmethod
+    @traced()
     async def get_or_create_flashcard(
-        db: Session, chinese: str, user: UserDB
+        db: Session, chinese: str, user: UserDB, script: Script = Script.original
     ) -> FlashcardModel:
         """Get or create a flashcard for a user."""
-        # Check if flashcard already exists
-        card = (
-            db.query(FlashcardDB)
-            .filter(FlashcardDB.chinese == chinese, FlashcardDB.user_id == user.id)
-            .first()
+        # Queries, key normalization and pinyin are blocking, keep them off
+        # the loop; check if the flashcard already exists, in either script
+        card = await run_in_threadpool(
+            FlashcardService._existing_flashcard, db, chinese, user, script
         )
         if card:
-            return FlashcardModel(**card.to_dict())
+            return card
 
         # Create new flashcard
-        f_pinyin = await run_in_threadpool(pinyin.get, chinese)
-        f_definition = await run_in_threadpool(translate_word, chinese)
-        if not f_definition:
-            f_definition = await translate_google(chinese)
+        try:
+            f_definition = await get_definitions(chinese)
+        except TranslationUnavailable as error:
+            raise HTTPException(
+                status_code=503,
+                detail="Translation service unavailable, please retry later",
+                headers={"Retry-After": str(error.retry_after)},
+            )
 
-        flashcard_db = FlashcardDB(
-            chinese=chinese,
-            pinyin=f_pinyin,
-            definitions=json.dumps(f_definition),
-            user_id=user.id,
+        return await run_in_threadpool(
+            FlashcardService._save_flashcard, db, chinese, f_definition, user, script
         )
-        db.add(flashcard_db)
-        db.commit()
-        db.refresh(flashcard_db)
-        return FlashcardModel(**flashcard_db.to_dict())
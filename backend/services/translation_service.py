@@ -1,10 +1,12 @@
 """
 Service layer for translation operations.
 """
-import pinyin
-from fastapi.concurrency import run_in_threadpool
+from typing import List
 
-from chinochau.translate_google import translate_google
+from fastapi import HTTPException
+
+from chinochau import pinyin_cache
+from chinochau.translate_google import TranslationUnavailable, translate_google
 
 
 class TranslationService:
@@ -13,11 +15,23 @@ class TranslationService:
     @staticmethod
     async def translate_text(chinese: str) -> str:
         """Return the English translation for a given Chinese text."""
-        result = await translate_google(chinese)
+        try:
+            result = await translate_google(chinese)
+        except TranslationUnavailable as error:
+            raise HTTPException(
+                status_code=503,
+                detail="Translation service unavailable, please retry later",
+                headers={"Retry-After": str(error.retry_after)},
+            )
         return result[0] if result else ""
 
     @staticmethod
     async def get_pinyin(chinese: str) -> str:
         """Return the pinyin for a given Chinese text."""
-        result = await run_in_threadpool(pinyin.get, chinese)
-        return result
+        # Table lookups are cheap enough to run on the event loop
+        return pinyin_cache.get(chinese)
+
+    @staticmethod
+    async def get_pinyin_batch(texts: List[str]) -> List[str]:
+        """Return the pinyin for each text, in the same order."""
+        return pinyin_cache.get_many(texts)
@@ -1,14 +1,23 @@
+import os
+
+# Before the backend is imported: its engine and startup work use this database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+os.environ["CHINOCHAU_DATABASE_URL"] = SQLALCHEMY_DATABASE_URL
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.auth import create_access_token, get_password_hash
+from backend.core import config
+from backend.core.limits import example_limiter
+from backend.core.loop_monitor import loop_monitor
 from backend.db import Base, UserDB, get_db
 from backend.main import app
+from chinochau import shared_cache
 
 # Create a test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
@@ -18,6 +27,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 @pytest.fixture
 def test_db():
     """Create a fresh database for each test"""
+    # Tables left by the app's startup work or an interrupted run
+    Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
@@ -34,6 +45,23 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# Keep the shared cache of a development server out of the tests
+shared_cache.SHARED_CACHE_PATH = "./test_cache.db"
+
+
+@pytest.fixture(autouse=True)
+def reset_example_limits():
+    """Give every test a fresh example allowance"""
+    example_limiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """Start every test without cached translations or examples"""
+    shared_cache.clear_all()
+    yield
+    shared_cache.clear_all()
+
 
 @pytest.fixture
 def client():
@@ -41,6 +69,26 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def monitored_client(test_db, monkeypatch):
+    """A client running the app's lifespan, with event loop stalls recorded
+
+    Requests share one event loop, watched with a 50 ms threshold; assert
+    on `loop_monitor.stalls` to catch blocking calls in async handlers.
+    """
+
+    async def no_job():
+        pass
+
+    monkeypatch.setattr(config, "warm_up", lambda: None)
+    monkeypatch.setattr(config, "keep_popular_words_warm", no_job)
+    monkeypatch.setattr(loop_monitor, "threshold", 0.05)
+    loop_monitor.clear()
+    with TestClient(app) as client:
+        yield client
+    loop_monitor.clear()
+
+
 @pytest.fixture
 def test_user(test_db):
     """Create a test user and return user data"""
@@ -76,6 +124,27 @@ def authenticated_client(client, auth_headers):
     return client
 
 
+@pytest.fixture
+def admin_client(client, test_db):
+    """Create a test client authenticated as an admin user"""
+    db = TestingSessionLocal()
+    try:
+        admin = UserDB(
+            email="admin@chinochau.local",
+            full_name="Admin User",
+            hashed_password=get_password_hash("adminpassword"),
+            is_active=True,
+            is_admin=True,
+        )
+        db.add(admin)
+        db.commit()
+    finally:
+        db.close()
+    access_token = create_access_token(data={"sub": "admin@chinochau.local"})
+    client.headers.update({"Authorization": f"Bearer {access_token}"})
+    return client
+
+
 @pytest.fixture
 def sample_flashcard_data():
     """Sample data for testing flashcard creation"""
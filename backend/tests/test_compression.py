@@ -0,0 +1,135 @@
+import asyncio
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+
+from backend.core import compression
+from backend.core.compression import CompressionMiddleware, choose_encoding
+from backend.tests.conftest import authenticated_client, client, test_db, test_user
+
+CHUNK = b"x" * 2000
+
+# Enough cards for the list to pass the compression threshold
+WORDS = ["学习", "你好", "电脑", "中文", "朋友", "老师", "学生", "学校", "医生", "电话"]
+WORDS += ["图书馆", "火车站", "飞机", "天气", "时间", "工作", "家庭", "音乐"]
+
+
+async def streaming_app(scope, receive, send):
+    response = StreamingResponse(iter([CHUNK] * 4), media_type="text/plain")
+    await response(scope, receive, send)
+
+
+def call(app, accept_encoding):
+    """Run an ASGI app and collect what it sends."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+
+    async def receive():
+        # The client stays connected until the response is complete
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+class TestEncodingNegotiation:
+    """Test cases for choosing a content encoding"""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("gzip, deflate, br", "br"),
+            ("gzip", "gzip"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("*", "br"),
+            ("gzip;q=0, identity", None),
+            ("", None),
+        ],
+    )
+    def test_choose_encoding(self, header, expected):
+        assert choose_encoding(header, ["br", "gzip"]) == expected
+
+    def test_brotli_is_optional(self, monkeypatch):
+        """Without the brotli package only gzip is offered"""
+        monkeypatch.setattr(compression, "brotli", None)
+        middleware = CompressionMiddleware(streaming_app, encodings=["br", "gzip"])
+        assert middleware.encodings == ["gzip"]
+
+
+class TestCompressionMiddleware:
+    """Test cases for compressing responses"""
+
+    def test_streams_compressed_chunks(self):
+        """A streaming response is compressed chunk by chunk"""
+        app = CompressionMiddleware(streaming_app, encodings=["gzip"])
+        messages = call(app, "gzip")
+
+        start, *bodies = messages
+        headers = dict(start["headers"])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert b"content-length" not in headers
+        assert len(bodies) > 1
+        data = b"".join(message["body"] for message in bodies)
+        assert gzip.decompress(data) == CHUNK * 4
+
+    def test_small_response_is_not_compressed(self):
+        app = CompressionMiddleware(
+            streaming_app, encodings=["gzip"], minimum_size=10**6
+        )
+        start, *bodies = call(app, "gzip")
+
+        assert b"content-encoding" not in dict(start["headers"])
+        assert b"".join(message["body"] for message in bodies) == CHUNK * 4
+
+    def test_brotli(self):
+        brotli = pytest.importorskip("brotli")
+        app = CompressionMiddleware(streaming_app, encodings=["br", "gzip"])
+        start, *bodies = call(app, "gzip, br")
+
+        assert dict(start["headers"])[b"content-encoding"] == b"br"
+        data = b"".join(message["body"] for message in bodies)
+        assert brotli.decompress(data) == CHUNK * 4
+
+    def test_large_api_response_is_compressed(self, client: TestClient):
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert "paths" in response.json()
+
+    def test_identity_when_not_accepted(self, client: TestClient):
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_flashcard_list_is_compressed(
+        self, authenticated_client: TestClient, test_db
+    ):
+        """The compressed flashcard list decodes to the same cards"""
+        for chinese in WORDS:
+            authenticated_client.post("/flashcards", json={"chinese": chinese})
+
+        response = authenticated_client.get(
+            "/flashcards", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == len(WORDS)
+
+    def test_empty_list_is_not_compressed(
+        self, authenticated_client: TestClient, test_db
+    ):
+        response = authenticated_client.get(
+            "/flashcards", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.json() == []
+        assert "content-encoding" not in response.headers
@@ -1,7 +1,28 @@
-import pytest
+import json
 
-from backend.db import ExampleDB, FlashcardDB, UserDB
-from backend.tests.conftest import TestingSessionLocal, test_db
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend import auth_routes
+from backend.db import (
+    Base,
+    DefinitionDB,
+    ExampleDB,
+    FlashcardDB,
+    UserDB,
+    add_missing_columns,
+    delete_unused_definitions,
+    grant_admins,
+    migrate_definitions,
+)
+from backend.tests.conftest import (
+    TestingSessionLocal,
+    authenticated_client,
+    client,
+    engine,
+    test_db,
+    test_user,
+)
 
 
 class TestDatabaseModels:
@@ -202,3 +223,181 @@ class TestDatabaseModels:
         assert remaining_examples == 0
 
         db.close()
+
+    def test_definitions_are_shared(self, test_db):
+        """Cards with the same definitions reference a single row"""
+        db = TestingSessionLocal()
+        users = [
+            UserDB(email=f"share{i}@example.com", hashed_password="x") for i in (1, 2)
+        ]
+        db.add_all(users)
+        db.commit()
+
+        for user in users:
+            db.add(
+                FlashcardDB(
+                    chinese="书",
+                    pinyin="shū",
+                    definitions='["book"]',
+                    user_id=user.id,
+                )
+            )
+        db.commit()
+
+        cards = db.query(FlashcardDB).all()
+        assert len(cards) == 2
+        assert cards[0].definition_id == cards[1].definition_id
+        assert db.query(DefinitionDB).count() == 1
+        assert [card.to_dict()["definitions"] for card in cards] == [["book"]] * 2
+
+        db.close()
+
+    def test_definitions_update(self, test_db):
+        """Changing a card's definitions leaves other cards untouched"""
+        db = TestingSessionLocal()
+        user = UserDB(email="update@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+
+        first, second = (
+            FlashcardDB(
+                chinese=chinese,
+                pinyin="hǎo",
+                definitions='["good"]',
+                user_id=user.id,
+            )
+            for chinese in ("好", "好的")
+        )
+        db.add_all([first, second])
+        db.commit()
+
+        first.definitions = '["good", "well"]'
+        db.commit()
+        db.expire_all()
+
+        assert first.to_dict()["definitions"] == ["good", "well"]
+        assert second.to_dict()["definitions"] == ["good"]
+        assert first.definition_id != second.definition_id
+
+        db.close()
+
+    def test_unused_definitions_deleted(self, test_db):
+        """Rows no card uses any more are deleted, shared ones are kept"""
+        db = TestingSessionLocal()
+        user = UserDB(email="unused@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+
+        first, second, third = (
+            FlashcardDB(
+                chinese=chinese, pinyin="", definitions=definitions, user_id=user.id
+            )
+            for chinese, definitions in [
+                ("书", '["book"]'),
+                ("本", '["book"]'),
+                ("吃", '["to eat"]'),
+            ]
+        )
+        db.add_all([first, second, third])
+        db.commit()
+        assert "_pending_definitions" not in first.__dict__
+
+        first.definitions = '["volume"]'
+        db.flush()
+        assert first.definitions == '["volume"]'
+        db.delete(third)
+        db.commit()
+
+        contents = {row.content for row in db.query(DefinitionDB)}
+        assert contents == {'["book"]', '["volume"]'}
+
+        db.query(FlashcardDB).filter(FlashcardDB.id == second.id).delete()
+        db.commit()
+        assert delete_unused_definitions(bind=engine) == 1
+        assert [row.content for row in db.query(DefinitionDB)] == ['["volume"]']
+
+        db.close()
+
+
+class TestAdminRights:
+    """Test cases for granting admin rights"""
+
+    def test_grant_admins(self, test_db):
+        """Test configured addresses are granted rights, others are not"""
+        with TestingSessionLocal() as db:
+            for email in ("ops@example.com", "user@example.com"):
+                db.add(UserDB(email=email, hashed_password="hashed_password"))
+            db.commit()
+
+        assert grant_admins({"ops@example.com"}, bind=engine) == 1
+        assert grant_admins({"ops@example.com"}, bind=engine) == 0
+        with TestingSessionLocal() as db:
+            admins = {user.email: user.is_admin for user in db.query(UserDB)}
+        assert admins == {"ops@example.com": True, "user@example.com": False}
+
+    def test_admin_address_cannot_be_registered(self, client, test_db, monkeypatch):
+        """Test registering a reserved address is refused"""
+        monkeypatch.setattr(auth_routes, "RESERVED_EMAILS", {"ops@example.com"})
+        response = client.post(
+            "/auth/register",
+            json={"email": "Ops@Example.com", "password": "secret123"},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Email is reserved"
+
+    def test_users_listing_requires_admin(self, authenticated_client, test_db):
+        """Test only admins may list the accounts"""
+        assert authenticated_client.get("/auth/users").status_code == 403
+
+
+class TestDefinitionsMigration:
+    """Test cases for moving per-card JSON definitions into a shared table"""
+
+    def test_migrate_legacy_database(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE flashcards (id INTEGER PRIMARY KEY, "
+                    "chinese VARCHAR NOT NULL, pinyin VARCHAR NOT NULL, "
+                    "definitions TEXT NOT NULL, user_id INTEGER NOT NULL)"
+                )
+            )
+            for id, user_id in [(1, 1), (2, 2), (3, 1)]:
+                definitions = json.dumps(["book"] if id < 3 else ["to eat"])
+                connection.execute(
+                    text("INSERT INTO flashcards VALUES (:id, '书', 'shū', :d, :user)"),
+                    {"id": id, "d": definitions, "user": user_id},
+                )
+        Base.metadata.create_all(bind=engine)
+        add_missing_columns(bind=engine)
+
+        migrate_definitions(bind=engine)
+        # Running it again is a no-op
+        migrate_definitions(bind=engine)
+
+        # Backed up once, before the column was dropped
+        [backup] = tmp_path.glob("legacy_backup_*.db")
+        with create_engine(f"sqlite:///{backup}").connect() as connection:
+            legacy = connection.execute(text("SELECT definitions FROM flashcards"))
+            assert len(legacy.all()) == 3
+
+        with engine.connect() as connection:
+            columns = {
+                row[1]
+                for row in connection.execute(text("PRAGMA table_info(flashcards)"))
+            }
+            rows = connection.execute(
+                text(
+                    "SELECT flashcards.id, content FROM flashcards JOIN definitions "
+                    "ON definitions.id = definition_id ORDER BY flashcards.id"
+                )
+            ).all()
+            shared = connection.execute(text("SELECT COUNT(*) FROM definitions"))
+            assert shared.scalar() == 2
+        assert "definitions" not in columns
+        assert [(id, json.loads(content)) for id, content in rows] == [
+            (1, ["book"]),
+            (2, ["book"]),
+            (3, ["to eat"]),
+        ]
@@ -0,0 +1,344 @@
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.tests.conftest import (
+    admin_client,
+    authenticated_client,
+    client,
+    test_db,
+    test_user,
+)
+from chinochau import definitions, dictionary, reverse_index, script
+from chinochau.dictionary import DictionaryStatus, get_dictionary
+from chinochau.script import ScriptConverter, normalize_key
+
+SMALL_CEDICT = """# test dictionary
+你好 你好 [ni3 hao3] /hello/hi/
+測試 测试 [ce4 shi4] /to test/
+"""
+
+
+@pytest.fixture
+def small_cedict(tmp_path, monkeypatch):
+    """A tiny CEDICT file; the shared dictionary is restored afterwards"""
+    get_dictionary()
+    monkeypatch.setattr(dictionary, "_dictionary", dictionary._dictionary)
+    monkeypatch.setattr(dictionary, "status", DictionaryStatus())
+    path = tmp_path / "cedict.txt"
+    path.write_text(SMALL_CEDICT, encoding="utf-8")
+    return str(path)
+
+
+class TestSegmentation:
+    """Test cases for dictionary word segmentation"""
+
+    def test_prefers_evenly_sized_words(self):
+        """Maximum matching picks the segmentation with the fewest words"""
+        tokens = [token.text for token in get_dictionary().segment("研究生命的起源")]
+        assert tokens == ["研究", "生命", "的", "起源"]
+
+    def test_groups_unknown_text(self):
+        """Latin text, whitespace and punctuation are kept as their own tokens"""
+        tokens = list(get_dictionary().segment("学习中文。Hello world"))
+        assert [token.text for token in tokens] == [
+            "学习",
+            "中文",
+            "。",
+            "Hello",
+            " ",
+            "world",
+        ]
+        assert [token.is_word for token in tokens] == [
+            True,
+            True,
+            False,
+            False,
+            False,
+            False,
+        ]
+
+    def test_segmentation_is_lossless(self):
+        """Joining the tokens gives back the original text"""
+        text = "我每天学习中文，T恤很好看! 123 北京大学生前来应聘。" * 50
+        tokens = get_dictionary().segment(text)
+        assert "".join(token.text for token in tokens) == text
+
+
+class TestSegmentEndpoint:
+    """Test cases for the /segment endpoint"""
+
+    def test_segment_api(self, authenticated_client: TestClient, test_db):
+        """Test each token comes back with pinyin and definitions"""
+        response = authenticated_client.post("/segment", json={"chinese": "你好世界"})
+        assert response.status_code == 200
+
+        tokens = response.json()["tokens"]
+        assert [token["text"] for token in tokens] == ["你好", "世界"]
+        for token in tokens:
+            assert token["is_word"] is True
+            assert len(token["pinyin"]) > 0
+            assert len(token["definitions"]) > 0
+
+    def test_segment_api_empty(self, authenticated_client: TestClient, test_db):
+        """Test an empty text gives no tokens"""
+        response = authenticated_client.post("/segment", json={"chinese": ""})
+        assert response.status_code == 200
+        assert response.json() == {"tokens": []}
+
+    def test_segment_api_requires_auth(self, client: TestClient, test_db):
+        """Test the endpoint is protected"""
+        response = client.post("/segment", json={"chinese": "你好"})
+        assert response.status_code == 401
+
+
+class TestComposedDefinitions:
+    """Test cases for the offline compositional definition stage"""
+
+    def test_compose_from_known_words(self):
+        """An unknown compound is defined by its dictionary parts"""
+        composed = definitions.compose_definitions("数不清的")
+        assert composed is not None
+        assert composed[0].startswith("数不清: countless")
+        assert composed[1].startswith("的: ")
+
+    def test_compose_fails_on_unknown_parts(self):
+        """Text the dictionary cannot cover is left to Google"""
+        assert definitions.compose_definitions("hello") is None
+
+    @patch("chinochau.definitions.translate_google", new_callable=AsyncMock)
+    def test_flashcard_avoids_google_for_compounds(
+        self, mock_google, authenticated_client: TestClient, test_db
+    ):
+        """Creating a card for a compound does not reach the network"""
+        composed_before = definitions.counters["composed"]
+
+        response = authenticated_client.post("/flashcards", json={"chinese": "数不清的"})
+        assert response.status_code == 200
+        assert response.json()["definitions"][0].startswith("数不清")
+
+        mock_google.assert_not_called()
+        assert definitions.counters["composed"] == composed_before + 1
+
+    @patch("chinochau.definitions.translate_google", new_callable=AsyncMock)
+    def test_flashcard_falls_back_to_google(
+        self, mock_google, authenticated_client: TestClient, test_db
+    ):
+        """Google is still used when composition is not possible"""
+        mock_google.return_value = ["hello"]
+
+        response = authenticated_client.post("/flashcards", json={"chinese": "hello"})
+        assert response.status_code == 200
+        assert response.json()["definitions"] == ["hello"]
+        mock_google.assert_called_once_with("hello")
+
+
+class TestReverseSearch:
+    """Test cases for English -> Chinese dictionary search"""
+
+    def test_exact_sense_ranks_first(self):
+        """An entry whose sense is exactly the query comes first"""
+        results = get_dictionary().reverse_index.search("hello", 5)
+        assert results[0].entry.simplified == "你好"
+        scores = [result.score for result in results]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_stopwords_are_ignored(self):
+        """Function words do not drown out the meaningful terms"""
+        index = get_dictionary().reverse_index
+        with_stopwords = [r.entry for r in index.search("to the computer", 5)]
+        without = [r.entry for r in index.search("computer", 5)]
+        assert with_stopwords == without
+
+    @pytest.mark.parametrize(
+        "query,word",
+        [("to study", "学习"), ("to learn", "学习"), ("teacher", "老师")]
+        + [("to sleep", "睡觉"), ("beautiful", "美丽"), ("money", "钱")],
+    )
+    def test_common_words_rank_high(self, query, word):
+        """Common words with a matching sense are in the top results"""
+        results = get_dictionary().reverse_index.search(query, 5)
+        assert word in [result.entry.simplified for result in results]
+
+    def test_whole_gloss_beats_partial_match(self):
+        """A sense that is exactly the query outranks one that contains it"""
+        results = get_dictionary().reverse_index.search("to study", 20)
+        exact = ["to study" in result.entry.definitions for result in results]
+        assert exact == sorted(exact, reverse=True)
+        assert exact[0]
+
+    def test_scans_are_bounded(self):
+        """Stopword-only queries scan a bounded number of postings"""
+        index = get_dictionary().reverse_index
+        assert len(index.postings["to"][0]) > reverse_index.MAX_POSTINGS
+        assert len(index.search("to", 100000)) <= reverse_index.MAX_POSTINGS
+        query = "to of a the in on for with and"
+        assert len(index.search(query, 100000)) <= reverse_index.MAX_SCANNED
+
+    def test_search_api(self, authenticated_client: TestClient, test_db):
+        """Test the search endpoint returns ranked entries"""
+        response = authenticated_client.get(
+            "/dictionary/search", params={"q": "apple", "limit": 3}
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["total"] == 3
+        assert "苹果" in [result["simplified"] for result in data["results"]]
+        for result in data["results"]:
+            assert result["pinyin"]
+            assert result["definitions"]
+
+    def test_search_api_no_match(self, authenticated_client: TestClient, test_db):
+        """Test a query without matches returns no results"""
+        response = authenticated_client.get("/dictionary/search", params={"q": "qqzx"})
+        assert response.status_code == 200
+        assert response.json() == {"results": [], "total": 0}
+
+    def test_search_api_requires_query(self, authenticated_client: TestClient, test_db):
+        """Test the query parameter is mandatory"""
+        response = authenticated_client.get("/dictionary/search")
+        assert response.status_code == 422
+
+
+class TestSuggest:
+    """Test cases for search-as-you-type suggestions"""
+
+    @pytest.mark.parametrize("prefix", ["nihao", "ni3hao3", "Nǐ hǎo", "你好"])
+    def test_pinyin_and_chinese_prefixes(self, prefix):
+        """Toneless, numbered and accented pinyin and Chinese all work"""
+        words = [e.simplified for e in get_dictionary().prefix_index.suggest(prefix)]
+        assert words[0] == "你好"
+
+    def test_one_suggestion_per_word(self):
+        """Words with several entries are only suggested once"""
+        words = [e.simplified for e in get_dictionary().prefix_index.suggest("n", 50)]
+        assert len(words) == len(set(words)) == 50
+
+    def test_common_words_first(self):
+        """Characters that form many words outrank rare ones"""
+        words = [e.simplified for e in get_dictionary().prefix_index.suggest("学")]
+        assert words[0] == "学"
+        assert "学习" in words
+
+    def test_suggest_api(self, authenticated_client: TestClient, test_db):
+        """Test the suggest endpoint"""
+        response = authenticated_client.get(
+            "/suggest", params={"prefix": "zhongguo", "limit": 3}
+        )
+        assert response.status_code == 200
+
+        suggestions = response.json()["suggestions"]
+        assert len(suggestions) == 3
+        assert suggestions[0]["simplified"] == "中国"
+        assert suggestions[0]["definitions"]
+
+    def test_suggest_api_no_match(self, authenticated_client: TestClient, test_db):
+        """Test prefixes with nothing to suggest"""
+        response = authenticated_client.get("/suggest", params={"prefix": "123"})
+        assert response.status_code == 200
+        assert response.json() == {"suggestions": []}
+
+
+class TestScriptConversion:
+    """Test cases for traditional/simplified conversion"""
+
+    def test_words_and_characters(self):
+        """Known words use their own entry, other text is converted per character"""
+        converter = get_dictionary().script_converter
+        assert converter.to_simplified("學習") == "学习"
+        assert converter.to_traditional("头发") == "頭髮"
+        assert converter.to_traditional("发展") == "發展"
+        assert converter.to_simplified("我們學習中文") == "我们学习中文"
+
+    def test_round_trip(self):
+        """Converting back and forth gives the original word"""
+        converter = get_dictionary().script_converter
+        assert converter.to_traditional(converter.to_simplified("乾燥")) == "乾燥"
+
+    def test_original_is_unchanged(self):
+        converter = get_dictionary().script_converter
+        assert converter.convert("學習", "original") == "學習"
+        assert converter.convert("學習", "simplified") == "学习"
+
+    def test_keys_without_loading_dictionary(self, small_cedict, monkeypatch):
+        """Keys are normalized from the headwords alone before the dictionary loads"""
+        monkeypatch.setattr(dictionary, "_dictionary", None)
+        monkeypatch.setattr(dictionary, "CEDICT_PATH", small_cedict)
+        monkeypatch.setattr(script, "_key_converter", None)
+        assert normalize_key("測試") == "测试"
+        assert normalize_key("測") == "测"
+        assert dictionary.loaded_dictionary() is None
+
+    def test_file_tables_match_dictionary(self):
+        from_file = ScriptConverter.from_file(dictionary.CEDICT_PATH)
+        converter = get_dictionary().script_converter
+        for text in ("學習", "头发", "我們學習中文", "乾燥"):
+            assert from_file.to_simplified(text) == converter.to_simplified(text)
+            assert from_file.to_traditional(text) == converter.to_traditional(text)
+
+
+class TestDictionaryReload:
+    """Test cases for swapping in updated dictionary data"""
+
+    def test_reload_swaps_dictionary(self, small_cedict):
+        """Lookups see the new data once the reload completes"""
+        previous = get_dictionary()
+
+        report = dictionary.reload_dictionary(small_cedict)
+        assert report.entries == 2
+        assert report.build_seconds is not None
+        assert report.path == small_cedict
+
+        current = get_dictionary()
+        assert current is not previous
+        assert current.lookup("测试") == ["to test"]
+        assert current.lookup("學習") is None
+        # A request that started before the swap keeps its dictionary
+        assert previous.lookup("学习") is not None
+
+    def test_failed_reload_keeps_current_dictionary(self, small_cedict):
+        """A broken file leaves the serving dictionary untouched"""
+        previous = get_dictionary()
+        with pytest.raises(OSError):
+            dictionary.reload_dictionary(small_cedict + ".missing")
+        assert get_dictionary() is previous
+        assert dictionary.status.error is not None
+
+    def test_reload_api(self, admin_client: TestClient, small_cedict, monkeypatch):
+        """Test the admin endpoint reloads in the background"""
+        monkeypatch.setattr(dictionary, "CEDICT_DIR", os.path.dirname(small_cedict))
+        response = admin_client.post(
+            "/admin/dictionary/reload", json={"path": "cedict.txt"}
+        )
+        assert response.status_code == 202
+
+        deadline = time.monotonic() + 10
+        while dictionary.status.reloading and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        response = admin_client.get("/admin/dictionary")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["reloading"] is False
+        assert data["entries"] == 2
+        assert data["path"] == small_cedict
+        assert data["build_seconds"] >= 0
+
+    @pytest.mark.parametrize("path", ["/etc/passwd", "../cedict.txt"])
+    def test_reload_api_outside_data_directory(
+        self, admin_client: TestClient, small_cedict, monkeypatch, path
+    ):
+        """Test files outside the dictionary directory are refused"""
+        monkeypatch.setattr(dictionary, "CEDICT_DIR", os.path.dirname(small_cedict))
+        response = admin_client.post("/admin/dictionary/reload", json={"path": path})
+        assert response.status_code == 400
+        assert not dictionary.status.reloading
+
+    def test_reload_api_requires_admin(self, authenticated_client: TestClient, test_db):
+        """Test regular users cannot trigger a reload"""
+        response = authenticated_client.post("/admin/dictionary/reload")
+        assert response.status_code == 403
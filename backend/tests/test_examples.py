@@ -3,6 +3,7 @@ from unittest.mock import patch
 import pytest
 from fastapi.testclient import TestClient
 
+from backend.core.limits import ExampleLimiter, admissions, example_limiter
 from backend.tests.conftest import (
     authenticated_client,
     client,
@@ -241,3 +242,90 @@ class TestExampleEndpoints:
         data = response.json()
         assert data["examples"] == []
         assert data["total"] == 0
+
+
+class TestExampleLimits:
+    """Test cases for limiting example generation"""
+
+    def test_token_bucket_refills(self):
+        now = [0.0]
+        limiter = ExampleLimiter(burst=4, per_minute=60, clock=lambda: now[0])
+        assert limiter.take(1, 3) == 0
+        assert limiter.take(1, 3) == pytest.approx(2.0)
+        # Other users have their own allowance
+        assert limiter.take(2, 4) == 0
+        now[0] = 2.0
+        assert limiter.take(1, 3) == 0
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_rate_limited_with_retry_after(
+        self,
+        mock_deepseek,
+        authenticated_client: TestClient,
+        test_db,
+        sample_flashcard_data,
+        monkeypatch,
+    ):
+        mock_deepseek.return_value = ["你好！"]
+        monkeypatch.setattr(example_limiter, "burst", 3)
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json=sample_flashcard_data
+        ).json()["id"]
+        request_data = {"flashcard_id": flashcard_id, "count": 2}
+        before = admissions.value("rate_limited")
+
+        assert (
+            authenticated_client.post("/examples", json=request_data).status_code == 200
+        )
+        response = authenticated_client.post("/examples", json=request_data)
+        assert response.status_code == 429
+        # One example short, at 10 per minute
+        assert response.headers["retry-after"] == "6"
+        assert mock_deepseek.call_count == 1
+        assert admissions.value("rate_limited") == before + 1
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_failed_generation_refunded(
+        self,
+        mock_deepseek,
+        authenticated_client: TestClient,
+        test_db,
+        sample_flashcard_data,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(example_limiter, "burst", 3)
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json=sample_flashcard_data
+        ).json()["id"]
+        request_data = {"flashcard_id": flashcard_id, "count": 3}
+
+        mock_deepseek.side_effect = Exception("API Error")
+        response = authenticated_client.post("/examples", json=request_data)
+        assert response.status_code == 500
+        assert example_limiter.in_flight == 0
+
+        mock_deepseek.side_effect = None
+        mock_deepseek.return_value = ["你好！", "你好吗？", "你好，朋友。"]
+        response = authenticated_client.post("/examples", json=request_data)
+        assert response.status_code == 200
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_busy_when_concurrency_cap_reached(
+        self,
+        mock_deepseek,
+        authenticated_client: TestClient,
+        test_db,
+        sample_flashcard_data,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(example_limiter, "in_flight", example_limiter.concurrency)
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json=sample_flashcard_data
+        ).json()["id"]
+
+        response = authenticated_client.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 1}
+        )
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        mock_deepseek.assert_not_called()
@@ -1,7 +1,14 @@
+from typing import List
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
 
+from backend.db import FlashcardDB, UserDB
+from backend.models import FlashcardModel
 from backend.tests.conftest import (
+    TestingSessionLocal,
     authenticated_client,
     client,
     sample_flashcard_data,
@@ -95,3 +102,155 @@ class TestFlashcardEndpoints:
 
         # Should return the same flashcard
         assert first_id == second_id
+
+
+class TestFlashcardSearch:
+    """Test cases for full-text search over a user's flashcards"""
+
+    @pytest.fixture
+    def deck(self, authenticated_client: TestClient, test_db):
+        for chinese in ["学习", "学生", "你好", "电脑"]:
+            response = authenticated_client.post(
+                "/flashcards", json={"chinese": chinese}
+            )
+            assert response.status_code == 200
+        return authenticated_client
+
+    def test_search_by_chinese(self, deck: TestClient):
+        """Chinese queries match cards containing the characters"""
+        response = deck.get("/flashcards/search", params={"q": "学"})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["total"] == 2
+        assert {card["chinese"] for card in data["results"]} == {"学习", "学生"}
+
+    @pytest.mark.parametrize("query", ["xuexi", "xué xí", "xue2xi2", "xuex"])
+    def test_search_by_toneless_pinyin(self, deck: TestClient, query):
+        """Pinyin matches regardless of tones, spacing and prefixes"""
+        response = deck.get("/flashcards/search", params={"q": query})
+        assert response.status_code == 200
+        assert [card["chinese"] for card in response.json()["results"]] == ["学习"]
+
+    def test_search_by_definition(self, deck: TestClient):
+        """English queries match the definitions"""
+        response = deck.get("/flashcards/search", params={"q": "computer"})
+        assert response.status_code == 200
+        assert [card["chinese"] for card in response.json()["results"]] == ["电脑"]
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_search_by_example(self, mock_deepseek, deck: TestClient):
+        """Generated examples are indexed with their flashcard"""
+        mock_deepseek.return_value = ["我在图书馆用电脑。"]
+        card = deck.get("/flashcards/电脑").json()
+        response = deck.post("/examples", json={"flashcard_id": card["id"], "count": 1})
+        assert response.status_code == 200
+
+        response = deck.get("/flashcards/search", params={"q": "图书馆"})
+        assert [card["chinese"] for card in response.json()["results"]] == ["电脑"]
+
+    def test_search_pagination(self, deck: TestClient):
+        """Results are paginated with a stable total"""
+        first = deck.get("/flashcards/search", params={"q": "xue", "limit": 1})
+        second = deck.get(
+            "/flashcards/search", params={"q": "xue", "limit": 1, "offset": 1}
+        )
+        assert first.json()["total"] == second.json()["total"] == 2
+        assert len(first.json()["results"]) == 1
+        assert first.json()["results"] != second.json()["results"]
+
+    def test_search_only_own_cards(self, deck: TestClient, test_db):
+        """Other users' cards never show up"""
+        db = TestingSessionLocal()
+        try:
+            other = UserDB(email="other@example.com", hashed_password="x")
+            db.add(other)
+            db.commit()
+            db.add(
+                FlashcardDB(
+                    chinese="学校",
+                    pinyin="xuéxiào",
+                    definitions='["school"]',
+                    user_id=other.id,
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        response = deck.get("/flashcards/search", params={"q": "xuexiao"})
+        assert response.json()["total"] == 0
+
+
+class TestFlashcardScripts:
+    """Test cases for traditional/simplified handling of flashcards"""
+
+    def test_either_script_finds_card(self, authenticated_client: TestClient, test_db):
+        """A card added in simplified is found with its traditional form"""
+        created = authenticated_client.post("/flashcards", json={"chinese": "学习"})
+        assert created.status_code == 200
+
+        response = authenticated_client.get("/flashcards/學習")
+        assert response.status_code == 200
+        assert response.json()["id"] == created.json()["id"]
+        assert response.json()["chinese"] == "学习"
+
+    def test_no_duplicate_across_scripts(
+        self, authenticated_client: TestClient, test_db
+    ):
+        """Adding the traditional form returns the existing card"""
+        first = authenticated_client.post("/flashcards", json={"chinese": "学习"})
+        second = authenticated_client.post("/flashcards", json={"chinese": "學習"})
+        assert first.json()["id"] == second.json()["id"]
+        assert len(authenticated_client.get("/flashcards").json()) == 1
+
+    def test_display_script(self, authenticated_client: TestClient, test_db):
+        """Cards can be rendered in either script"""
+        authenticated_client.post("/flashcards", json={"chinese": "头发"})
+
+        response = authenticated_client.get(
+            "/flashcards", params={"script": "traditional"}
+        )
+        assert [card["chinese"] for card in response.json()] == ["頭髮"]
+
+        response = authenticated_client.get(
+            "/flashcards/頭髮", params={"script": "simplified"}
+        )
+        assert response.json()["chinese"] == "头发"
+
+    def test_search_across_scripts(self, authenticated_client: TestClient, test_db):
+        """Traditional queries match simplified cards"""
+        authenticated_client.post("/flashcards", json={"chinese": "学习"})
+        response = authenticated_client.get("/flashcards/search", params={"q": "學"})
+        assert [card["chinese"] for card in response.json()["results"]] == ["学习"]
+
+    def test_invalid_script(self, authenticated_client: TestClient, test_db):
+        response = authenticated_client.get("/flashcards", params={"script": "latin"})
+        assert response.status_code == 422
+
+
+class TestListSerialization:
+    """Test cases for list endpoints that skip response model validation"""
+
+    def test_list_matches_response_model(
+        self, authenticated_client: TestClient, test_db
+    ):
+        """The fast path produces exactly what the response model would"""
+        for chinese in ["学习", "你好"]:
+            authenticated_client.post("/flashcards", json={"chinese": chinese})
+
+        response = authenticated_client.get("/flashcards")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+
+        data = response.json()
+        adapter = TypeAdapter(List[FlashcardModel])
+        assert adapter.dump_python(adapter.validate_python(data)) == data
+        assert [card["chinese"] for card in data] == ["学习", "你好"]
+
+    def test_schema_keeps_response_model(self, client: TestClient):
+        """OpenAPI still documents the list item model"""
+        schema = client.get("/openapi.json").json()
+        response = schema["paths"]["/flashcards"]["get"]["responses"]["200"]
+        items = response["content"]["application/json"]["schema"]["items"]
+        assert items["$ref"].endswith("/FlashcardModel")
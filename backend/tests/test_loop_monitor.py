@@ -0,0 +1,149 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.auth import create_access_token
+from backend.core import warmup
+from backend.core.loop_monitor import LoopMonitor, Stall, loop_monitor, stall_duration
+from backend.services.flashcard_service import FlashcardService
+from backend.tests.conftest import (
+    admin_client,
+    client,
+    monitored_client,
+    sample_flashcard_data,
+    test_db,
+    test_user,
+)
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+def log_in(client: TestClient, user):
+    token = create_access_token({"sub": user.email})
+    client.headers.update({"Authorization": f"Bearer {token}"})
+
+
+async def watch(monitor: LoopMonitor, work):
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        await work()
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+
+class TestLoopMonitor:
+    """Test cases for detecting event loop stalls"""
+
+    def test_stall_detected_with_stack(self):
+        monitor = LoopMonitor(threshold=0.05)
+
+        async def work():
+            blocking_call()
+
+        asyncio.run(watch(monitor, work))
+        assert len(monitor.stalls) == 1
+        stall = monitor.stalls[0]
+        assert 0.2 < stall.seconds < 0.5
+        assert stall.location == "backend/tests/test_loop_monitor.py:blocking_call"
+        assert "time.sleep(0.3)" in stall.stack[-1]
+        assert stall_duration.count(stall.location) >= 1
+
+    def test_no_stall_when_awaiting(self):
+        monitor = LoopMonitor(threshold=0.05)
+
+        async def work():
+            await asyncio.sleep(0.3)
+            await asyncio.to_thread(blocking_call)
+
+        asyncio.run(watch(monitor, work))
+        assert len(monitor.stalls) == 0
+
+    def test_disabled(self):
+        monitor = LoopMonitor(threshold=0)
+
+        async def work():
+            monitor.start()
+            assert not monitor.running
+
+        asyncio.run(work())
+
+
+class TestAsyncRoutes:
+    """Test cases keeping blocking work out of async handlers"""
+
+    def test_auth_does_not_block(self, monitored_client: TestClient):
+        user = {"email": "loop@example.com", "password": "secret", "full_name": "L"}
+        assert monitored_client.post("/auth/register", json=user).status_code == 200
+        response = monitored_client.post(
+            "/auth/login", data={"username": user["email"], "password": "secret"}
+        )
+        assert response.status_code == 200
+        assert [stall.location for stall in loop_monitor.stalls] == []
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_examples_do_not_block(
+        self, mock_deepseek, monitored_client: TestClient, test_user
+    ):
+        mock_deepseek.return_value = ["你好！"]
+        # Loaded by warm-up before serving, here in the test's thread
+        warmup.warm_dictionary()
+        warmup.warm_pinyin()
+        # which held the GIL, starving the loop's thread
+        loop_monitor.clear()
+        log_in(monitored_client, test_user)
+        flashcard_id = monitored_client.post(
+            "/flashcards", json={"chinese": "你好"}
+        ).json()["id"]
+        response = monitored_client.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 1}
+        )
+        assert response.status_code == 200
+        assert [stall.location for stall in loop_monitor.stalls] == []
+
+    def test_flashcard_creation_does_not_block(
+        self, monitored_client: TestClient, test_user
+    ):
+        find_flashcard = FlashcardService.find_flashcard
+
+        def slow_find(*args):
+            blocking_call()
+            return find_flashcard(*args)
+
+        log_in(monitored_client, test_user)
+        with patch.object(FlashcardService, "find_flashcard", slow_find):
+            response = monitored_client.post("/flashcards", json={"chinese": "你好"})
+            assert response.status_code == 200
+            again = monitored_client.post("/flashcards", json={"chinese": "你好"})
+        assert again.json()["id"] == response.json()["id"]
+        assert [stall.location for stall in loop_monitor.stalls] == []
+
+    def test_blocking_handler_reported(self, monitored_client: TestClient, test_user):
+        async def blocking_pinyin(chinese):
+            blocking_call()
+            return "nǐ hǎo"
+
+        log_in(monitored_client, test_user)
+        with patch(
+            "backend.services.translation_service.TranslationService.get_pinyin",
+            blocking_pinyin,
+        ):
+            response = monitored_client.post("/pinyin", json={"chinese": "你好"})
+        assert response.json() == {"pinyin": "nǐ hǎo"}
+        assert [stall.location for stall in loop_monitor.stalls] == [
+            "backend/tests/test_loop_monitor.py:blocking_call"
+        ]
+
+    def test_admin_stalls(self, admin_client: TestClient, monkeypatch):
+        monkeypatch.setattr(loop_monitor, "stalls", [])
+        loop_monitor.stalls.append(
+            Stall(time.time(), 0.2, "backend/auth.py:verify_password", ["x"])
+        )
+        response = admin_client.get("/admin/stalls")
+        assert response.status_code == 200
+        assert response.json()[0]["location"] == "backend/auth.py:verify_password"
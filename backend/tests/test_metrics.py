@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.metrics import request_count
+from backend.tests.conftest import authenticated_client, client, test_db, test_user
+from chinochau import metrics
+from chinochau.metrics import dependency_duration, timed
+
+
+class TestMetricTypes:
+    """Test cases for the metric primitives"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram(
+            "test_histogram_seconds", "Test.", ["kind"], buckets=(0.1, 1.0)
+        )
+        try:
+            for value in (0.05, 0.5, 0.5, 5.0):
+                histogram.observe(value, "a")
+            samples = {
+                (name, labels.get("le")): value
+                for name, labels, value in histogram.samples()
+            }
+        finally:
+            del metrics._registry["test_histogram_seconds"]
+
+        assert samples[("test_histogram_seconds_bucket", "0.1")] == 1
+        assert samples[("test_histogram_seconds_bucket", "1.0")] == 3
+        assert samples[("test_histogram_seconds_bucket", "+Inf")] == 4
+        assert samples[("test_histogram_seconds_count", None)] == 4
+        assert samples[("test_histogram_seconds_sum", None)] == pytest.approx(6.05)
+
+    def test_timed_records_outcome(self):
+        @timed("test_dependency")
+        def fails():
+            raise ValueError("boom")
+
+        @timed("test_dependency")
+        async def works():
+            return 42
+
+        before_ok = dependency_duration.count("test_dependency", "ok")
+        before_error = dependency_duration.count("test_dependency", "error")
+        with pytest.raises(ValueError):
+            fails()
+        assert asyncio.run(works()) == 42
+
+        assert dependency_duration.count("test_dependency", "ok") == before_ok + 1
+        assert dependency_duration.count("test_dependency", "error") == before_error + 1
+
+    def test_label_values_are_escaped(self):
+        assert metrics._format_labels({"path": 'a"b\\c'}) == '{path="a\\"b\\\\c"}'
+
+
+class TestMetricsEndpoint:
+    """Test cases for the /metrics endpoint"""
+
+    def test_requests_counted_by_route_template(
+        self, authenticated_client: TestClient, test_db
+    ):
+        labels = ("GET", "/flashcards/{chinese}", "404")
+        before = request_count.value(*labels)
+        authenticated_client.get("/flashcards/不存在")
+        authenticated_client.get("/flashcards/也不存在")
+        assert request_count.value(*labels) == before + 2
+
+    def test_metrics_output(self, authenticated_client: TestClient, test_db):
+        authenticated_client.get("/flashcards")
+        response = authenticated_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+        text = response.text
+        assert "# TYPE chinochau_http_request_duration_seconds histogram" in text
+        assert 'route="/flashcards",status="200"' in text
+        assert 'dependency="sql",outcome="ok"' in text
+        assert 'chinochau_db_pool_connections{state="size"}' in text
+        assert 'chinochau_threadpool_threads{state="max"}' in text
+        assert 'chinochau_cache_hit_ratio{cache="pinyin"}' in text
+
+    def test_bcrypt_is_tracked(self, client: TestClient, test_db):
+        before = dependency_duration.count("bcrypt", "ok")
+        client.post(
+            "/auth/register",
+            json={"email": "metrics@example.com", "password": "secret123"},
+        )
+        assert dependency_duration.count("bcrypt", "ok") > before
@@ -0,0 +1,144 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core import popularity
+from backend.core.limits import example_limiter
+from backend.db import FlashcardDB, UserDB
+from backend.services.example_service import add_to_pool, example_pool
+from backend.tests.conftest import (
+    TestingSessionLocal,
+    admin_client,
+    authenticated_client,
+    client,
+    test_db,
+    test_user,
+)
+from chinochau.translate_google import TranslationUnavailable
+
+# Word -> users with a card for it
+DECKS = {"你好": 3, "学习": 2, "考试": 1}
+
+
+@pytest.fixture
+def popular_cards(test_db, monkeypatch):
+    """Cards for the same words from several users"""
+    monkeypatch.setattr(popularity, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(popularity, "PREWARM_PAUSE", 0)
+    db = TestingSessionLocal()
+    try:
+        users = [
+            UserDB(email=f"user{number}@example.com", hashed_password="x")
+            for number in range(3)
+        ]
+        db.add_all(users)
+        db.flush()
+        for word, count in DECKS.items():
+            for user in users[:count]:
+                db.add(
+                    FlashcardDB(
+                        chinese=word,
+                        pinyin="",
+                        definitions='["definition"]',
+                        user_id=user.id,
+                    )
+                )
+        db.commit()
+    finally:
+        db.close()
+
+
+class TestWordStats:
+    """Test cases for counting popular words"""
+
+    def test_refresh_word_stats(self, popular_cards):
+        with TestingSessionLocal() as db:
+            assert popularity.refresh_word_stats(db, limit=2) == 2
+            stats = popularity.popular_words(db)
+        assert [(row.chinese, row.users, row.cards) for row in stats] == [
+            ("你好", 3, 3),
+            ("学习", 2, 2),
+        ]
+
+    @patch("backend.core.popularity.prewarm", new_callable=AsyncMock)
+    def test_skips_fresh_stats(self, mock_prewarm, popular_cards):
+        assert asyncio.run(popularity.run_once(3600)) == ["你好", "学习", "考试"]
+        # Refreshed moments ago, by this or another worker
+        assert asyncio.run(popularity.run_once(3600)) is None
+        assert mock_prewarm.call_count == 1
+
+    def test_admin_endpoint(self, popular_cards, admin_client: TestClient):
+        with TestingSessionLocal() as db:
+            popularity.refresh_word_stats(db)
+        response = admin_client.get("/admin/popular-words", params={"limit": 1})
+        assert response.status_code == 200
+        assert response.json()[0]["chinese"] == "你好"
+        assert response.json()[0]["users"] == 3
+
+    def test_admin_only(self, authenticated_client: TestClient):
+        assert authenticated_client.get("/admin/popular-words").status_code == 403
+
+
+class TestPrewarm:
+    """Test cases for resolving popular words ahead of time"""
+
+    @patch("backend.core.popularity.get_definitions", new_callable=AsyncMock)
+    @patch("backend.core.popularity.get_examples_deepseek")
+    def test_prewarm(self, mock_deepseek, mock_definitions, popular_cards):
+        mock_deepseek.return_value = ["你好！", "你好吗？"]
+        asyncio.run(popularity.prewarm(["你好", "学习"], example_words=1))
+        assert [call.args[0] for call in mock_definitions.call_args_list] == [
+            "你好",
+            "学习",
+        ]
+        mock_deepseek.assert_called_once_with("你好", popularity.POPULAR_EXAMPLES)
+        assert example_pool.get("你好") == ["你好！", "你好吗？"]
+
+    @patch("backend.core.popularity.get_examples_deepseek")
+    def test_prewarmed_pool_in_either_script(self, mock_deepseek, popular_cards):
+        add_to_pool("學習", [f"學習{n}" for n in range(popularity.POPULAR_EXAMPLES)])
+        assert asyncio.run(popularity.prewarm_examples("学习"))
+        mock_deepseek.assert_not_called()
+
+    @patch("backend.core.popularity.get_definitions", new_callable=AsyncMock)
+    @patch("backend.core.popularity.get_examples_deepseek")
+    def test_users_generating_first(
+        self, mock_deepseek, mock_definitions, popular_cards, monkeypatch
+    ):
+        monkeypatch.setattr(example_limiter, "in_flight", 1)
+        asyncio.run(popularity.prewarm(["你好"]))
+        mock_deepseek.assert_not_called()
+        assert popularity.prewarmed.value("skipped") >= 1
+
+    @patch("backend.core.popularity.get_definitions", new_callable=AsyncMock)
+    @patch("backend.core.popularity.get_examples_deepseek")
+    def test_stops_translating_when_unavailable(
+        self, mock_deepseek, mock_definitions, popular_cards
+    ):
+        mock_definitions.side_effect = TranslationUnavailable("open", 30)
+        mock_deepseek.return_value = []
+        asyncio.run(popularity.prewarm(["钦诺肖", "学习"], example_words=0))
+        assert mock_definitions.call_count == 1
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    @patch("backend.core.popularity.get_examples_deepseek")
+    def test_new_user_served_from_prewarmed_examples(
+        self,
+        mock_prewarm_deepseek,
+        mock_deepseek,
+        popular_cards,
+        authenticated_client: TestClient,
+    ):
+        mock_prewarm_deepseek.return_value = ["你好！", "你好吗？", "你好，朋友。"]
+        asyncio.run(popularity.run_once(3600))
+
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json={"chinese": "你好"}
+        ).json()["id"]
+        response = authenticated_client.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 2}
+        )
+        assert response.status_code == 200
+        mock_deepseek.assert_not_called()
@@ -0,0 +1,172 @@
+import contextvars
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from backend.auth import create_access_token
+from backend.core import profiling
+from backend.core.profiling import categorize
+from backend.tests.conftest import (
+    admin_client,
+    authenticated_client,
+    client,
+    test_db,
+    test_user,
+)
+from chinochau import tracing
+
+
+def frame(module, function):
+    """A stand-in for a stack frame"""
+    return SimpleNamespace(
+        f_globals={"__name__": module}, f_code=SimpleNamespace(co_name=function)
+    )
+
+
+class TestCategorize:
+    """Test cases for assigning sampled stacks to categories"""
+
+    def test_innermost_match_wins(self):
+        stack = [
+            frame("fastapi.routing", "serialize_response"),
+            frame("fastapi._compat", "validate"),
+            frame("sqlalchemy.engine.base", "execute"),
+        ]
+        assert categorize(stack) == "sql"
+        assert categorize(stack[:2]) == "validation"
+
+    def test_serialization(self):
+        stack = [
+            frame("backend.responses", "render"),
+            frame("json.encoder", "encode"),
+        ]
+        assert categorize(stack) == "serialization"
+
+    def test_pydantic_models_are_validation(self):
+        stack = [
+            frame("backend.services.flashcard_service", "to_model"),
+            frame("pydantic.main", "__init__"),
+        ]
+        assert categorize(stack) == "validation"
+
+    def test_app_code(self):
+        assert categorize([frame("chinochau.pinyin", "to_pinyin")]) == "app"
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def request_work():
+    with tracing.span("request_work"):
+        busy(0.1)
+
+
+def other_work():
+    busy(0.1)
+
+
+class TestSampling:
+    """Test cases for finding the threads working on a profiled request"""
+
+    def test_samples_threads_that_check_in(self, monkeypatch):
+        """A worker opening a span of the request is sampled, others are not"""
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+        monkeypatch.setattr(tracing, "exporters", [])
+        profile = profiling.Profile(0.001)
+        token = profiling._current_profile.set(profile)
+        try:
+            with tracing.trace("test"):
+                context = contextvars.copy_context()
+            profile.start()
+            threads = [
+                threading.Thread(target=context.run, args=(request_work,)),
+                threading.Thread(target=other_work),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            profile.stop()
+        finally:
+            profiling._current_profile.reset(token)
+
+        functions = {label.partition(" ")[0] for label in profile.tree}
+        assert functions == {"request_work"}
+        assert profile.counts["app"] > 0
+        assert profile.entries == {}
+
+
+class TestProfiling:
+    """Test cases for profiling requests with the X-Profile header"""
+
+    def test_profile_request(self, admin_client: TestClient):
+        admin_client.post("/flashcards", json={"chinese": "学习"})
+        response = admin_client.get("/flashcards", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+
+        response = admin_client.get(f"/admin/profiles/{profile_id}")
+        assert response.status_code == 200
+        report = response.json()
+        assert report["path"] == "/flashcards"
+        assert report["status"] == 200
+        assert set(report["breakdown_ms"]) == set(profiling.CATEGORIES)
+        assert report["dependencies_ms"]["sql"] > 0
+        assert report["call_tree"]["function"] == "request"
+
+        listed = admin_client.get("/admin/profiles").json()
+        assert listed[0]["id"] == profile_id
+
+    def test_profiled_requests_are_traced(self, admin_client: TestClient, monkeypatch):
+        exporter = tracing.MemoryExporter()
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+        monkeypatch.setattr(tracing, "exporters", [exporter])
+        admin_client.get("/flashcards", headers={"X-Profile": "1"})
+        [report] = exporter.traces
+        assert report["sampled"]
+        assert "get_flashcards" in {span["name"] for span in report["spans"]}
+
+    def test_not_profiled_without_header(self, admin_client: TestClient):
+        response = admin_client.get("/flashcards")
+        assert "x-profile-id" not in response.headers
+
+    def test_header_ignored_for_other_users(
+        self, authenticated_client: TestClient, test_db
+    ):
+        response = authenticated_client.get("/flashcards", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+
+    def test_header_ignored_for_admin_address_without_rights(
+        self, client: TestClient, test_db
+    ):
+        # A token naming the admin address doesn't make an admin by itself
+        token = create_access_token(data={"sub": "admin@chinochau.local"})
+        response = client.get(
+            "/ready", headers={"X-Profile": "1", "Authorization": f"Bearer {token}"}
+        )
+        assert "x-profile-id" not in response.headers
+
+    def test_profiles_require_admin(self, authenticated_client: TestClient, test_db):
+        response = authenticated_client.get("/admin/profiles")
+        assert response.status_code == 403
+
+    def test_unknown_profile(self, admin_client: TestClient):
+        response = admin_client.get("/admin/profiles/unknown")
+        assert response.status_code == 404
+
+    def test_profile_id_names_worker(self, admin_client: TestClient):
+        response = admin_client.get("/flashcards", headers={"X-Profile": "1"})
+        profile_id = response.headers["x-profile-id"]
+        assert profiling.profile_worker(profile_id) == os.getpid()
+
+    def test_profile_kept_by_another_worker(self, admin_client: TestClient):
+        response = admin_client.get("/admin/profiles/1-0123456789ab")
+        assert response.status_code == 404
+        assert "worker 1" in response.json()["detail"]
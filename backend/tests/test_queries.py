@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.core import queries
+from backend.core.queries import count_queries, statement_shape
+from backend.db import FlashcardDB
+from backend.search import SEARCH_TABLE
+from backend.tests.conftest import (
+    TestingSessionLocal,
+    admin_client,
+    authenticated_client,
+    client,
+    test_db,
+    test_user,
+)
+
+WORDS = ["你好", "学习", "考试", "中文", "朋友", "老师", "学生", "电脑", "手机", "水"]
+
+
+@pytest.fixture
+def add_cards(authenticated_client: TestClient):
+    def add(words):
+        for word in words:
+            response = authenticated_client.post("/flashcards", json={"chinese": word})
+            assert response.status_code == 200
+
+    return add
+
+
+class TestQueryStats:
+    """Test cases for counting, timing and explaining SQL statements"""
+
+    def test_statement_shape(self):
+        assert statement_shape(
+            "SELECT *\n  FROM examples WHERE id IN (?, ?, ?) LIMIT 10"
+        ) == statement_shape("SELECT * FROM examples WHERE id IN (?, ?) LIMIT 20")
+
+    def test_count_queries(self, test_db):
+        with count_queries() as stats:
+            with TestingSessionLocal() as db:
+                for id in range(3):
+                    db.get(FlashcardDB, id)
+        assert stats.count == 3
+        assert stats.seconds > 0
+        assert stats.repeated(2) == [next(iter(stats.shapes))]
+        assert stats.repeated(3) == []
+
+    def test_slow_query_explained(self, test_db, monkeypatch):
+        monkeypatch.setattr(queries, "SLOW_QUERY_MS", 1e-6)
+        monkeypatch.setattr(queries, "slow_queries", queries.deque())
+        with count_queries() as stats:
+            with TestingSessionLocal() as db:
+                db.execute(select(FlashcardDB.id).where(FlashcardDB.pinyin == "nǐ hǎo"))
+        [query] = stats.slow
+        assert "FROM flashcards" in query.statement
+        assert query.parameters == "('nǐ hǎo',)"
+        assert query.plan == ["SCAN flashcards"]
+        assert list(queries.slow_queries) == [query]
+
+    def test_admin_slow_queries(self, admin_client: TestClient, monkeypatch):
+        monkeypatch.setattr(queries, "SLOW_QUERY_MS", 1e-6)
+        monkeypatch.setattr(queries, "slow_queries", queries.deque())
+        response = admin_client.get("/admin/slow-queries")
+        assert response.status_code == 200
+        # The admin's own lookup, before the listing was taken
+        assert "FROM users" in response.json()[0]["statement"]
+
+    def test_admin_only(self, authenticated_client: TestClient):
+        assert authenticated_client.get("/admin/slow-queries").status_code == 403
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_repeated_query_reported(
+        self, mock_deepseek, authenticated_client: TestClient, monkeypatch, capsys
+    ):
+        mock_deepseek.return_value = ["你好！", "你好吗？"]
+        monkeypatch.setattr(queries, "QUERY_REPEAT_LIMIT", 1)
+        reported = queries.repeated_queries_total.value("/examples")
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json={"chinese": "你好"}
+        ).json()["id"]
+        authenticated_client.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 2}
+        )
+        # One INSERT per example
+        assert queries.repeated_queries_total.value("/examples") == reported + 1
+        assert "POST /examples ran the same query 2 times" in capsys.readouterr().out
+
+    def test_queries_per_request(self, authenticated_client: TestClient):
+        requests = queries.queries_per_request.count("/flashcards")
+        authenticated_client.get("/flashcards")
+        assert queries.queries_per_request.count("/flashcards") == requests + 1
+
+
+class TestQueryBudgets:
+    """Test cases for the SQL statements each endpoint runs"""
+
+    @pytest.mark.parametrize(
+        "path, budget",
+        [
+            ("/flashcards", 2),
+            ("/flashcards/search?q=ni", 4),
+            ("/flashcards/你好", 2),
+            ("/auth/me", 1),
+        ],
+    )
+    def test_reads_independent_of_card_count(
+        self, authenticated_client: TestClient, add_cards, path, budget
+    ):
+        add_cards(WORDS[:1])
+        with count_queries() as one_card:
+            assert authenticated_client.get(path).status_code == 200
+        add_cards(WORDS[1:])
+        with count_queries() as many_cards:
+            assert authenticated_client.get(path).status_code == 200
+        assert one_card.count == many_cards.count <= budget
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_examples_indexed_once(
+        self, mock_deepseek, authenticated_client: TestClient, add_cards
+    ):
+        mock_deepseek.return_value = [f"你好{number}。" for number in range(5)]
+        add_cards(WORDS[:1])
+        with count_queries() as stats:
+            response = authenticated_client.post(
+                "/examples", json={"flashcard_id": 1, "count": 5}
+            )
+        assert response.status_code == 200
+        # A single commit, re-indexing the card once for all its examples
+        reindexed = statement_shape(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = ?")
+        assert stats.shapes[reindexed] == 1
+        assert stats.count <= 13
@@ -0,0 +1,116 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from backend.db import ADMIN_EMAIL, ADMIN_PASSWORD
+from backend.serve import memory_report, read_memory
+
+linux_only = pytest.mark.skipif(
+    not os.path.exists("/proc/self/smaps_rollup"), reason="needs /proc"
+)
+
+
+class TestMemoryReport:
+    """Test cases for per-process memory figures"""
+
+    @linux_only
+    def test_read_memory(self):
+        usage = read_memory(os.getpid())
+        assert usage.rss > 0
+        assert 0 < usage.pss <= usage.rss
+        assert usage.unique + usage.shared == pytest.approx(usage.rss, rel=0.01)
+
+    def test_gone_process(self):
+        assert read_memory(2**22 + 1) is None
+
+    @linux_only
+    def test_report(self):
+        report = memory_report(os.getpid(), [os.getpid(), os.getpid()])
+        lines = report.splitlines()
+        assert lines[1].startswith("master")
+        assert lines[3].startswith("worker 2")
+        assert "each extra worker adds about" in lines[-1]
+
+
+@linux_only
+class TestPreforkLauncher:
+    """Test cases for serving from forked workers"""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        """The launcher with 2 workers, and the URL it serves"""
+        env = {
+            **os.environ,
+            "CHINOCHAU_DATABASE_URL": f"sqlite:///{tmp_path / 'serve.db'}",
+            "CHINOCHAU_SHARED_CACHE": str(tmp_path / "cache.db"),
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-m", "backend.serve", "--workers", "2", "--port", "0"]
+            + ["--report-after", "0", "--log-level", "warning"],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        try:
+            for line in process.stdout:
+                if line.startswith("🚀"):
+                    url = line.split()[3]
+                    break
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    response = httpx.get(f"{url}/openapi.json")
+                    break
+                except httpx.ConnectError:
+                    assert time.monotonic() < deadline
+                    time.sleep(0.2)
+            assert response.status_code == 200
+            yield process, url
+        finally:
+            # Killing the master outright would leave its workers running
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    def test_serves_reports_and_stops(self, server):
+        process, url = server
+        process.send_signal(signal.SIGUSR1)
+        for line in process.stdout:
+            if line.startswith("📊"):
+                break
+        report = [next(process.stdout) for _ in range(5)]
+        assert report[1].startswith("master")
+        assert report[3].startswith("worker 2")
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=30) == 0
+
+    def test_sighup_reloads_workers(self, server):
+        process, url = server
+        token = httpx.post(
+            f"{url}/auth/login",
+            data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def loaded_at():
+            # A worker rebuilding the dictionary answers slowly
+            response = httpx.get(f"{url}/admin/dictionary", headers=headers, timeout=30)
+            assert response.status_code == 200
+            return response.json()["loaded_at"]
+
+        before = loaded_at()
+        process.send_signal(signal.SIGHUP)
+        deadline = time.monotonic() + 60
+        while loaded_at() == before:
+            assert time.monotonic() < deadline
+            time.sleep(0.5)
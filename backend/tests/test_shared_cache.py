@@ -0,0 +1,168 @@
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.auth import create_access_token
+from backend.db import UserDB
+from backend.main import app
+from backend.services.example_service import add_to_pool, example_pool
+from backend.tests.conftest import (
+    TestingSessionLocal,
+    authenticated_client,
+    client,
+    sample_flashcard_data,
+    test_db,
+    test_user,
+)
+from chinochau import shared_cache
+from chinochau.shared_cache import MemoryCache, SQLiteCache, TieredCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+class TestCacheTiers:
+    """Test cases for the memory and shared cache tiers"""
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        cache = MemoryCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert len(cache) == 2
+
+    def test_sqlite_cache_shared_between_connections(self, path):
+        writer = SQLiteCache("words", 10, path)
+        writer.set("学习", ["to study"])
+        # Another worker opens the same file
+        assert SQLiteCache("words", 10, path).get("学习") == ["to study"]
+        # Namespaces are separate
+        assert SQLiteCache("examples", 10, path).get("学习") is None
+
+    def test_sqlite_cache_shared_between_processes(self, path):
+        SQLiteCache("words", 10, path).set("学习", ["to study"])
+        code = (
+            "from chinochau.shared_cache import SQLiteCache; "
+            f"print(SQLiteCache('words', 10, {path!r}).get('学习')[0])"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "to study"
+
+    def test_sqlite_cache_evicts_least_recently_used(self, path, monkeypatch):
+        monkeypatch.setattr(shared_cache, "EVICT_EVERY", 1)
+        now = [0.0]
+        cache = SQLiteCache("words", 2, path, clock=lambda: now[0])
+        for key in "abc":
+            now[0] += 100
+            cache.set(key, key)
+            if key == "b":
+                # Touched, so "b" is newer than "a" when "c" is added
+                now[0] += 100
+                cache.get("a")
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == "a"
+
+    def test_disabled_sqlite_cache(self, monkeypatch):
+        monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", "")
+        cache = SQLiteCache("words", 10)
+        cache.set("学习", ["to study"])
+        assert cache.get("学习") is None
+        assert len(cache) == 0
+
+    def test_shared_hits_copied_to_memory(self, path):
+        shared = SQLiteCache("words", 10, path)
+        shared.set("学习", ["to study"])
+        cache = TieredCache("words", MemoryCache(10), shared)
+        assert cache.get("学习") == ["to study"]
+        assert cache.get("学习") == ["to study"]
+        assert cache.get("考试") is None
+        assert cache.stats == {"memory": 1, "shared": 1, "miss": 1}
+
+
+class TestExamplePool:
+    """Test cases for reusing generated examples"""
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_pooled_examples_reused(
+        self,
+        mock_deepseek,
+        authenticated_client: TestClient,
+        test_db,
+        sample_flashcard_data,
+    ):
+        example_pool.set(sample_flashcard_data["chinese"], ["你好！", "你好吗？"])
+        mock_deepseek.return_value = ["你好，朋友。"]
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json=sample_flashcard_data
+        ).json()["id"]
+        request_data = {"flashcard_id": flashcard_id, "count": 2}
+
+        response = authenticated_client.post("/examples", json=request_data)
+        assert [example["example_text"] for example in response.json()["examples"]] == [
+            "你好！",
+            "你好吗？",
+        ]
+        mock_deepseek.assert_not_called()
+
+        # The flashcard has every pooled example, so new ones are generated
+        response = authenticated_client.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 1}
+        )
+        assert response.json()["examples"][0]["example_text"] == "你好，朋友。"
+        mock_deepseek.assert_called_once()
+        assert example_pool.get(sample_flashcard_data["chinese"]) == [
+            "你好！",
+            "你好吗？",
+            "你好，朋友。",
+        ]
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_examples_shared_between_users(
+        self, mock_deepseek, authenticated_client: TestClient, test_db
+    ):
+        mock_deepseek.return_value = ["你好！"]
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json={"chinese": "你好"}
+        ).json()["id"]
+        authenticated_client.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 1}
+        )
+
+        with TestingSessionLocal() as db:
+            db.add(UserDB(email="other@example.com", hashed_password="hashed"))
+            db.commit()
+        token = create_access_token(data={"sub": "other@example.com"})
+        other = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+        flashcard_id = other.post("/flashcards", json={"chinese": "你好"}).json()["id"]
+        response = other.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 1}
+        )
+        # Generated for the first user, handed to the second
+        assert response.json()["examples"][0]["example_text"] == "你好！"
+        mock_deepseek.assert_called_once()
+
+    @patch("backend.services.example_service.get_examples_deepseek")
+    def test_pool_shared_across_scripts(
+        self, mock_deepseek, authenticated_client: TestClient, test_db
+    ):
+        add_to_pool("學習", ["我們學習中文。"])
+        flashcard_id = authenticated_client.post(
+            "/flashcards", json={"chinese": "学习"}
+        ).json()["id"]
+        response = authenticated_client.post(
+            "/examples", json={"flashcard_id": flashcard_id, "count": 1}
+        )
+        assert response.json()["examples"][0]["example_text"] == "我們學習中文。"
+        mock_deepseek.assert_not_called()
+        assert example_pool.get("学习") == ["我們學習中文。"]
@@ -0,0 +1,166 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.tests.conftest import (
+    admin_client,
+    authenticated_client,
+    client,
+    test_db,
+    test_user,
+)
+from chinochau import tracing
+
+
+@pytest.fixture
+def traces(monkeypatch):
+    """Keep every trace, in an exporter of the test's own"""
+    exporter = tracing.MemoryExporter()
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing, "memory_exporter", exporter)
+    monkeypatch.setattr(tracing, "exporters", [exporter])
+    return exporter.traces
+
+
+def spans_by_name(report: dict) -> dict:
+    return {span["name"]: span for span in report["spans"]}
+
+
+class TestSpans:
+    """Test cases for recording spans and choosing the traces kept"""
+
+    def test_nested_spans_and_critical_path(self, traces):
+        with tracing.trace("job") as trace:
+            with tracing.span("short"):
+                time.sleep(0.01)
+            with tracing.span("long"):
+                with tracing.span("inner"):
+                    time.sleep(0.02)
+        [report] = traces
+        spans = spans_by_name(report)
+        assert spans["inner"]["parent_id"] == spans["long"]["id"]
+        assert spans["long"]["parent_id"] == spans["job"]["id"] == trace.root.id
+        assert spans["inner"]["duration_ms"] >= 20
+        assert report["critical_path"] == [
+            spans[name]["id"] for name in ("job", "long", "inner")
+        ]
+
+    def test_error_recorded(self, traces):
+        with pytest.raises(ValueError):
+            with tracing.trace("job"):
+                with tracing.span("failing"):
+                    raise ValueError("no such word")
+        spans = spans_by_name(traces[0])
+        assert spans["failing"]["error"] == "ValueError: no such word"
+        assert spans["job"]["error"] == "ValueError: no such word"
+
+    def test_no_span_outside_a_trace(self):
+        with tracing.span("alone") as span:
+            assert span is None
+        assert tracing.start_span("sql", "sql") is None
+
+    def test_slow_traces_kept_unsampled(self, traces, monkeypatch):
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+        monkeypatch.setattr(tracing, "TRACE_SLOW_MS", 5)
+        with tracing.trace("fast"):
+            pass
+        with tracing.trace("slow"):
+            time.sleep(0.01)
+        assert [(report["name"], report["sampled"]) for report in traces] == [
+            ("slow", False)
+        ]
+
+    def test_unsampled_traces_record_no_spans(self, traces, monkeypatch):
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+        monkeypatch.setattr(tracing, "TRACE_SLOW_MS", 5)
+        with tracing.trace("slow"):
+            with tracing.span("step") as span:
+                assert span is None
+            time.sleep(0.01)
+        [report] = traces
+        assert [span["name"] for span in report["spans"]] == ["slow"]
+        assert report["duration_ms"] >= 10
+
+    def test_forced_sampling(self, traces, monkeypatch):
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+        token = tracing.force_sampling.set(True)
+        try:
+            with tracing.trace("job"):
+                with tracing.span("step"):
+                    pass
+        finally:
+            tracing.force_sampling.reset(token)
+        assert set(spans_by_name(traces[0])) == {"job", "step"}
+
+    def test_span_limit(self, traces, monkeypatch):
+        monkeypatch.setattr(tracing, "MAX_SPANS", 3)
+        with tracing.trace("job"):
+            for _ in range(4):
+                with tracing.span("step"):
+                    pass
+        assert len(traces[0]["spans"]) == 3
+        assert traces[0]["dropped_spans"] == 2
+
+    def test_file_exporter(self, traces, monkeypatch, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        monkeypatch.setattr(
+            tracing, "exporters", [*tracing.exporters, tracing.FileExporter(path)]
+        )
+        for name in ("first", "second"):
+            with tracing.trace(name):
+                pass
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["first", "second"]
+        assert json.loads(lines[0]) == json.loads(json.dumps(traces[0], default=str))
+
+
+class TestRequestTraces:
+    """Test cases for tracing requests through handlers, services and SQL"""
+
+    def test_request_spans(self, authenticated_client: TestClient, traces):
+        authenticated_client.post("/flashcards", json={"chinese": "你好"})
+        authenticated_client.get("/flashcards")
+        report = traces[-1]
+        assert report["name"] == "GET /flashcards"
+        spans = spans_by_name(report)
+        assert spans["GET /flashcards"]["attributes"]["status"] == 200
+        handler = spans["get_flashcards"]
+        service = spans["FlashcardService.get_user_flashcards"]
+        assert handler["kind"] == "handler"
+        assert service["parent_id"] == handler["id"]
+        sql = [span for span in report["spans"] if span["kind"] == "sql"]
+        assert "FROM flashcards" in sql[-1]["attributes"]["statement"]
+        assert sql[-1]["parent_id"] == spans["FlashcardService.card_rows"]["id"]
+
+    def test_password_hashing_span(self, client: TestClient, test_user, traces):
+        client.post(
+            "/auth/login",
+            data={"username": "test@example.com", "password": "testpassword"},
+        )
+        spans = spans_by_name(traces[-1])
+        assert spans["bcrypt"]["kind"] == "dependency"
+        assert spans["bcrypt"]["parent_id"] == spans["login_for_access_token"]["id"]
+
+    def test_not_traced_when_disabled(self, client: TestClient, traces, monkeypatch):
+        monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+        monkeypatch.setattr(tracing, "TRACE_SLOW_MS", 0)
+        client.get("/ready")
+        assert len(traces) == 0
+
+    def test_admin_traces(self, admin_client: TestClient, traces):
+        admin_client.get("/admin/traces")
+        response = admin_client.get("/admin/traces")
+        assert response.status_code == 200
+        summary = response.json()[0]
+        assert summary["name"] == "GET /admin/traces"
+        assert "spans" not in summary
+
+        response = admin_client.get(f"/admin/traces/{summary['id']}")
+        assert response.status_code == 200
+        assert response.json()["critical_path"][0] == 1
+        assert admin_client.get("/admin/traces/missing").status_code == 404
+
+    def test_admin_only(self, authenticated_client: TestClient):
+        assert authenticated_client.get("/admin/traces").status_code == 403
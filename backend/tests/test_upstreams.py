@@ -0,0 +1,283 @@
+import asyncio
+import random
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import openai
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.loop_monitor import LoopMonitor
+from backend.tests.conftest import authenticated_client, client, test_db, test_user
+from benchmarks.fake_upstreams import (
+    BackgroundServer,
+    Faults,
+    Latency,
+    create_deepseek_app,
+    create_google_app,
+)
+from chinochau import deepseek, dictionary, translate_google
+from chinochau.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpen,
+)
+from chinochau.dictionary import get_dictionary
+from chinochau.translate_google import TranslationUnavailable
+
+# Not in CEDICT, so translate_google has to ask the translation service
+UNKNOWN_WORD = "钦诺肖"
+
+
+@pytest.fixture(autouse=True)
+def fresh_translations():
+    """Start every test with an empty translation cache and a closed circuit"""
+    translate_google.clear_cache()
+    translate_google.breaker.reset()
+    yield
+    translate_google.clear_cache()
+    translate_google.breaker.reset()
+
+
+@pytest.fixture
+def fake_google(monkeypatch):
+    """Point googletrans at a fresh stand-in"""
+
+    def start(faults=Faults()):
+        server = BackgroundServer(create_google_app(faults)).__enter__()
+        monkeypatch.setattr(translate_google, "GOOGLE_TRANSLATE_URL", server.url)
+        servers.append(server)
+        return server
+
+    servers = []
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def requests_served(server) -> int:
+    return httpx.get(f"{server.url}/_stats").json().get("requests", 0)
+
+
+@pytest.fixture
+def fake_deepseek(monkeypatch):
+    """Point the DeepSeek client at a fresh stand-in"""
+
+    def start(faults=Faults()):
+        server = BackgroundServer(create_deepseek_app(faults)).__enter__()
+        monkeypatch.setattr(deepseek, "DEEPSEEK_URL", server.url)
+        monkeypatch.setattr(deepseek, "DEEPSEEK_MAX_RETRIES", 0)
+        monkeypatch.setenv("CHINOCHAU_DEEPSEEK_API_KEY", "fake")
+        deepseek.get_client.cache_clear()
+        servers.append(server)
+        return server
+
+    servers = []
+    yield start
+    deepseek.get_client.cache_clear()
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+class TestLatency:
+    """Test cases for latency distribution specs"""
+
+    def test_fixed(self):
+        assert Latency("0.25").sample(random.Random(0)) == 0.25
+
+    def test_uniform_within_bounds(self):
+        latency = Latency("uniform:0.1:0.2")
+        rng = random.Random(0)
+        assert all(0.1 <= latency.sample(rng) <= 0.2 for _ in range(100))
+
+    def test_invalid_specs(self):
+        with pytest.raises(ValueError):
+            Latency("gaussian:1")
+        with pytest.raises(ValueError):
+            Latency("uniform:1")
+
+
+class TestFakeUpstreams:
+    """Test cases for running the app against local stand-ins"""
+
+    def test_deepseek_examples(self, fake_deepseek):
+        fake_deepseek()
+        examples = deepseek.get_examples_deepseek("学习", 3)
+        assert len(examples) == 3
+        assert all("学习" in example for example in examples)
+
+    def test_deepseek_errors(self, fake_deepseek):
+        fake_deepseek(Faults(error_rate=1.0))
+        with pytest.raises(openai.InternalServerError):
+            deepseek.get_examples_deepseek("学习")
+
+    def test_deepseek_timeouts(self, fake_deepseek, monkeypatch):
+        monkeypatch.setattr(deepseek, "DEEPSEEK_TIMEOUT", 0.2)
+        fake_deepseek(Faults(timeout_rate=1.0, hang=1))
+        with pytest.raises(openai.APITimeoutError):
+            deepseek.get_examples_deepseek("学习")
+
+    def test_google_translate(self, fake_google):
+        fake_google()
+        result = asyncio.run(translate_google.translate_google(UNKNOWN_WORD))
+        assert result == [f"translation of {UNKNOWN_WORD}"]
+
+
+class TestCircuitBreaker:
+    """Test cases for failing fast after repeated errors"""
+
+    def fail(self, breaker):
+        with pytest.raises(ValueError):
+            with breaker.call():
+                raise ValueError("boom")
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10)
+        self.fail(breaker)
+        assert breaker.state == CLOSED
+        self.fail(breaker)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpen):
+            with breaker.call():
+                pass
+        assert breaker.rejected == 1
+
+    def test_probe_closes_or_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(
+            "test", failure_threshold=1, reset_timeout=10, clock=lambda: now[0]
+        )
+        self.fail(breaker)
+        now[0] = 10.0
+        assert breaker.state == HALF_OPEN
+        # A failed probe opens the circuit for another period
+        self.fail(breaker)
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == 10.0
+        now[0] = 20.0
+        with breaker.call():
+            pass
+        assert breaker.state == CLOSED
+
+
+class TestGoogleFallback:
+    """Test cases for timeouts, the circuit breaker and stale translations"""
+
+    def test_timeout(self, fake_google, monkeypatch):
+        monkeypatch.setattr(translate_google, "GOOGLE_TRANSLATE_TIMEOUT", 0.2)
+        fake_google(Faults(timeout_rate=1.0, hang=1))
+        start = time.perf_counter()
+        with pytest.raises(TranslationUnavailable):
+            asyncio.run(translate_google.translate_google(UNKNOWN_WORD))
+        assert time.perf_counter() - start < 1
+
+    def test_fails_fast_when_circuit_open(self, fake_google, monkeypatch):
+        monkeypatch.setattr(translate_google.breaker, "failure_threshold", 2)
+        server = fake_google(Faults(error_rate=1.0))
+        for _ in range(3):
+            with pytest.raises(TranslationUnavailable) as error:
+                asyncio.run(translate_google.translate_google(UNKNOWN_WORD))
+        # The third call did not reach the service
+        assert requests_served(server) == 2
+        assert translate_google.breaker.state == OPEN
+        assert error.value.retry_after > 1
+
+    def test_stale_translation_served_and_refreshed(self, fake_google):
+        fake_google()
+        translate_google._cache.set(UNKNOWN_WORD, [["old translation"], 0.0])
+
+        async def translate_twice():
+            first = await translate_google.translate_google(UNKNOWN_WORD)
+            while translate_google._refreshing:
+                await asyncio.sleep(0.01)
+            return first, await translate_google.translate_google(UNKNOWN_WORD)
+
+        first, second = asyncio.run(translate_twice())
+        assert first == ["old translation"]
+        assert second == [f"translation of {UNKNOWN_WORD}"]
+
+    def test_shared_cache_used_off_the_loop(self, monkeypatch):
+        memory, shared = translate_google._cache.tiers
+        shared.set(UNKNOWN_WORD, [["cached"], time.time()])
+        memory.clear()
+        lookup = shared.get
+
+        def locked_get(key):
+            # Another worker holding the shared file's lock
+            time.sleep(0.3)
+            return lookup(key)
+
+        monkeypatch.setattr(shared, "get", locked_get)
+        # Loaded by warm-up before serving
+        get_dictionary()
+        monitor = LoopMonitor(threshold=0.05)
+
+        async def translate():
+            monitor.start()
+            try:
+                await asyncio.sleep(0.1)
+                translation = await translate_google.translate_google(UNKNOWN_WORD)
+                await asyncio.sleep(0.1)
+                return translation
+            finally:
+                monitor.stop()
+
+        assert asyncio.run(translate()) == ["cached"]
+        assert len(monitor.stalls) == 0
+
+    def test_dictionary_built_off_the_loop(self, monkeypatch):
+        loaded = get_dictionary()
+
+        def slow_load(path):
+            # A cold worker building the dictionary
+            time.sleep(0.3)
+            return loaded
+
+        monkeypatch.setattr(dictionary, "_dictionary", None)
+        monkeypatch.setattr(dictionary, "_load", slow_load)
+        monitor = LoopMonitor(threshold=0.05)
+
+        async def translate():
+            monitor.start()
+            try:
+                await asyncio.sleep(0.1)
+                translation = await translate_google.translate_google("学习")
+                await asyncio.sleep(0.1)
+                return translation
+            finally:
+                monitor.stop()
+
+        assert asyncio.run(translate()) == loaded.lookup("学习")
+        assert len(monitor.stalls) == 0
+
+    def test_translation_cached_for_either_script(self, fake_google):
+        server = fake_google()
+        traditional = asyncio.run(translate_google.translate_google("欽諾肖"))
+        assert asyncio.run(translate_google.translate_google(UNKNOWN_WORD)) == (
+            traditional
+        )
+        assert requests_served(server) == 1
+
+    def test_stale_translation_kept_when_refresh_fails(self, fake_google):
+        fake_google(Faults(error_rate=1.0))
+        translate_google._cache.set(UNKNOWN_WORD, [["old translation"], 0.0])
+
+        async def translate_twice():
+            await translate_google.translate_google(UNKNOWN_WORD)
+            while translate_google._refreshing:
+                await asyncio.sleep(0.01)
+            return await translate_google.translate_google(UNKNOWN_WORD)
+
+        assert asyncio.run(translate_twice()) == ["old translation"]
+
+    @patch("chinochau.definitions.translate_google", new_callable=AsyncMock)
+    def test_flashcard_unavailable(
+        self, mock_google, authenticated_client: TestClient, test_db
+    ):
+        mock_google.side_effect = TranslationUnavailable("open", 12.5)
+        response = authenticated_client.post("/flashcards", json={"chinese": "hello"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "13"
@@ -1,9 +1,11 @@
 from unittest.mock import patch
 
+import pinyin
 import pytest
 from fastapi.testclient import TestClient
 
 from backend.tests.conftest import authenticated_client, client, test_db, test_user
+from chinochau import pinyin_cache
 
 
 class TestUtilityEndpoints:
@@ -80,3 +82,50 @@ class TestUtilityEndpoints:
         response = authenticated_client.post("/pinyin", json=request_data)
         # Should handle empty string gracefully
         assert response.status_code in [200, 422]
+
+    def test_pinyin_batch_api(self, authenticated_client: TestClient, test_db):
+        """Test the batch pinyin endpoint preserves order"""
+        request_data = {"texts": ["你好", "北京大学", "", "你好"]}
+
+        response = authenticated_client.post("/pinyin/batch", json=request_data)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["pinyin"] == [
+            pinyin.get("你好"),
+            pinyin.get("北京大学"),
+            "",
+            pinyin.get("你好"),
+        ]
+
+    def test_pinyin_batch_api_too_many_texts(
+        self, authenticated_client: TestClient, test_db
+    ):
+        """Test batch pinyin rejects oversized batches"""
+        request_data = {"texts": ["你"] * 1001}
+
+        response = authenticated_client.post("/pinyin/batch", json=request_data)
+        assert response.status_code == 422
+
+
+class TestPinyinCache:
+    """Test cases for the cached pinyin conversion"""
+
+    @pytest.mark.parametrize("format", ["diacritical", "numerical", "strip"])
+    def test_matches_pinyin_package(self, format):
+        """Cached conversion matches pinyin.get, including non-Chinese text"""
+        text = "我每天学习中文。Hello, 北京 123"
+        assert pinyin_cache.get(text, " ", format) == pinyin.get(text, " ", format)
+
+    def test_repeated_conversion_hits_cache(self):
+        """Converting the same text twice is served from the cache"""
+        pinyin_cache.clear_cache()
+        pinyin_cache.get_many(["学习", "学习"])
+        info = pinyin_cache.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_invalid_format(self):
+        """Unknown formats are rejected like in pinyin.get"""
+        with pytest.raises(ValueError):
+            pinyin_cache.get("你好", format="ipa")
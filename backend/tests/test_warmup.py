@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core import warmup
+from backend.db import decode_definitions
+from backend.main import app
+from backend.tests.conftest import (
+    TestingSessionLocal,
+    authenticated_client,
+    client,
+    engine,
+    sample_flashcard_data,
+    test_db,
+    test_user,
+)
+from chinochau import pinyin_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_status(monkeypatch):
+    """Start every test before warm-up, against the test database"""
+    monkeypatch.setattr(warmup, "status", warmup.WarmupStatus())
+    monkeypatch.setattr(warmup, "engine", engine)
+    monkeypatch.setattr(warmup, "SessionLocal", TestingSessionLocal)
+
+
+class TestWarmup:
+    """Test cases for warming up and the readiness endpoint"""
+
+    def test_not_ready_before_warm_up(self, client: TestClient):
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+    def test_ready_after_warm_up(
+        self, authenticated_client: TestClient, test_db, sample_flashcard_data
+    ):
+        authenticated_client.post("/flashcards", json=sample_flashcard_data)
+        decode_definitions.cache_clear()
+        pinyin_cache.clear_cache()
+
+        warmup.warm_up()
+
+        response = authenticated_client.get("/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["ready"] is True
+        assert data["error"] is None
+        assert list(data["steps"]) == [name for name, _ in warmup.STEPS]
+        assert data["seconds"] >= sum(data["steps"].values())
+        # The popular card was loaded into the caches
+        assert decode_definitions.cache_info().currsize == 1
+        assert pinyin_cache.cache_info().currsize >= 2
+
+    def test_failed_step(self, client: TestClient, monkeypatch):
+        def broken():
+            raise RuntimeError("database is down")
+
+        monkeypatch.setattr(
+            warmup, "STEPS", [("pinyin", warmup.warm_pinyin), ("connections", broken)]
+        )
+        warmup.warm_up()
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["error"] == "connections: database is down"
+        assert list(response.json()["steps"]) == ["pinyin", "connections"]
+
+    def test_lifespan_warms_up(self, test_db):
+        with TestClient(app) as client:
+            deadline = time.monotonic() + 30
+            while client.get("/ready").status_code != 200:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+        assert warmup.status.ready
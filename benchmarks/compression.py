@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Bytes on the wire and CPU cost of response compression, per endpoint.
+
+Fills a temporary database like flashcards_list.py, then calls the app
+directly over ASGI for each endpoint and Accept-Encoding, counting the body
+bytes it sends and the CPU time it takes (no client-side decoding).
+
+    poetry run python -m benchmarks.compression --cards 20000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.compression import available_encodings
+from backend.db import Base
+from benchmarks.decks import create_bench_app, fill_database
+
+ENDPOINTS = [
+    "/flashcards",
+    "/flashcards/search?q=xue&limit=100",
+    "/dictionary/search?q=study&limit=100",
+    "/suggest?prefix=xue&limit=50",
+    "/openapi.json",
+]
+
+
+async def request(app, url: str, accept_encoding: str):
+    """Status, headers and body size of one GET request."""
+    parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        # 2.4: the app does not need to listen for disconnects while streaming
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"bench"),
+            (b"accept-encoding", accept_encoding.encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    result = {"size": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = dict(message["headers"])
+        elif message["type"] == "http.response.body":
+            result["size"] += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return result
+
+
+def measure(app, url: str, accept_encoding: str, repeat: int):
+    """Body size and CPU milliseconds per request."""
+    result = asyncio.run(request(app, url, accept_encoding))
+    assert result["status"] == 200, (url, result["status"])
+    start = time.process_time()
+    for _ in range(repeat):
+        asyncio.run(request(app, url, accept_encoding))
+    cpu = (time.process_time() - start) / repeat * 1000
+    encoding = result["headers"].get(b"content-encoding", b"identity").decode()
+    return result["size"], cpu, encoding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{Path(directory) / 'bench.db'}",
+            connect_args={"check_same_thread": False},
+        )
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with Session() as session:
+            user = fill_database(session, args.cards)
+        app = create_bench_app(Session, user)
+
+        encodings = ["identity", *reversed(available_encodings())]
+        print(f"📦 {args.cards} flashcards, {args.repeat} requests per row")
+        print(
+            f"{'endpoint':<38} {'encoding':<9} {'bytes':>10} {'ratio':>6} {'cpu ms':>8}"
+        )
+        for url in ENDPOINTS:
+            baseline = None
+            for accept_encoding in encodings:
+                size, cpu, encoding = measure(app, url, accept_encoding, args.repeat)
+                baseline = baseline or size
+                print(
+                    f"{url:<38} {encoding:<9} {size:>10} "
+                    f"{size / baseline:>6.2f} {cpu:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Flashcard decks of real CEDICT words, and an app serving them, shared by the
+benchmarks.
+
+Nothing here imports backend.main: its startup work (migrations with a
+backup, admin accounts, reindexing) would run against the configured
+database, usually the developer's own ./flashcards.db.
+"""
+import json
+
+from fastapi import FastAPI
+
+from backend.auth import get_current_active_user
+from backend.core.config import create_app
+from backend.db import FlashcardDB, UserDB, get_db
+from backend.routes import include_routers
+from chinochau import pinyin_cache
+from chinochau.dictionary import get_dictionary, is_cjk
+
+
+def fill_database(session, cards: int) -> UserDB:
+    """Add one user owning `cards` flashcards; returns the user."""
+    user = UserDB(email="bench@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+
+    dictionary = get_dictionary()
+    words = [word for word in dictionary.simplified if all(map(is_cjk, word))]
+    for word in words[:cards]:
+        session.add(
+            FlashcardDB(
+                chinese=word,
+                pinyin=pinyin_cache.get(word),
+                definitions=json.dumps(dictionary.lookup(word)),
+                user_id=user.id,
+            )
+        )
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+def create_bench_app(session_factory, user: UserDB) -> FastAPI:
+    """The API on `session_factory`'s database, with `user` logged in."""
+    app = create_app()
+    include_routers(app)
+
+    def override_get_db():
+        with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    return app
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for DeepSeek and Google Translate.
+
+The DeepSeek stand-in speaks the OpenAI chat completions protocol and
+answers with example sentences in the JSON shape the app asks for; the
+Google one answers translate.googleapis.com's /translate_a/single. Both
+wait for a latency drawn from a configurable distribution and can fail a
+share of requests with a 500 or hang until the client times out. Random
+draws are seeded, so runs are repeatable. GET /_stats reports the requests
+served, errors and hangs.
+
+Point the app at them with
+
+    CHINOCHAU_DEEPSEEK_URL=http://127.0.0.1:8901 CHINOCHAU_DEEPSEEK_API_KEY=fake
+    CHINOCHAU_GOOGLE_TRANSLATE_URL=http://127.0.0.1:8902
+
+and start them with
+
+    poetry run python -m benchmarks.fake_upstreams --error-rate 0.05
+
+Latencies are given as "0.2" or "fixed:0.2", "uniform:0.1:0.5",
+"lognormal:0.3:0.5" (median and sigma) or "exponential:0.2" (mean), in
+seconds.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class Latency:
+    """A latency distribution parsed from a "kind:parameters" spec."""
+
+    KINDS = {"fixed": 1, "uniform": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, spec: str):
+        kind, _, parameters = spec.partition(":")
+        if not parameters:
+            kind, parameters = "fixed", kind
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.parameters = [float(value) for value in parameters.split(":")]
+        if len(self.parameters) != self.KINDS[kind]:
+            raise ValueError(f"{kind} takes {self.KINDS[kind]} parameter(s)")
+        self.spec = spec
+
+    def __str__(self) -> str:
+        return self.spec
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.parameters[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.parameters)
+        if self.kind == "lognormal":
+            median, sigma = self.parameters
+            return median * rng.lognormvariate(0, sigma)
+        return rng.expovariate(1 / self.parameters[0])
+
+
+@dataclass
+class Faults:
+    """How a stand-in misbehaves."""
+
+    latency: Latency = field(default_factory=lambda: Latency("0"))
+    # Share of requests answered with a 500 after the latency
+    error_rate: float = 0.0
+    # Share of requests held for `hang` seconds, longer than client timeouts
+    timeout_rate: float = 0.0
+    hang: float = 120.0
+    seed: int = 0
+
+
+class Upstream:
+    """Latency, faults and statistics shared by a stand-in's routes."""
+
+    def __init__(self, faults: Faults):
+        self.faults = faults
+        self.rng = random.Random(faults.seed)
+        self.stats = Counter()
+
+    async def delay(self) -> Optional[Response]:
+        """Wait like the real service would; a response if the request fails."""
+        self.stats["requests"] += 1
+        roll = self.rng.random()
+        latency = self.faults.latency.sample(self.rng)
+        if roll < self.faults.timeout_rate:
+            self.stats["hangs"] += 1
+            await asyncio.sleep(self.faults.hang)
+        await asyncio.sleep(latency)
+        if roll < self.faults.timeout_rate + self.faults.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "server_error"}},
+                status_code=500,
+            )
+        return None
+
+    async def stats_endpoint(self, request: Request) -> JSONResponse:
+        return JSONResponse(dict(self.stats))
+
+
+def create_deepseek_app(faults: Faults) -> Starlette:
+    """An OpenAI compatible /chat/completions returning example sentences."""
+    upstream = Upstream(faults)
+
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        failure = await upstream.delay()
+        if failure is not None:
+            return failure
+        messages = {message["role"]: message["content"] for message in body["messages"]}
+        word = messages.get("user", "")
+        # The prompt asks for "{n}个不同的例句"
+        match = re.search(r"(\d+)个", messages.get("system", ""))
+        count = int(match.group(1)) if match else 2
+        examples = [f"这是{word}的第{number}个例句。" for number in range(1, count + 1)]
+        content = json.dumps({"examples": examples}, ensure_ascii=False)
+        return JSONResponse(
+            {
+                "id": f"chatcmpl-fake-{upstream.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "deepseek-chat"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(word),
+                    "completion_tokens": len(content),
+                    "total_tokens": len(word) + len(content),
+                },
+            }
+        )
+
+    return Starlette(
+        routes=[
+            Route("/chat/completions", chat_completions, methods=["POST"]),
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/_stats", upstream.stats_endpoint),
+        ]
+    )
+
+
+def create_google_app(faults: Faults) -> Starlette:
+    """translate.googleapis.com's /translate_a/single, as googletrans reads it."""
+    upstream = Upstream(faults)
+
+    async def translate(request: Request) -> Response:
+        failure = await upstream.delay()
+        if failure is not None:
+            return failure
+        text = request.query_params.get("q", "")
+        source = request.query_params.get("sl", "auto")
+        translation = f"translation of {text}"
+        return JSONResponse([[[translation, text, None, None, 10]], None, source])
+
+    return Starlette(
+        routes=[
+            Route("/translate_a/single", translate),
+            Route("/_stats", upstream.stats_endpoint),
+        ]
+    )
+
+
+class BackgroundServer:
+    """Serve an app on a local port from a thread, as a context manager.
+
+    With port 0 a free port is picked; `url` has the one in use.
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.url = None
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("Server failed to start")
+            time.sleep(0.01)
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--deepseek-port", type=int, default=8901)
+    parser.add_argument("--google-port", type=int, default=8902)
+    parser.add_argument("--deepseek-latency", type=Latency, default="lognormal:1.5:0.4")
+    parser.add_argument("--google-latency", type=Latency, default="lognormal:0.15:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    def faults(latency: Latency) -> Faults:
+        return Faults(latency, args.error_rate, args.timeout_rate, args.hang, args.seed)
+
+    servers = {
+        "DeepSeek": (
+            create_deepseek_app(faults(args.deepseek_latency)),
+            args.deepseek_port,
+        ),
+        "Google Translate": (
+            create_google_app(faults(args.google_latency)),
+            args.google_port,
+        ),
+    }
+    for name, (app, port) in servers.items():
+        print(f"🧪 Fake {name} on http://{args.host}:{port}")
+
+    async def serve():
+        await asyncio.gather(
+            *(
+                uvicorn.Server(
+                    uvicorn.Config(app, host=args.host, port=port, log_level="warning")
+                ).serve()
+                for app, port in servers.values()
+            )
+        )
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
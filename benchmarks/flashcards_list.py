@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /flashcards for a user with a large deck.
+
+Fills a temporary SQLite database with one user owning --cards flashcards
+(real CEDICT words and definitions), then times the endpoint through the
+full FastAPI stack.
+
+    poetry run python -m benchmarks.flashcards_list --cards 20000
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.db import Base
+from benchmarks.decks import create_bench_app, fill_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{Path(directory) / 'bench.db'}",
+            connect_args={"check_same_thread": False},
+        )
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        start = time.perf_counter()
+        with Session() as session:
+            user = fill_database(session, args.cards)
+        print(
+            f"📦 Created {args.cards} flashcards in {time.perf_counter() - start:.1f}s"
+        )
+
+        client = TestClient(create_bench_app(Session, user))
+
+        # Warm up caches before measuring
+        response = client.get("/flashcards")
+        assert response.status_code == 200
+        assert len(response.json()) == args.cards
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            client.get("/flashcards")
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        print(f"⏱️  GET /flashcards ({args.cards} cards, {args.repeat} runs)")
+        print(f"   median {statistics.median(timings):.1f} ms")
+        print(f"   p90    {timings[int(len(timings) * 0.9) - 1]:.1f} ms")
+        print(f"   min    {timings[0]:.1f} ms")
+        print(f"   size   {len(response.content) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the hot functions, with results saved for comparison.
+
+Each benchmark times a single call in isolation. Fixtures come from the
+local CEDICT file and temporary SQLite databases filled the same way on
+every run, so the suite runs offline on identical inputs. Results are
+written as JSON; pass an earlier results file to --compare to flag
+regressions (the exit status is 1 if any benchmark got slower than
+--threshold). Benchmarks with a latency budget fail the run too when their
+median time is over it.
+
+    poetry run python -m benchmarks.hot_paths --output .benchmarks/baseline.json
+    poetry run python -m benchmarks.hot_paths --compare .benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pinyin
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.auth import ALGORITHM, SECRET_KEY, create_access_token
+from backend.db import Base, ExampleDB, FlashcardDB
+from backend.services.example_service import ExampleService
+from backend.services.flashcard_service import FlashcardService
+from benchmarks.decks import fill_database
+from chinochau import pinyin_cache
+from chinochau.data import Flashcard, MasterFlashcards
+from chinochau.dictionary import get_dictionary, is_cjk
+from chinochau.shared_cache import MemoryCache, SQLiteCache
+from chinochau.translate_google import translate_google
+
+DECK_SIZES = (100, 1000, 10000)
+SENTENCE = "我们每天晚上在图书馆学习中文，然后一起去火车站旁边的饭馆吃饭。"
+
+
+class Fixtures:
+    """Inputs shared by the benchmarks, built on first use."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        dictionary = get_dictionary()
+        self.words = [word for word in dictionary.simplified if all(map(is_cjk, word))]
+        self._decks = {}
+
+    def deck(self, cards: int):
+        """A session on a database with one user owning `cards` flashcards."""
+        if cards not in self._decks:
+            engine = create_engine(
+                f"sqlite:///{self.directory / f'deck_{cards}.db'}",
+                connect_args={"check_same_thread": False},
+            )
+            Base.metadata.create_all(bind=engine)
+            session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+            user = fill_database(session, cards)
+            card = session.query(FlashcardDB).first()
+            for number in range(5):
+                session.add(
+                    ExampleDB(flashcard_id=card.id, example_text=f"例句 {number}")
+                )
+            session.commit()
+            self._decks[cards] = (session, user)
+        return self._decks[cards]
+
+
+Benchmark = Callable[[Fixtures], Callable[[], object]]
+BENCHMARKS: List[Tuple[str, Benchmark, Optional[float]]] = []
+
+
+def benchmark(name: str, budget_us: Optional[float] = None):
+    """Register a function returning the call to time, and its latency budget."""
+
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS.append((name, setup, budget_us))
+        return setup
+
+    return register
+
+
+@benchmark("translate_google (dictionary hit)")
+def _translate(fixtures: Fixtures):
+    loop = asyncio.new_event_loop()
+    word = fixtures.words[0]
+    return lambda: loop.run_until_complete(translate_google(word))
+
+
+@benchmark("shared cache hit (memory tier)")
+def _memory_cache(fixtures: Fixtures):
+    cache = MemoryCache(10000)
+    cache.set("学习", [["to study"], 0.0])
+    return lambda: cache.get("学习")
+
+
+@benchmark("shared cache hit (SQLite tier)")
+def _sqlite_cache(fixtures: Fixtures):
+    cache = SQLiteCache("bench", 10000, str(fixtures.directory / "cache.db"))
+    for word in fixtures.words[:10000]:
+        cache.set(word, [[f"translation of {word}"], 0.0])
+    word = fixtures.words[5000]
+    return lambda: cache.get(word)
+
+
+@benchmark("ReverseIndex.search (to study)", budget_us=10000)
+def _reverse_search(fixtures: Fixtures):
+    index = get_dictionary().reverse_index
+    return lambda: index.search("to study")
+
+
+# Stopwords only: the longest posting lists, the slowest queries
+@benchmark("ReverseIndex.search (stopwords only)", budget_us=10000)
+def _reverse_search_stopwords(fixtures: Fixtures):
+    index = get_dictionary().reverse_index
+    return lambda: index.search("to of a the in on for with and")
+
+
+@benchmark("pinyin.get (package)")
+def _pinyin_package(fixtures: Fixtures):
+    return lambda: pinyin.get(SENTENCE)
+
+
+@benchmark("pinyin_cache.get (cached)")
+def _pinyin_cached(fixtures: Fixtures):
+    return lambda: pinyin_cache.get(SENTENCE)
+
+
+@benchmark("pinyin_cache.get (uncached)")
+def _pinyin_uncached(fixtures: Fixtures):
+    convert = pinyin_cache.get.__wrapped__
+    return lambda: convert(SENTENCE)
+
+
+@benchmark("FlashcardDB.to_dict")
+def _to_dict(fixtures: Fixtures):
+    session, user = fixtures.deck(DECK_SIZES[0])
+    card = session.query(FlashcardDB).first()
+    return card.to_dict
+
+
+def _user_flashcards(cards: int) -> Benchmark:
+    def setup(fixtures: Fixtures):
+        session, user = fixtures.deck(cards)
+        return lambda: FlashcardService.get_user_flashcards(session, user)
+
+    return setup
+
+
+for _cards in DECK_SIZES:
+    benchmark(f"FlashcardService.get_user_flashcards ({_cards} cards)")(
+        _user_flashcards(_cards)
+    )
+
+
+@benchmark("ExampleService.get_examples (5 examples)")
+def _examples(fixtures: Fixtures):
+    session, user = fixtures.deck(DECK_SIZES[0])
+    card = session.query(FlashcardDB).first()
+    return lambda: ExampleService.get_examples(session, card.id, user)
+
+
+@benchmark("auth.create_access_token")
+def _jwt_encode(fixtures: Fixtures):
+    return lambda: create_access_token(data={"sub": "bench@example.com"})
+
+
+@benchmark("auth jwt.decode")
+def _jwt_decode(fixtures: Fixtures):
+    token = create_access_token(data={"sub": "bench@example.com"})
+    return lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+@benchmark("MasterFlashcards load + import (1000 cards)")
+def _master_flashcards(fixtures: Fixtures):
+    # Only a fresh master file loads: reading an existing one fails before
+    # the flashcards dictionary is set
+    dictionary = get_dictionary()
+    cards = [
+        Flashcard(word, pinyin_cache.get(word), dictionary.lookup(word))
+        for word in fixtures.words[:1000]
+    ]
+    path = fixtures.directory / "master.csv"
+
+    def load_and_import():
+        master = MasterFlashcards(str(path))
+        master.import_flashcards(cards)
+        path.unlink()
+
+    return load_and_import
+
+
+def measure(call: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and median time per call in microseconds."""
+    timer = timeit.Timer(call)
+    loops, _ = timer.autorange()
+    timings = [seconds / loops * 1e6 for seconds in timer.repeat(repeat, loops)]
+    return {
+        "best_us": min(timings),
+        "median_us": statistics.median(timings),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def compare(results: Dict[str, dict], baseline_path: Path, threshold: float) -> int:
+    """Print changes against a baseline and count the regressions."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = 0
+    print(f"\n📊 Compared with {baseline_path} (best times)")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"   {name:<52} new")
+            continue
+        change = result["best_us"] / baseline[name]["best_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  ⚠️  slower"
+        print(f"   {name:<52} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="Only run names containing it")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Earlier results to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Slowdown counted as a regression (default 0.10 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    over_budget = 0
+    with tempfile.TemporaryDirectory() as directory:
+        fixtures = Fixtures(Path(directory))
+        print(f"⏱️  Hot paths (best and median of {args.repeat})")
+        for name, setup, budget_us in BENCHMARKS:
+            if args.filter not in name:
+                continue
+            result = results[name] = measure(setup(fixtures), args.repeat)
+            flag = ""
+            if budget_us is not None and result["median_us"] > budget_us:
+                over_budget += 1
+                flag = f"  ⚠️  over {budget_us:.0f} µs"
+            print(
+                f"   {name:<52} {result['best_us']:10.1f} µs"
+                f" {result['median_us']:10.1f} µs{flag}"
+            )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+        print(f"💾 Results written to {args.output}")
+
+    failed = over_budget > 0
+    if over_budget:
+        print(f"❌ {over_budget} benchmark(s) over their latency budget")
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"❌ {regressions} benchmark(s) slower than the baseline")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
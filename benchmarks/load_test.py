@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the API with a realistic mix of operations.
+
+Seeds a temporary database with --users users owning --cards flashcards
+each, starts backend.main:app under uvicorn against it (with DeepSeek and
+Google Translate replaced by the stand-ins in fake_upstreams.py), and runs
+--concurrency virtual users for --duration seconds. Each virtual user logs
+in, then picks operations at random from --mix: logging in again, listing
+its deck, creating a card, generating examples and converting to pinyin.
+
+Reports throughput and latency percentiles per operation. Results are
+written as JSON; with --compare the run fails (exit status 1) when an
+operation's throughput drops or its p50/p99 grow by more than --threshold.
+
+    poetry run python -m benchmarks.load_test --concurrency 16 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.auth import get_password_hash
+from backend.db import Base, FlashcardDB, UserDB
+from benchmarks.fake_upstreams import (
+    BackgroundServer,
+    Faults,
+    Latency,
+    create_deepseek_app,
+    create_google_app,
+)
+from chinochau import pinyin_cache
+from chinochau.dictionary import get_dictionary, is_cjk
+
+ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = "load-test-password"
+DEFAULT_MIX = "login=1,list=4,create=2,examples=1,pinyin=4"
+SENTENCES = [
+    "我们每天晚上在图书馆学习中文。",
+    "你好，很高兴认识你。",
+    "明天我们一起去火车站吧。",
+    "这个饭馆的菜非常好吃。",
+]
+
+SeededUser = Tuple[str, List[int]]
+
+
+def seed(database_url: str, users: int, cards: int, words: List[str]):
+    """Create users sharing one password, each with `cards` flashcards."""
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    dictionary = get_dictionary()
+    hashed_password = get_password_hash(PASSWORD)
+    seeded: List[SeededUser] = []
+    with sessionmaker(bind=engine)() as session:
+        for number in range(users):
+            user = UserDB(
+                email=f"load{number}@example.com", hashed_password=hashed_password
+            )
+            session.add(user)
+            session.flush()
+            deck = [
+                FlashcardDB(
+                    chinese=word,
+                    pinyin=pinyin_cache.get(word),
+                    definitions=json.dumps(dictionary.lookup(word)),
+                    user_id=user.id,
+                )
+                for word in words[number * cards : (number + 1) * cards]
+            ]
+            session.add_all(deck)
+            session.flush()
+            seeded.append((user.email, [card.id for card in deck]))
+        session.commit()
+    engine.dispose()
+    return seeded
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name}, expected {list(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class VirtualUser:
+    """One client session repeating operations from the mix."""
+
+    def __init__(self, client: httpx.AsyncClient, user: SeededUser, words, rng):
+        self.client = client
+        self.email, self.card_ids = user
+        self.words = words
+        self.rng = rng
+        self.headers = {}
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post(
+            "/auth/login", data={"username": self.email, "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            token = response.json()["access_token"]
+            self.headers = {"Authorization": f"Bearer {token}"}
+        return response
+
+    async def list(self) -> httpx.Response:
+        return await self.client.get("/flashcards", headers=self.headers)
+
+    async def create(self) -> httpx.Response:
+        chinese = self.rng.choice(self.words)
+        return await self.client.post(
+            "/flashcards", json={"chinese": chinese}, headers=self.headers
+        )
+
+    async def examples(self) -> httpx.Response:
+        flashcard_id = self.rng.choice(self.card_ids)
+        return await self.client.post(
+            "/examples",
+            json={"flashcard_id": flashcard_id, "count": 2},
+            headers=self.headers,
+        )
+
+    async def pinyin(self) -> httpx.Response:
+        chinese = self.rng.choice(SENTENCES)
+        return await self.client.post(
+            "/pinyin", json={"chinese": chinese}, headers=self.headers
+        )
+
+
+OPERATIONS = {
+    "login": VirtualUser.login,
+    "list": VirtualUser.list,
+    "create": VirtualUser.create,
+    "examples": VirtualUser.examples,
+    "pinyin": VirtualUser.pinyin,
+}
+
+
+class Recorder:
+    """Latencies and failures per operation, after the warm-up."""
+
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.failures: Dict[str, Counter] = defaultdict(Counter)
+
+    async def run(self, name: str, user: VirtualUser):
+        start = time.perf_counter()
+        try:
+            response = await OPERATIONS[name](user)
+            failure = None if response.status_code < 400 else response.status_code
+        except httpx.HTTPError as error:
+            failure = type(error).__name__
+        if start < self.measure_from:
+            return
+        self.latencies[name].append(time.perf_counter() - start)
+        if failure is not None:
+            self.failures[name][str(failure)] += 1
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    index = max(0, min(len(values) - 1, round(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, dict]:
+    operations = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        operations[name] = {
+            "requests": len(latencies),
+            "errors": sum(recorder.failures[name].values()),
+            "error_codes": dict(recorder.failures[name]),
+            "rps": len(latencies) / duration,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p90_ms": percentile(latencies, 0.90) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+        }
+    return operations
+
+
+async def drive(url, seeded, words, mix, concurrency, warmup, duration, seed):
+    start = time.perf_counter()
+    recorder = Recorder(measure_from=start + warmup)
+    deadline = start + warmup + duration
+    names, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+
+        async def virtual_user(number: int):
+            rng = random.Random(seed + number)
+            user = VirtualUser(client, seeded[number % len(seeded)], words, rng)
+            await recorder.run("login", user)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                await recorder.run(name, user)
+
+        await asyncio.gather(*(virtual_user(number) for number in range(concurrency)))
+    return summarize(recorder, duration)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(env: Dict[str, str], workers: int) -> Tuple[subprocess.Popen, str]:
+    """Run the API under uvicorn and wait until it has warmed up."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port)]
+        + ["--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, **env, "PYTHONPATH": str(ROOT)},
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The API exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/ready").status_code == 200:
+                return process, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The API did not start within 120s")
+
+
+def compare(operations: Dict[str, dict], baseline_path: Path, threshold: float) -> int:
+    """Print changes against a baseline and count the regressions."""
+    baseline = json.loads(baseline_path.read_text())["operations"]
+    regressions = 0
+    print(f"\n📊 Compared with {baseline_path}")
+    for name, result in operations.items():
+        if name not in baseline:
+            print(f"   {name:<10} new")
+            continue
+        before = baseline[name]
+        changes = {
+            "rps": result["rps"] / before["rps"] - 1,
+            "p50": result["p50_ms"] / before["p50_ms"] - 1,
+            "p99": result["p99_ms"] / before["p99_ms"] - 1,
+        }
+        worse = [
+            metric
+            for metric, change in changes.items()
+            if (change < -threshold if metric == "rps" else change > threshold)
+        ]
+        regressions += bool(worse)
+        flag = f"  ⚠️  worse {', '.join(worse)}" if worse else ""
+        print(
+            f"   {name:<10} rps {changes['rps']:+7.1%}  p50 {changes['p50']:+7.1%}"
+            f"  p99 {changes['p99']:+7.1%}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=200, help="Cards per user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds measured")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds not measured")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--deepseek-latency", type=Latency, default="lognormal:1.5:0.4")
+    parser.add_argument("--google-latency", type=Latency, default="lognormal:0.15:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Earlier results to compare")
+    parser.add_argument("--threshold", type=float, default=0.20)
+    args = parser.parse_args()
+
+    dictionary = get_dictionary()
+    words = [word for word in dictionary.simplified if all(map(is_cjk, word))]
+    # Words beyond the seeded decks, for new cards
+    new_words = words[args.users * args.cards :][:5000]
+
+    def faults(latency: Latency) -> Faults:
+        return Faults(latency, args.error_rate, args.timeout_rate, seed=args.seed)
+
+    with tempfile.TemporaryDirectory() as directory, BackgroundServer(
+        create_deepseek_app(faults(args.deepseek_latency))
+    ) as deepseek, BackgroundServer(
+        create_google_app(faults(args.google_latency))
+    ) as google:
+        database_url = f"sqlite:///{Path(directory) / 'load.db'}"
+        start = time.perf_counter()
+        seeded = seed(database_url, args.users, args.cards, words)
+        print(
+            f"📦 Seeded {args.users} users with {args.cards} cards each"
+            f" in {time.perf_counter() - start:.1f}s"
+        )
+
+        process, url = start_app(
+            {
+                "CHINOCHAU_DATABASE_URL": database_url,
+                "CHINOCHAU_SHARED_CACHE": str(Path(directory) / "cache.db"),
+                "CHINOCHAU_DEEPSEEK_URL": deepseek.url,
+                "CHINOCHAU_DEEPSEEK_API_KEY": "fake",
+                "CHINOCHAU_GOOGLE_TRANSLATE_URL": google.url,
+            },
+            args.workers,
+        )
+        try:
+            print(
+                f"🚀 {args.concurrency} virtual users for {args.duration:.0f}s"
+                f" after {args.warmup:.0f}s of warm-up"
+            )
+            operations = asyncio.run(
+                drive(
+                    url,
+                    seeded,
+                    new_words,
+                    args.mix,
+                    args.concurrency,
+                    args.warmup,
+                    args.duration,
+                    args.seed,
+                )
+            )
+        finally:
+            process.terminate()
+            process.wait()
+
+    total = sum(operation["requests"] for operation in operations.values())
+    print(f"\n⏱️  {total / args.duration:.1f} requests/s overall")
+    print(
+        f"   {'operation':<10} {'requests':>8} {'errors':>6} {'rps':>7}"
+        f" {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for name, result in operations.items():
+        print(
+            f"   {name:<10} {result['requests']:>8} {result['errors']:>6}"
+            f" {result['rps']:>7.1f} {result['p50_ms']:>8.1f} {result['p90_ms']:>8.1f}"
+            f" {result['p99_ms']:>8.1f} {result['max_ms']:>8.1f}"
+        )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        config = {
+            name: value if isinstance(value, (int, float, dict)) else str(value)
+            for name, value in vars(args).items()
+            if name not in ("output", "compare")
+        }
+        args.output.write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "config": config,
+                    "operations": operations,
+                },
+                indent=2,
+            )
+        )
+        print(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(operations, args.compare, args.threshold)
+        if regressions:
+            print(f"❌ {regressions} operation(s) worse than the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of serializing flashcard lists.
+
+Compares the response_model path (a pydantic model per row, validated again
+by FastAPI, dumped and encoded with json) with RowsResponse (plain dicts
+encoded by pydantic-core), on rows shaped like GET /flashcards.
+
+    poetry run python -m benchmarks.serialization --rows 20000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend.models import FlashcardModel
+from backend.responses import RowsResponse
+from chinochau import pinyin_cache
+from chinochau.dictionary import get_dictionary, is_cjk
+
+
+def sample_rows(count: int) -> List[dict]:
+    dictionary = get_dictionary()
+    words = [word for word in dictionary.simplified if all(map(is_cjk, word))]
+    return [
+        {
+            "id": id,
+            "chinese": word,
+            "pinyin": pinyin_cache.get(word),
+            "definitions": tuple(dictionary.lookup(word)),
+        }
+        for id, word in enumerate(words[:count], start=1)
+    ]
+
+
+def response_model_path(rows: List[dict]) -> bytes:
+    """What a route returning models with a response_model does."""
+    adapter = TypeAdapter(List[FlashcardModel])
+    models = [FlashcardModel(**row) for row in rows]
+    content = adapter.dump_python(adapter.validate_python(models), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def rows_response_path(rows: List[dict]) -> bytes:
+    return RowsResponse(rows).body
+
+
+def measure(function, rows: List[dict], repeat: int) -> float:
+    """Best time per row in microseconds."""
+    function(rows)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(rows)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = sample_rows(args.rows)
+    assert json.loads(response_model_path(rows)) == json.loads(rows_response_path(rows))
+
+    print(f"⏱️  Serializing {len(rows)} flashcards (best of {args.repeat})")
+    for name, function in [
+        ("response_model", response_model_path),
+        ("RowsResponse", rows_response_path),
+    ]:
+        per_row = measure(function, rows, args.repeat)
+        total = per_row * len(rows) / 1000
+        print(f"   {name:<15} {per_row:6.2f} µs/row  {total:7.1f} ms total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Circuit breaker for calls to flaky external services.
+
+After `failure_threshold` consecutive failures the circuit opens and calls
+fail at once with CircuitOpen instead of waiting for another timeout. Once
+`reset_timeout` seconds have passed a single probe call is let through:
+success closes the circuit again, failure keeps it open for another period.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+from chinochau.metrics import CollectedCounter, Gauge
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+breakers: List["CircuitBreaker"] = []
+
+
+class CircuitOpen(Exception):
+    """The circuit is open; `retry_after` seconds until the next probe."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.rejected = 0
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+        breakers.append(self)
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until a call may be let through."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+
+    @contextmanager
+    def call(self):
+        """Guard one call; raises CircuitOpen if it may not be made."""
+        with self._lock:
+            state = self.state
+            if state == OPEN or (state == HALF_OPEN and self._probing):
+                self.rejected += 1
+                raise CircuitOpen(self.name, self.retry_after() or self.reset_timeout)
+            if state == HALF_OPEN:
+                self._probing = True
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self._probing = False
+                self._failures += 1
+                if self._opened_at is not None or (
+                    self._failures >= self.failure_threshold
+                ):
+                    self._opened_at = self.clock()
+            raise
+        except BaseException:
+            # Cancelled: no verdict on the service
+            with self._lock:
+                self._probing = False
+            raise
+        with self._lock:
+            self._probing = False
+            self._failures = 0
+            self._opened_at = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+
+def _states() -> Dict[tuple, float]:
+    return {(breaker.name,): STATE_VALUES[breaker.state] for breaker in breakers}
+
+
+Gauge(
+    "chinochau_circuit_state",
+    "Circuit breaker state: 0 closed, 1 half open (probing), 2 open.",
+    ["circuit"],
+    _states,
+)
+CollectedCounter(
+    "chinochau_circuit_rejections_total",
+    "Calls failed fast because their circuit was open.",
+    ["circuit"],
+    lambda: {(breaker.name,): breaker.rejected for breaker in breakers},
+)
@@ -1,12 +1,36 @@
+import os
+from functools import lru_cache
+
 # Use langchain for structured output parsing
 from langchain_core.output_parsers import PydanticOutputParser
 from openai import OpenAI
 from pydantic import BaseModel, Field
 
-with open("api_key.txt", "r") as f:
-    key = f.read().strip()
+from chinochau.metrics import timed
+
+# Any OpenAI compatible chat completions API, e.g. the local stand-in in
+# benchmarks/fake_upstreams.py
+DEEPSEEK_URL = os.getenv("CHINOCHAU_DEEPSEEK_URL", "https://api.deepseek.com")
+# Seconds per attempt, and attempts repeated after errors and timeouts
+DEEPSEEK_TIMEOUT = float(os.getenv("CHINOCHAU_DEEPSEEK_TIMEOUT", "600"))
+DEEPSEEK_MAX_RETRIES = int(os.getenv("CHINOCHAU_DEEPSEEK_MAX_RETRIES", "2"))
+# Read when CHINOCHAU_DEEPSEEK_API_KEY is not set
+API_KEY_FILE = "api_key.txt"
 
-client = OpenAI(api_key=key, base_url="https://api.deepseek.com")
+
+@lru_cache(maxsize=None)
+def get_client() -> OpenAI:
+    """The DeepSeek client, created on first use."""
+    key = os.getenv("CHINOCHAU_DEEPSEEK_API_KEY")
+    if key is None:
+        with open(API_KEY_FILE, "r") as f:
+            key = f.read().strip()
+    return OpenAI(
+        api_key=key,
+        base_url=DEEPSEEK_URL,
+        timeout=DEEPSEEK_TIMEOUT,
+        max_retries=DEEPSEEK_MAX_RETRIES,
+    )
 
 
 # Define a Pydantic model for structured output
@@ -19,12 +43,13 @@ class ExampleOutput(BaseModel):
 parser = PydanticOutputParser(pydantic_object=ExampleOutput)
 
 
+@timed("deepseek")
 def get_examples_deepseek(word: str, number_of_examples: int = 2) -> list[str]:
     prompt = (
         f"你是一位中文教师，面向HSK4水平的学生。当学生给出一个词语时，你需用中文回复{number_of_examples}个不同的例句来演示该词的用法。"
         "请以JSON格式输出，键为'examples'，值为例句组成的数组。不要编号，不要拼音、英语或任何额外解释。"
     )
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model="deepseek-chat",
         messages=[
             {"role": "system", "content": prompt},
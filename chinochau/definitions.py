@@ -0,0 +1,74 @@
+"""Definition lookup pipeline: dictionary, then composition, then Google.
+
+Unknown compounds are often made of known words (数不清的 = 数不清 + 的), so
+before reaching for Google Translate the word is segmented and a definition
+is composed from the entries of its parts. Google is only queried when some
+part of the input is not covered by the dictionary.
+"""
+import asyncio
+from collections import Counter
+from typing import List, Optional
+
+from chinochau.dictionary import Dictionary, get_dictionary
+from chinochau.translate_google import translate_google
+
+# Definitions kept per component when composing
+COMPONENT_DEFINITIONS = 3
+
+# Lookups resolved by each stage; "composed" is the number of network
+# calls avoided
+counters = Counter()
+
+_LOW_VALUE_PREFIXES = ("surname ", "variant of ", "old variant of ", "CL:")
+
+
+def _component_definitions(definitions: List[str]) -> List[str]:
+    """Prefer meanings over cross-references when summarizing an entry."""
+    useful = [d for d in definitions if not d.startswith(_LOW_VALUE_PREFIXES)]
+    return (useful or definitions)[:COMPONENT_DEFINITIONS]
+
+
+def compose_definitions(
+    chinese: str, dictionary: Optional[Dictionary] = None
+) -> Optional[List[str]]:
+    """Build definitions for `chinese` out of its dictionary words.
+
+    Returns one line per component, e.g. "数不清: countless; innumerable",
+    or None when some part is not in the dictionary.
+    """
+    if dictionary is None:
+        dictionary = get_dictionary()
+    composed = []
+    for token in dictionary.segment(chinese):
+        if token.is_word:
+            definitions = _component_definitions(token.definitions)
+            composed.append(f"{token.text}: {'; '.join(definitions)}")
+        elif token.text.isalnum():
+            # Unknown ideographs or foreign words cannot be composed;
+            # whitespace and punctuation are simply skipped
+            return None
+    return composed or None
+
+
+def get_offline_definitions(chinese: str) -> Optional[List[str]]:
+    """Dictionary and compositional stages, without any network access."""
+    dictionary = get_dictionary()
+    definitions = dictionary.lookup(chinese)
+    if definitions:
+        counters["dictionary"] += 1
+        return definitions
+    definitions = compose_definitions(chinese, dictionary)
+    if definitions:
+        counters["composed"] += 1
+        return definitions
+    return None
+
+
+async def get_definitions(chinese: str) -> List[str]:
+    """Offline stages first, Google Translate as the last resort."""
+    # The first lookup loads the dictionary, keep it off the event loop
+    definitions = await asyncio.to_thread(get_offline_definitions, chinese)
+    if definitions:
+        return definitions
+    counters["google"] += 1
+    return await translate_google(chinese)
@@ -0,0 +1,423 @@
+"""CC-CEDICT dictionary with a headword trie for word segmentation.
+
+The data file defaults to the one shipped with the `pinyin` package and can
+be pointed elsewhere with the CHINOCHAU_CEDICT_PATH environment variable.
+It is parsed once into entries, headword indexes and a character trie. The
+trie lets segmentation walk the input one character at a time instead of
+slicing out every candidate substring.
+
+The shared instance can be rebuilt from an updated file while the app is
+serving: the new dictionary and its indexes are built in a background
+thread and swapped in with a single reference assignment, so lookups never
+wait and in-flight requests keep the dictionary they started with.
+"""
+import gzip
+import os
+import re
+import signal
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock, RLock, Thread
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import pinyin.cedict
+
+from chinochau import pinyin_cache
+
+if TYPE_CHECKING:
+    from chinochau.prefix_index import PrefixIndex
+    from chinochau.reverse_index import ReverseIndex
+    from chinochau.script import ScriptConverter
+
+CEDICT_PATH = os.getenv(
+    "CHINOCHAU_CEDICT_PATH",
+    os.path.join(os.path.dirname(pinyin.cedict.__file__), "cedict.txt.gz"),
+)
+# Directory that reloads requested over the API may read from
+CEDICT_DIR = os.getenv("CHINOCHAU_CEDICT_DIR", os.path.dirname(CEDICT_PATH))
+
+_LINE = re.compile(r"^([^ ]+) ([^ ]+) \[(.*)\] /(.+)/")
+
+# Key marking the end of a headword in the trie; never a real character
+_END = ""
+
+
+def is_cjk(char: str) -> bool:
+    """Whether `char` is a CJK ideograph."""
+    code = ord(char)
+    return (
+        0x4E00 <= code <= 0x9FFF
+        or 0x3400 <= code <= 0x4DBF
+        or 0xF900 <= code <= 0xFAFF
+        or 0x20000 <= code <= 0x2FFFF
+    )
+
+
+def _run_kind(char: str) -> Optional[str]:
+    """Group unknown characters that belong together in one token."""
+    if char.isspace():
+        return "space"
+    if char.isalnum() and not is_cjk(char):
+        return "alnum"
+    return None
+
+
+def open_cedict(path: str):
+    """Open a CEDICT file for reading lines, gzip-compressed or plain text."""
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, mode="rt", encoding="utf-8")
+
+
+@dataclass(frozen=True, slots=True)
+class DictionaryEntry:
+    traditional: str
+    simplified: str
+    pinyin: str
+    definitions: Tuple[str, ...]
+
+
+@dataclass
+class Token:
+    text: str
+    pinyin: str
+    definitions: List[str]
+    is_word: bool
+
+
+class Dictionary:
+    """In-memory CEDICT, immutable once built."""
+
+    def __init__(self, entries: List[DictionaryEntry]):
+        self.entries = entries
+        self.simplified: Dict[str, List[int]] = {}
+        self.traditional: Dict[str, List[int]] = {}
+        self.trie: dict = {}
+        self.max_word_length = 0
+        # Indexes derived from the entries, built on first use; reentrant,
+        # as indexes are built from other derived data
+        self._derived = {}
+        self._lock = RLock()
+
+        for index, entry in enumerate(entries):
+            self.simplified.setdefault(entry.simplified, []).append(index)
+            self.traditional.setdefault(entry.traditional, []).append(index)
+            for word in {entry.simplified, entry.traditional}:
+                # Latin-only headwords such as "A" would split ordinary
+                # English text into single letters
+                if any(is_cjk(char) for char in word):
+                    self._add_to_trie(word)
+
+    @classmethod
+    def from_file(cls, path: str = CEDICT_PATH) -> "Dictionary":
+        """Parse a CEDICT file, gzip-compressed or plain text."""
+        entries = []
+        with open_cedict(path) as lines:
+            for line in lines:
+                if line.startswith("#"):
+                    continue
+                match = _LINE.match(line)
+                if match is None:
+                    continue
+                traditional, simplified, reading, meaning = match.groups()
+                entries.append(
+                    DictionaryEntry(
+                        traditional=traditional,
+                        simplified=simplified,
+                        pinyin=reading,
+                        definitions=tuple(meaning.split("/")),
+                    )
+                )
+        return cls(entries)
+
+    def _derive(self, name: str, build):
+        index = self._derived.get(name)
+        if index is None:
+            with self._lock:
+                index = self._derived.get(name)
+                if index is None:
+                    index = self._derived[name] = build(self)
+        return index
+
+    @property
+    def compound_counts(self) -> Dict[str, int]:
+        """Number of headwords containing each headword.
+
+        CEDICT has no frequency data; common words and characters (好, 学习)
+        are the building blocks of many compounds, rare ones are not.
+        """
+        return self._derive("compound_counts", count_compounds)
+
+    @property
+    def reverse_index(self) -> "ReverseIndex":
+        """English -> Chinese search index."""
+        from chinochau.reverse_index import ReverseIndex
+
+        return self._derive("reverse_index", ReverseIndex)
+
+    @property
+    def prefix_index(self) -> "PrefixIndex":
+        """Headword and pinyin autocomplete index."""
+        from chinochau.prefix_index import PrefixIndex
+
+        return self._derive("prefix_index", PrefixIndex)
+
+    @property
+    def script_converter(self) -> "ScriptConverter":
+        """Traditional <-> Simplified conversion tables."""
+        from chinochau.script import ScriptConverter
+
+        return self._derive("script_converter", ScriptConverter.from_dictionary)
+
+    def _add_to_trie(self, word: str):
+        node = self.trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_END] = True
+        self.max_word_length = max(self.max_word_length, len(word))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.simplified or word in self.traditional
+
+    def entries_for(self, word: str) -> List[DictionaryEntry]:
+        """All entries whose simplified or traditional headword is `word`."""
+        indexes = self.simplified.get(word) or self.traditional.get(word) or []
+        return [self.entries[index] for index in indexes]
+
+    def lookup(self, word: str) -> Optional[List[str]]:
+        """Definitions for `word`, merged across entries, or None."""
+        entries = self.entries_for(word)
+        if not entries:
+            return None
+        definitions = []
+        for entry in entries:
+            for definition in entry.definitions:
+                if definition not in definitions:
+                    definitions.append(definition)
+        return definitions
+
+    def _spans(self, text: str) -> Iterator[Tuple[int, int, bool]]:
+        """Yield (start, end, is_word) spans of the best segmentation.
+
+        Dynamic programming over the positions of a window, minimizing the
+        number of tokens and, on ties, the sum of squared token lengths (so
+        evenly sized words win, e.g. 研究/生命 over 研究生/命). A window is
+        closed and emitted as soon as no candidate word crosses its end, so
+        memory stays bounded by the longest run of overlapping words rather
+        than by the input length.
+        """
+        trie = self.trie
+        length = len(text)
+        start = 0
+        # best[k] describes the best path to position start + k:
+        # (tokens, squares, previous position, is_word)
+        best = [(0, 0, -1, False)]
+        reach = 0
+
+        for i in range(length):
+            tokens, squares, _, _ = best[i - start]
+            # Word ends reachable from i, found by walking the trie
+            ends = []
+            node = trie.get(text[i])
+            j = i
+            while node is not None:
+                j += 1
+                if _END in node:
+                    ends.append((j, True))
+                if j >= length:
+                    break
+                node = node.get(text[j])
+            if not ends or ends[0][0] != i + 1:
+                # Unknown single character, always available as a fallback
+                ends.insert(0, (i + 1, False))
+
+            for end, is_word in ends:
+                offset = end - start
+                while len(best) <= offset:
+                    best.append(None)
+                cost = (tokens + 1, squares + (end - i) ** 2)
+                current = best[offset]
+                if current is None or cost < current[:2]:
+                    best[offset] = cost + (i, is_word)
+                reach = max(reach, end)
+
+            if reach == i + 1:
+                # Nothing crosses this position: the window is final
+                spans = []
+                position = i + 1
+                while position > start:
+                    _, _, previous, is_word = best[position - start]
+                    spans.append((previous, position, is_word))
+                    position = previous
+                yield from reversed(spans)
+                start = i + 1
+                best = [(0, 0, -1, False)]
+
+    def segment(self, text: str) -> Iterator[Token]:
+        """Segment `text` into dictionary words, streaming tokens out.
+
+        Characters outside the dictionary are grouped into runs of letters
+        and digits or runs of whitespace; anything else (punctuation,
+        unknown ideographs) is emitted one character at a time.
+        """
+        run_start = run_end = 0
+        run_kind = None
+        for start, end, is_word in self._spans(text):
+            kind = None if is_word else _run_kind(text[start])
+            if run_kind is not None and kind == run_kind:
+                run_end = end
+                continue
+            if run_kind is not None:
+                yield self._token(text[run_start:run_end], False)
+                run_kind = None
+            if kind is not None:
+                run_start, run_end, run_kind = start, end, kind
+            else:
+                yield self._token(text[start:end], is_word)
+        if run_kind is not None:
+            yield self._token(text[run_start:run_end], False)
+
+    def _token(self, text: str, is_word: bool) -> Token:
+        definitions = (self.lookup(text) or []) if is_word else []
+        return Token(
+            text=text,
+            pinyin=pinyin_cache.get(text),
+            definitions=definitions,
+            is_word=is_word,
+        )
+
+
+@dataclass
+class DictionaryStatus:
+    path: Optional[str] = None
+    entries: int = 0
+    build_seconds: Optional[float] = None
+    loaded_at: Optional[datetime] = None
+    reloading: bool = False
+    error: Optional[str] = None
+
+
+def count_compounds(dictionary: Dictionary) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for word in dictionary.simplified:
+        seen = set()
+        for length in range(1, len(word)):
+            for start in range(len(word) - length + 1):
+                part = word[start : start + length]
+                if part not in seen and part in dictionary.simplified:
+                    seen.add(part)
+                    counts[part] = counts.get(part, 0) + 1
+    return counts
+
+
+_dictionary: Optional[Dictionary] = None
+_dictionary_lock = Lock()
+_reload_lock = Lock()
+status = DictionaryStatus()
+
+
+def build_dictionary(path: str = CEDICT_PATH) -> Dictionary:
+    """Load a dictionary with all of its indexes ready to serve."""
+    dictionary = Dictionary.from_file(path)
+    dictionary.reverse_index
+    dictionary.prefix_index
+    dictionary.script_converter
+    return dictionary
+
+
+def _load(path: str) -> Dictionary:
+    started = time.perf_counter()
+    dictionary = build_dictionary(path)
+    status.path = path
+    status.entries = len(dictionary)
+    status.build_seconds = time.perf_counter() - started
+    status.loaded_at = datetime.utcnow()
+    status.error = None
+    return dictionary
+
+
+def get_dictionary() -> Dictionary:
+    """Return the shared dictionary, loading it on first use."""
+    global _dictionary
+    if _dictionary is None:
+        with _dictionary_lock:
+            if _dictionary is None:
+                _dictionary = _load(CEDICT_PATH)
+    return _dictionary
+
+
+def loaded_dictionary() -> Optional[Dictionary]:
+    """The shared dictionary if it is loaded, without loading it."""
+    return _dictionary
+
+
+def _reload(path: Optional[str]) -> DictionaryStatus:
+    global _dictionary
+    status.reloading = True
+    try:
+        _dictionary = _load(path or status.path or CEDICT_PATH)
+    except Exception as e:
+        status.error = str(e)
+        raise
+    finally:
+        status.reloading = False
+    return status
+
+
+def reload_dictionary(path: Optional[str] = None) -> DictionaryStatus:
+    """Rebuild the shared dictionary from `path` and swap it in.
+
+    Blocks the calling thread for the duration of the build; lookups from
+    other threads keep using the current dictionary meanwhile. Concurrent
+    reloads are rejected rather than queued.
+    """
+    if not _reload_lock.acquire(blocking=False):
+        raise RuntimeError("A dictionary reload is already running")
+    try:
+        return _reload(path)
+    finally:
+        _reload_lock.release()
+
+
+def data_file(name: str) -> str:
+    """`name` resolved within CEDICT_DIR; ValueError if it leads outside."""
+    directory = os.path.realpath(CEDICT_DIR)
+    path = os.path.realpath(os.path.join(directory, name))
+    if os.path.commonpath([directory, path]) != directory:
+        raise ValueError(f"{name} is outside the dictionary directory")
+    return path
+
+
+def start_reload(path: Optional[str] = None) -> bool:
+    """Reload the dictionary in a background thread.
+
+    Returns False when a reload is already in progress.
+    """
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    status.reloading = True
+
+    def run():
+        try:
+            _reload(path)
+        except Exception as e:
+            print(f"❌ Dictionary reload failed: {e}")
+        finally:
+            _reload_lock.release()
+
+    Thread(target=run, name="dictionary-reload", daemon=True).start()
+    return True
+
+
+def install_reload_signal_handler():
+    """Reload the dictionary when the process receives SIGHUP."""
+    if not hasattr(signal, "SIGHUP"):
+        return
+    try:
+        signal.signal(signal.SIGHUP, lambda signum, frame: start_reload())
+    except ValueError:
+        # Only the main thread may install signal handlers
+        pass
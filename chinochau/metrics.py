@@ -0,0 +1,232 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are updated where the work happens; recording a
+value is a dictionary lookup, a bisect over the bucket bounds and a few
+additions under a per-metric lock. Values that already exist elsewhere
+(cache statistics, pool sizes) are read by callbacks only when the metrics
+are scraped, so they cost nothing per request.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from chinochau import tracing
+
+# Upper bounds in seconds, from fast SQL queries to slow network calls
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5)
+BUCKETS += (1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+_registry: Dict[str, "Metric"] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        if name in _registry:
+            raise ValueError(f"Metric {name} is already registered")
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def _label_dict(self, values: Labels) -> Dict[str, str]:
+        return dict(zip(self.labels, values))
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """A count that only goes up, per combination of label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, self._label_dict(labels), value
+
+
+class Histogram(Metric):
+    """Observed values counted into cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # Per label values: a count per bucket (the last is +Inf) and the sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = [
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            ]
+        for labels, counts, total in values:
+            label_dict = self._label_dict(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**label_dict, "le": _format_value(float(bound))},
+                    cumulative,
+                )
+            yield f"{self.name}_count", label_dict, cumulative
+            yield f"{self.name}_sum", label_dict, total
+
+
+class Gauge(Metric):
+    """Values read from a callback when metrics are scraped.
+
+    The callback returns a mapping from label values to the current value.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        collect: Callable[[], Dict[Labels, float]] = dict,
+    ):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in self.collect().items():
+            yield self.name, self._label_dict(labels), value
+
+
+class CollectedCounter(Gauge):
+    """A counter kept elsewhere (e.g. cache statistics), read when scraped."""
+
+    type = "counter"
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text format."""
+    lines = []
+    for metric in _registry.values():
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+dependency_duration = Histogram(
+    "chinochau_dependency_duration_seconds",
+    "Time spent calling external dependencies, by outcome.",
+    ["dependency", "outcome"],
+)
+
+# Seconds per dependency for the current request, while it is being profiled
+dependency_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "dependency_timings", default=None
+)
+
+
+def record_dependency(elapsed: float, dependency: str, outcome: str) -> None:
+    """Record one call to a dependency that took `elapsed` seconds."""
+    dependency_duration.observe(elapsed, dependency, outcome)
+    timings = dependency_timings.get()
+    if timings is not None:
+        timings[dependency] = timings.get(dependency, 0.0) + elapsed
+
+
+@contextmanager
+def track(dependency: str):
+    """Time a call to an external dependency, recording whether it failed."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with tracing.span(dependency, "dependency"):
+            yield
+        outcome = "ok"
+    finally:
+        record_dependency(time.perf_counter() - start, dependency, outcome)
+
+
+def timed(dependency: str):
+    """Decorator form of `track` for sync and async functions."""
+
+    def decorator(function):
+        if iscoroutinefunction(function):
+
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with track(dependency):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with track(dependency):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,77 @@
+"""Cached pinyin conversion.
+
+`pinyin.get` re-derives the tone mark placement for every character on
+every call. Here the rendering is done once per character into a lookup
+table, and whole strings are memoized in a bounded LRU cache, so a
+conversion is a dict lookup per character at worst and cheap enough to run
+directly on the event loop.
+"""
+import unicodedata
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, List
+
+import pinyin
+from pinyin.pinyin import pinyin_dict
+
+# Maximum number of distinct (text, delimiter, format) conversions kept
+CACHE_SIZE = 20000
+
+FORMATS = ("diacritical", "numerical", "strip")
+
+_tables: Dict[str, Dict[str, str]] = {}
+_tables_lock = Lock()
+
+
+def _build_table(format: str) -> Dict[str, str]:
+    """Render every character known to the pinyin package in `format`."""
+    table = {}
+    for key in pinyin_dict:
+        char = chr(int(key, 16))
+        # Reuse the package's own rendering so output stays identical
+        try:
+            table[char] = pinyin.get(char, format=format)
+        except RuntimeError:
+            # Vowelless readings (e.g. "ng3") have nowhere to put a tone
+            # mark and make `pinyin.get` blow up; fall back to no mark.
+            table[char] = pinyin.get(char, format="strip")
+    return table
+
+
+def get_table(format: str = "diacritical") -> Dict[str, str]:
+    """Return the precomputed character -> pinyin table for `format`."""
+    table = _tables.get(format)
+    if table is None:
+        if format not in FORMATS:
+            raise ValueError("Format must be one of: numerical/diacritical/strip")
+        with _tables_lock:
+            table = _tables.get(format)
+            if table is None:
+                table = _tables[format] = _build_table(format)
+    return table
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get(text: str, delimiter: str = "", format: str = "diacritical") -> str:
+    """Return the pinyin of `text`, same output as `pinyin.get`."""
+    table = get_table(format)
+    return delimiter.join(
+        [table.get(char) or unicodedata.normalize("NFC", char) for char in text]
+    )
+
+
+def get_many(
+    texts: List[str], delimiter: str = "", format: str = "diacritical"
+) -> List[str]:
+    """Convert a batch of strings, preserving order."""
+    return [get(text, delimiter, format) for text in texts]
+
+
+def cache_info():
+    """Expose the string-level cache statistics."""
+    return get.cache_info()
+
+
+def clear_cache():
+    """Drop memoized conversions (the character tables are kept)."""
+    get.cache_clear()
@@ -0,0 +1,103 @@
+"""Prefix index over dictionary headwords and toneless pinyin.
+
+Keys (simplified and traditional headwords, and the toneless pinyin of
+each entry with syllables joined: "nihao") are kept in one sorted list, so
+all keys starting with a prefix form a contiguous range found with two
+binary searches. Short prefixes ("n", "ni") cover thousands of keys; for
+those the best suggestions are computed at build time.
+
+CEDICT carries no frequency data, so words are ranked by how many other
+headwords contain them: common words and characters (好, 学习) are the
+building blocks of many compounds, rare ones are not.
+"""
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Dict, List
+
+from chinochau.dictionary import is_cjk
+
+if TYPE_CHECKING:
+    from chinochau.dictionary import Dictionary, DictionaryEntry
+
+# Suggestions precomputed for prefixes matching more keys than this
+PRECOMPUTE_THRESHOLD = 200
+
+# Most suggestions a single query can return
+MAX_SUGGESTIONS = 50
+
+
+def normalize_pinyin(text: str) -> str:
+    """Lowercase toneless pinyin without separators: "Nǐ hǎo" -> "nihao"."""
+    text = text.lower().replace("u:", "v").replace("ü", "v")
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^a-z]", "", text)
+
+
+class PrefixIndex:
+    """Search-as-you-type lookup of dictionary entries."""
+
+    def __init__(self, dictionary: "Dictionary"):
+        self.dictionary = dictionary
+        entries = dictionary.entries
+
+        # Frequency proxy: number of headwords containing the word
+        containing = dictionary.compound_counts
+        self.scores = array(
+            "i", [containing.get(entry.simplified, 0) for entry in entries]
+        )
+
+        pairs = set()
+        for index, entry in enumerate(entries):
+            pairs.add((entry.simplified, index))
+            pairs.add((entry.traditional, index))
+            reading = normalize_pinyin(entry.pinyin)
+            if reading:
+                pairs.add((reading, index))
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.ids = array("i", [index for _, index in pairs])
+
+        self.precomputed: Dict[str, List[int]] = {}
+        for length in (1, 2, 3):
+            start = 0
+            while start < len(self.keys):
+                prefix = self.keys[start][:length]
+                end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+                if len(prefix) == length and end - start > PRECOMPUTE_THRESHOLD:
+                    self.precomputed[prefix] = self._rank(start, end, MAX_SUGGESTIONS)
+                start = end
+
+    def _rank(self, start: int, end: int, limit: int) -> List[int]:
+        scores = self.scores
+        entries = self.dictionary.entries
+        # One suggestion per word, even if it has several entries
+        candidates: Dict[str, int] = {}
+        for index in self.ids[start:end]:
+            candidates.setdefault(entries[index].simplified, index)
+        return heapq.nlargest(
+            limit,
+            candidates.values(),
+            key=lambda index: (scores[index], -len(entries[index].simplified)),
+        )
+
+    def suggest(self, prefix: str, limit: int = 10) -> List["DictionaryEntry"]:
+        """Entries whose headword or pinyin starts with `prefix`."""
+        if any(is_cjk(char) for char in prefix):
+            prefix = prefix.strip()
+        else:
+            prefix = normalize_pinyin(prefix)
+        if not prefix:
+            return []
+
+        limit = min(limit, MAX_SUGGESTIONS)
+        ranked = self.precomputed.get(prefix)
+        if ranked is None:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+            ranked = self._rank(start, end, limit)
+        entries = self.dictionary.entries
+        return [entries[index] for index in ranked[:limit]]
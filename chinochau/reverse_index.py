@@ -0,0 +1,180 @@
+"""English -> Chinese search over CEDICT definitions.
+
+Every sense of a dictionary entry ("to learn", "to study") is a BM25
+document, and an entry scores as its best matching sense, so an entry whose
+sense is exactly the query beats one that merely mentions it in a long
+gloss. The BM25 contribution of every (term, sense) pair only depends on
+corpus statistics, so it is computed once at build time and a query is just
+a sum of precomputed weights.
+
+A sense that is exactly the query, function words included ("to study"),
+has its score doubled. Many entries often share such a gloss, so ties are
+broken by how common the headword looks: CEDICT has no frequencies, but
+common characters and words appear inside many other headwords (学 in
+hundreds of compounds), and a word with a long list of senses is more
+often a rare or literary one.
+
+Postings are stored by decreasing weight. Very common terms ("person",
+"one", "to") appear in thousands of senses; only the `MAX_POSTINGS`
+strongest are scanned per term and `MAX_SCANNED` per query, which bounds
+query time without changing the top results in practice.
+"""
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from chinochau.dictionary import Dictionary, DictionaryEntry
+
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Postings scanned per query term, and over all terms of a query
+MAX_POSTINGS = 2000
+MAX_SCANNED = 4000
+
+# Score multiplier for a sense that is exactly the query
+EXACT_BOOST = 2.0
+
+_TERM = re.compile(r"[a-z0-9]+")
+
+# Dropped from queries that also contain meaningful terms
+STOPWORDS = frozenset(
+    ["a", "an", "and", "as", "at", "be", "by", "for", "in", "is", "of", "on"]
+    + ["or", "sb", "sth", "the", "to", "with"]
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TERM.findall(text.lower())
+
+
+@dataclass
+class SearchResult:
+    entry: "DictionaryEntry"
+    score: float
+
+
+def commonness(dictionary: "Dictionary", senses: List[int]) -> array:
+    """Estimate how common every headword is from the headword list alone.
+
+    A word scores the average commonness of its characters plus how often it
+    appears inside longer headwords, minus a penalty for many senses.
+    """
+    compounds = dictionary.compound_counts
+    scores = array("f")
+    for entry, count in zip(dictionary.entries, senses):
+        word = entry.simplified
+        characters = sum(math.log1p(compounds.get(c, 0)) for c in word)
+        scores.append(
+            characters / max(len(word), 1)
+            + 0.5 * math.log1p(compounds.get(word, 0))
+            - 0.5 * math.log(max(count, 1))
+        )
+    return scores
+
+
+class ReverseIndex:
+    """Inverted index from English terms to dictionary senses."""
+
+    def __init__(self, dictionary: "Dictionary"):
+        self.dictionary = dictionary
+        # Entry index of every sense
+        self.sense_entry = array("i")
+        # Hash of the full gloss of every sense, for exact matches
+        self.sense_gloss = array("q")
+        lengths = array("i")
+        sense_counts = []
+        term_senses: Dict[str, List[Tuple[int, int]]] = {}
+
+        for index, entry in enumerate(dictionary.entries):
+            first = len(self.sense_entry)
+            for definition in entry.definitions:
+                # Classifier notes ("CL:個|个[ge4]") are not meanings
+                if definition.startswith("CL:"):
+                    continue
+                terms = tokenize(definition)
+                if not terms:
+                    continue
+                sense = len(self.sense_entry)
+                self.sense_entry.append(index)
+                self.sense_gloss.append(hash(" ".join(terms)))
+                lengths.append(len(terms))
+                for term, frequency in Counter(terms).items():
+                    term_senses.setdefault(term, []).append((sense, frequency))
+            sense_counts.append(len(self.sense_entry) - first)
+
+        self.commonness = commonness(dictionary, sense_counts)
+
+        total = len(lengths)
+        average = (sum(lengths) / total) if total else 0.0
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        for term, senses in term_senses.items():
+            idf = math.log(1 + (total - len(senses) + 0.5) / (len(senses) + 0.5))
+            weighted = sorted(
+                (
+                    (
+                        idf
+                        * frequency
+                        * (K1 + 1)
+                        / (frequency + K1 * (1 - B + B * lengths[sense] / average)),
+                        sense,
+                    )
+                    for sense, frequency in senses
+                ),
+                reverse=True,
+            )
+            self.postings[term] = (
+                array("i", [sense for _, sense in weighted]),
+                array("f", [weight for weight, _ in weighted]),
+            )
+
+    def __len__(self):
+        return len(self.postings)
+
+    def search(self, query: str, limit: int = 20) -> List[SearchResult]:
+        """Return the best matching entries for an English query."""
+        tokens = tokenize(query)
+        gloss = hash(" ".join(tokens))
+        terms = set(tokens)
+        meaningful = terms - STOPWORDS
+        if meaningful:
+            terms = meaningful
+        scanned = min(MAX_POSTINGS, MAX_SCANNED // max(len(terms), 1))
+
+        sense_scores: Dict[int, float] = {}
+        get = sense_scores.get
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            senses, weights = postings
+            for sense, weight in zip(senses[:scanned], weights[:scanned]):
+                sense_scores[sense] = get(sense, 0.0) + weight
+
+        entry_scores: Dict[int, float] = {}
+        sense_entry = self.sense_entry
+        sense_gloss = self.sense_gloss
+        for sense, score in sense_scores.items():
+            if sense_gloss[sense] == gloss:
+                score *= EXACT_BOOST
+            index = sense_entry[sense]
+            if score > entry_scores.get(index, 0.0):
+                entry_scores[index] = score
+
+        entries = self.dictionary.entries
+        commonness = self.commonness
+        best = heapq.nlargest(
+            limit,
+            entry_scores.items(),
+            # Common headwords first among equally good matches
+            key=lambda item: (item[1], commonness[item[0]]),
+        )
+        return [
+            SearchResult(entry=entries[index], score=score) for index, score in best
+        ]
@@ -0,0 +1,117 @@
+"""Traditional <-> Simplified conversion tables derived from CEDICT.
+
+Every entry whose traditional and simplified headwords have the same length
+gives a character-by-character correspondence. For each character the most
+common counterpart wins, and the tables are applied with `str.translate`.
+Whole words found in the dictionary use the entry's own form instead, which
+resolves one-to-many cases such as 发 -> 發 (发展) / 髮 (头发).
+
+Keys used for lookups and caches are normalized to simplified so that 學習
+and 学习 hit the same card, dictionary entry and cache slot; the text the
+user typed is kept for display. The tables only need the headwords, so keys
+are normalized with tables read straight from the CEDICT file until the
+shared dictionary is loaded, rather than waiting for it and its indexes.
+"""
+from collections import Counter
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+
+from chinochau import dictionary as cedict
+from chinochau.dictionary import Dictionary
+
+SCRIPTS = ("original", "simplified", "traditional")
+
+
+def _most_common(pairs: Dict[str, Counter]) -> Dict[int, str]:
+    table = {}
+    for char, counterparts in pairs.items():
+        target = counterparts.most_common(1)[0][0]
+        if target != char:
+            table[ord(char)] = target
+    return table
+
+
+class ScriptConverter:
+    """Convert between traditional and simplified Chinese."""
+
+    def __init__(self, headwords: Iterable[Tuple[str, str]]):
+        """Build the tables from (traditional, simplified) headword pairs."""
+        # Whole words, the first entry's counterpart winning
+        self._simplified_words: Dict[str, str] = {}
+        self._traditional_words: Dict[str, str] = {}
+        to_simplified: Dict[str, Counter] = {}
+        to_traditional: Dict[str, Counter] = {}
+        for traditional_word, simplified_word in headwords:
+            self._simplified_words.setdefault(traditional_word, simplified_word)
+            self._traditional_words.setdefault(simplified_word, traditional_word)
+            if len(traditional_word) != len(simplified_word):
+                continue
+            for traditional, simplified in zip(traditional_word, simplified_word):
+                to_simplified.setdefault(traditional, Counter())[simplified] += 1
+                to_traditional.setdefault(simplified, Counter())[traditional] += 1
+        self._to_simplified = _most_common(to_simplified)
+        self._to_traditional = _most_common(to_traditional)
+
+    @classmethod
+    def from_dictionary(cls, dictionary: Dictionary) -> "ScriptConverter":
+        return cls(
+            (entry.traditional, entry.simplified) for entry in dictionary.entries
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScriptConverter":
+        """Read only the headwords of a CEDICT file, skipping the full parse."""
+        with cedict.open_cedict(path) as lines:
+            return cls(
+                line.split(" ", 2)[:2]
+                for line in lines
+                if not line.startswith("#") and line.count(" ") >= 2
+            )
+
+    def to_simplified(self, text: str) -> str:
+        word = self._simplified_words.get(text)
+        if word is not None:
+            return word
+        return text.translate(self._to_simplified)
+
+    def to_traditional(self, text: str) -> str:
+        word = self._traditional_words.get(text)
+        if word is not None:
+            return word
+        return text.translate(self._to_traditional)
+
+    def convert(self, text: str, script: str) -> str:
+        """Render `text` in one of SCRIPTS ("original" leaves it as is)."""
+        if script == "simplified":
+            return self.to_simplified(text)
+        if script == "traditional":
+            return self.to_traditional(text)
+        return text
+
+
+_key_converter: Optional[ScriptConverter] = None
+_key_converter_lock = Lock()
+
+
+def key_converter() -> ScriptConverter:
+    """The loaded dictionary's converter, or one read from the CEDICT file.
+
+    Normalizing a key, e.g. when a flush sets chinese_key, never waits for
+    the dictionary and its search indexes to be built.
+    """
+    global _key_converter
+    loaded = cedict.loaded_dictionary()
+    if loaded is not None:
+        return loaded.script_converter
+    if _key_converter is None:
+        with _key_converter_lock:
+            if _key_converter is None:
+                _key_converter = ScriptConverter.from_file(
+                    cedict.status.path or cedict.CEDICT_PATH
+                )
+    return _key_converter
+
+
+def normalize_key(text: str) -> str:
+    """Script-independent key for lookups and caches."""
+    return key_converter().to_simplified(text)
@@ -1,10 +1,8 @@
 import os
 
-import pinyin
-from pinyin.cedict import translate_word
-
+from chinochau import pinyin_cache
 from chinochau.data import Flashcard, MasterFlashcards
-from chinochau.translate_google import translate_google
+from chinochau.definitions import get_definitions, get_offline_definitions
 
 
 class ChinoChau:
@@ -38,10 +36,11 @@ class ChinoChau:
             self.flashcards = self.master_flashcards.get_flashcards_list()
 
     async def create_flashcard(self, chinese: str) -> Flashcard:
-        f_pinyin = pinyin.get(chinese)
-        f_definition = translate_word(chinese)
-        if f_definition is None and self.fill_null_definitions:
-            f_definition = await translate_google(chinese)
+        f_pinyin = pinyin_cache.get(chinese)
+        if self.fill_null_definitions:
+            f_definition = await get_definitions(chinese)
+        else:
+            f_definition = get_offline_definitions(chinese)
 
         if self.generate_examples:
             raise NotImplementedError("Example generation has not been implemented yet")
@@ -0,0 +1,303 @@
+"""Caches shared by the worker processes of one host.
+
+Each uvicorn worker has its own memory, so a word translated or given
+examples in one worker is fetched again by the next. A TieredCache looks
+in a bounded in-process LRU first and then in a SQLite file every worker
+on the host opens, copying shared hits into memory. Both tiers evict the
+least recently used entries beyond their size; the shared tier only
+refreshes an entry's access time once a minute so hits stay reads.
+
+Values must be JSON serializable. Set CHINOCHAU_SHARED_CACHE to "" to keep
+caches in memory only. Errors from the shared file (locked, disk full) are
+counted and treated as misses rather than failing the request.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from chinochau.metrics import CollectedCounter, Gauge
+
+# SQLite file shared by the workers; "" for in-process caches only
+SHARED_CACHE_PATH = os.getenv("CHINOCHAU_SHARED_CACHE", "./chinochau_cache.db")
+# Seconds between updates of a shared entry's access time
+TOUCH_INTERVAL = 60.0
+# Writes by this process between checks of the shared tier's size
+EVICT_EVERY = 100
+
+caches: Dict[str, "TieredCache"] = {}
+
+
+class CacheBackend:
+    """A cache tier: JSON serializable values by string key, None if absent."""
+
+    name = "cache"
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """LRU cache in this process's memory."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """Entries of one namespace in a SQLite file shared between processes.
+
+    The connection is opened on first use, and again after a fork, so
+    workers forked from a process that used the cache get their own.
+    """
+
+    name = "shared"
+
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int,
+        path: Optional[str] = None,
+        clock=time.time,
+    ):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        # Read at connection time when not given, so it can be changed
+        self.path = path
+        self.clock = clock
+        self.errors = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path if self.path is not None else SHARED_CACHE_PATH)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        path = self.path if self.path is not None else SHARED_CACHE_PATH
+        connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        # Readers don't block the writer, and commits don't wait for fsync
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " accessed REAL NOT NULL, PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed"
+            " ON entries (namespace, accessed)"
+        )
+        self._connection, self._pid = connection, os.getpid()
+        return connection
+
+    def _execute(self, sql: str, *parameters):
+        try:
+            with self._lock:
+                return self._connect().execute(sql, parameters).fetchall()
+        except sqlite3.Error as error:
+            self.errors += 1
+            print(f"⚠️ Shared cache {self.namespace}: {error}")
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        rows = self._execute(
+            "SELECT value, accessed FROM entries WHERE namespace = ? AND key = ?",
+            self.namespace,
+            key,
+        )
+        if not rows:
+            return None
+        value, accessed = rows[0]
+        now = self.clock()
+        if now - accessed > TOUCH_INTERVAL:
+            self._execute(
+                "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                now,
+                self.namespace,
+                key,
+            )
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            self.namespace,
+            key,
+            json.dumps(value, ensure_ascii=False),
+            self.clock(),
+        )
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries beyond `maxsize`."""
+        self._execute(
+            "DELETE FROM entries WHERE namespace = ? AND key IN ("
+            " SELECT key FROM entries WHERE namespace = ?"
+            " ORDER BY accessed LIMIT max(0, ("
+            "  SELECT count(*) FROM entries WHERE namespace = ?) - ?))",
+            self.namespace,
+            self.namespace,
+            self.namespace,
+            self.maxsize,
+        )
+
+    def delete(self, key: str) -> None:
+        if self.enabled:
+            self._execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                self.namespace,
+                key,
+            )
+
+    def clear(self) -> None:
+        if self.enabled:
+            self._execute("DELETE FROM entries WHERE namespace = ?", self.namespace)
+
+    def __len__(self) -> int:
+        if not self.enabled:
+            return 0
+        rows = self._execute(
+            "SELECT count(*) FROM entries WHERE namespace = ?", self.namespace
+        )
+        return rows[0][0] if rows else 0
+
+
+class TieredCache(CacheBackend):
+    """Look in each tier in turn, copying hits into the tiers before it."""
+
+    def __init__(self, name: str, *tiers: CacheBackend):
+        self.name = name
+        self.tiers = tiers
+        # Lookups answered by each tier, and misses
+        self.stats = {tier.name: 0 for tier in tiers}
+        self.stats["miss"] = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                self.stats[tier.name] += 1
+                for faster in self.tiers[:index]:
+                    faster.set(key, value)
+                return value
+        self.stats["miss"] += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def delete(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def __len__(self) -> int:
+        return len(self.tiers[0])
+
+
+def tiered_cache(name: str, memory_size: int, shared_size: int) -> TieredCache:
+    """A registered cache: an in-process LRU in front of the shared file."""
+    cache = TieredCache(name, MemoryCache(memory_size), SQLiteCache(name, shared_size))
+    caches[name] = cache
+    return cache
+
+
+def clear_all() -> None:
+    """Empty every registered cache, in memory and in the shared file."""
+    for cache in caches.values():
+        cache.clear()
+
+
+CollectedCounter(
+    "chinochau_tiered_cache_lookups_total",
+    "Cache lookups by the tier that answered: memory, shared or miss.",
+    ["cache", "tier"],
+    lambda: {
+        (name, tier): count
+        for name, cache in caches.items()
+        for tier, count in cache.stats.items()
+    },
+)
+Gauge(
+    "chinochau_tiered_cache_entries",
+    "Entries held by each cache tier.",
+    ["cache", "tier"],
+    lambda: {
+        (name, tier.name): len(tier)
+        for name, cache in caches.items()
+        for tier in cache.tiers
+    },
+)
+CollectedCounter(
+    "chinochau_shared_cache_errors_total",
+    "Shared cache operations that failed and were treated as misses.",
+    ["cache"],
+    lambda: {
+        (name,): tier.errors
+        for name, cache in caches.items()
+        for tier in cache.tiers
+        if isinstance(tier, SQLiteCache)
+    },
+)
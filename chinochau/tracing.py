@@ -0,0 +1,296 @@
+"""In-process request tracing: spans for the parts of a single request.
+
+A trace is started for each request and every span opened while it runs
+(handler, service methods, SQL statements, upstream calls, bcrypt) is
+recorded with its parent, start and duration. Spans opened in threadpool
+threads attach to the span that was current when the work was handed off,
+since the thread inherits the request's context. Outside a trace, a traced
+function costs one context variable lookup.
+
+Sampling is decided when the request starts, at CHINOCHAU_TRACE_SAMPLE_RATE:
+only sampled requests record their spans. The others keep just the root
+span, a timer, and no trace is current while they run, so their spans cost
+the same single lookup as outside a trace. A request slower than
+CHINOCHAU_TRACE_SLOW_MS is kept whatever the rate, with its full span tree
+if it was sampled and its root span (name, duration, status) otherwise.
+Kept traces go to the exporters: the last MAX_TRACES in memory, and a JSON
+lines file when CHINOCHAU_TRACE_FILE is set.
+"""
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+# Share of requests traced whatever their duration
+TRACE_SAMPLE_RATE = float(os.getenv("CHINOCHAU_TRACE_SAMPLE_RATE", "0.01"))
+# Requests slower than this are always traced; 0 keeps only sampled ones
+TRACE_SLOW_MS = float(os.getenv("CHINOCHAU_TRACE_SLOW_MS", "500"))
+# JSON lines file kept traces are appended to; unset keeps them in memory only
+TRACE_FILE = os.getenv("CHINOCHAU_TRACE_FILE", "")
+# Traces kept in memory, most recent last
+MAX_TRACES = 100
+# Spans recorded per trace; a request running thousands of queries keeps the
+# first ones and counts the rest
+MAX_SPANS = 1000
+
+
+@dataclass
+class Span:
+    id: int
+    parent_id: Optional[int]
+    name: str
+    # request, handler, service, sql or dependency
+    kind: str
+    start: float
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.end = time.perf_counter()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+
+class Trace:
+    """The spans of one request, the first of them the request itself."""
+
+    def __init__(self, name: str, sampled: bool):
+        self.id = uuid.uuid4().hex
+        self.sampled = sampled
+        self.started_at = datetime.now(timezone.utc)
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        self.root = self.start_span(name, "request", None)
+
+    def start_span(
+        self, name: str, kind: str, parent: Optional[Span], **attributes
+    ) -> Optional[Span]:
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return None
+        span = Span(
+            id=next(self._ids),
+            parent_id=parent.id if parent is not None else None,
+            name=name,
+            kind=kind,
+            start=time.perf_counter(),
+            attributes=attributes,
+        )
+        # Spans are added from threadpool threads too; append is atomic
+        self.spans.append(span)
+        return span
+
+    @property
+    def duration(self) -> float:
+        return (self.root.end or time.perf_counter()) - self.root.start
+
+    def keep(self) -> bool:
+        """Whether the finished trace should be exported."""
+        slow = TRACE_SLOW_MS > 0 and self.duration * 1000 >= TRACE_SLOW_MS
+        return self.sampled or slow
+
+    def critical_path(self) -> List[int]:
+        """Span ids from the root down, following the child that ended last.
+
+        The child a span finished after is the one it was waiting for, so
+        its time can't be hidden behind other work.
+        """
+        children: Dict[int, List[Span]] = {}
+        for span in self.spans:
+            if span.parent_id is not None and span.end is not None:
+                children.setdefault(span.parent_id, []).append(span)
+        path = [self.root.id]
+        while path[-1] in children:
+            path.append(max(children[path[-1]], key=lambda span: span.end).id)
+        return path
+
+    def report(self) -> dict:
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 3)
+
+        return {
+            "id": self.id,
+            "name": self.root.name,
+            "started_at": self.started_at,
+            "duration_ms": ms(self.duration),
+            "sampled": self.sampled,
+            "dropped_spans": self.dropped,
+            "critical_path": self.critical_path(),
+            "spans": [
+                {
+                    "id": span.id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "kind": span.kind,
+                    "start_ms": ms(span.start - self.root.start),
+                    "duration_ms": ms(
+                        (span.end if span.end is not None else self.root.end)
+                        - span.start
+                    ),
+                    "attributes": span.attributes,
+                    "error": span.error,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+class MemoryExporter:
+    """Keeps the last `size` traces for GET /admin/traces."""
+
+    def __init__(self, size: int = MAX_TRACES):
+        self.traces: Deque[dict] = deque(maxlen=size)
+
+    def export(self, report: dict) -> None:
+        self.traces.append(report)
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        for report in self.traces:
+            if report["id"] == trace_id:
+                return report
+        return None
+
+
+class FileExporter:
+    """Appends traces to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, report: dict) -> None:
+        line = json.dumps(report, default=str, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+
+memory_exporter = MemoryExporter()
+exporters: List = [memory_exporter]
+if TRACE_FILE:
+    exporters.append(FileExporter(TRACE_FILE))
+
+# Called in the thread opening each span of a sampled trace, e.g. for the
+# profiler to find the threads a request runs on
+span_listeners: List[Callable[[], None]] = []
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+# Set to sample every trace started in the context, e.g. by the profiler
+force_sampling: ContextVar[bool] = ContextVar("force_sampling", default=False)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def enabled() -> bool:
+    return TRACE_SAMPLE_RATE > 0 or TRACE_SLOW_MS > 0
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Optional[Trace]]:
+    """Trace the block as a request, exporting it if it is kept.
+
+    Spans opened within the block are only recorded if it is sampled.
+    """
+    if not enabled():
+        yield None
+        return
+    sampled = force_sampling.get() or random.random() < TRACE_SAMPLE_RATE
+    current = Trace(name, sampled=sampled)
+    if sampled:
+        trace_token = _current_trace.set(current)
+        span_token = _current_span.set(current.root)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        current.root.finish(error)
+        if sampled:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+        if current.keep():
+            report = current.report()
+            for exporter in exporters:
+                try:
+                    exporter.export(report)
+                except Exception as e:
+                    print(f"⚠️ Exporting trace {current.id} failed: {e}")
+
+
+def start_span(name: str, kind: str, **attributes) -> Optional[Span]:
+    """A child of the current span that doesn't become current itself.
+
+    For work timed by callbacks rather than a block, such as SQL statements;
+    the caller finishes it. None outside a trace.
+    """
+    current = _current_trace.get()
+    if current is None:
+        return None
+    for listener in span_listeners:
+        listener()
+    return current.start_span(name, kind, _current_span.get(), **attributes)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+    """Record the block as a span, current for any spans opened within it."""
+    current = start_span(name, kind, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish(error)
+
+
+def traced(name: Optional[str] = None, kind: str = "service"):
+    """Decorator form of `span` for sync and async functions.
+
+    Spans are named after the function's qualified name by default, e.g.
+    "FlashcardService.get_user_flashcards".
+    """
+
+    def decorator(function):
+        span_name = name or function.__qualname__
+        if iscoroutinefunction(function):
+
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if _current_trace.get() is None:
+                    return await function(*args, **kwargs)
+                with span(span_name, kind):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            # Background jobs and scripts call services outside any request
+            if _current_trace.get() is None:
+                return function(*args, **kwargs)
+            with span(span_name, kind):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
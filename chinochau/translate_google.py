@@ -1,7 +1,62 @@
-from typing import List
+"""Google Translate, the last resort for definitions.
 
+Calls are bounded by a total timeout and guarded by a circuit breaker, so
+when Google is slow or blocking us requests fail fast instead of piling
+up. Translations are cached in memory and in the cache shared by the
+workers; once older than the TTL they are still served at once while a
+fresh copy is fetched in the background. The shared tier is a SQLite file
+that can wait on another worker's lock, so the cache is used from a thread
+rather than the event loop, as is the dictionary when a cold worker still
+has to build it.
+"""
+import asyncio
+import math
+import os
+import time
+from typing import List, Optional, Set
+
+import httpx
 from googletrans import Translator
-from pinyin.cedict import translate_word
+
+from chinochau import metrics, tracing
+from chinochau.circuit_breaker import CircuitBreaker, CircuitOpen
+from chinochau.dictionary import get_dictionary, loaded_dictionary
+from chinochau.script import normalize_key
+from chinochau.shared_cache import tiered_cache
+
+# Base URL of a stand-in for translate.googleapis.com, such as the one in
+# benchmarks/fake_upstreams.py; unset to use Google
+GOOGLE_TRANSLATE_URL = os.getenv("CHINOCHAU_GOOGLE_TRANSLATE_URL")
+# Seconds for a whole translation call
+GOOGLE_TRANSLATE_TIMEOUT = float(os.getenv("CHINOCHAU_GOOGLE_TRANSLATE_TIMEOUT", "5"))
+# Consecutive failures that open the circuit, and seconds until it is probed
+GOOGLE_BREAKER_FAILURES = int(os.getenv("CHINOCHAU_GOOGLE_BREAKER_FAILURES", "5"))
+GOOGLE_BREAKER_RESET = float(os.getenv("CHINOCHAU_GOOGLE_BREAKER_RESET", "30"))
+# Age in seconds after which a cached translation is refreshed
+TRANSLATION_TTL = float(os.getenv("CHINOCHAU_TRANSLATION_TTL", str(7 * 24 * 3600)))
+TRANSLATION_CACHE_SIZE = 10000
+SHARED_TRANSLATION_CACHE_SIZE = 200000
+
+breaker = CircuitBreaker(
+    "google_translate", GOOGLE_BREAKER_FAILURES, GOOGLE_BREAKER_RESET
+)
+
+# normalize_key(word) -> [translation, time fetched]
+_cache = tiered_cache(
+    "translations", TRANSLATION_CACHE_SIZE, SHARED_TRANSLATION_CACHE_SIZE
+)
+_refreshing: Set[str] = set()
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class TranslationUnavailable(Exception):
+    """Google Translate failed or is not being called; retry later."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        # Whole seconds, for a Retry-After header
+        self.retry_after = max(1, math.ceil(retry_after))
+
 
 example_input = "数不清的"
 # Uncountable
@@ -9,15 +64,107 @@ example_input = "数不清的"
 # (I have spent countless time)
 
 
+class _RedirectTransport(httpx.AsyncBaseTransport):
+    """Send requests to another base URL, keeping their path and query."""
+
+    def __init__(self, base_url: str):
+        self.base_url = httpx.URL(base_url)
+        self._transport = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(
+            scheme=self.base_url.scheme,
+            host=self.base_url.host,
+            port=self.base_url.port,
+        )
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _translator() -> Translator:
+    timeout = httpx.Timeout(GOOGLE_TRANSLATE_TIMEOUT)
+    # Errors are raised instead of returning the input as its translation
+    translator = Translator(timeout=timeout, raise_exception=True)
+    if GOOGLE_TRANSLATE_URL:
+        # googletrans always builds https://translate.googleapis.com URLs
+        translator.client = httpx.AsyncClient(
+            headers=translator.client.headers,
+            timeout=timeout,
+            transport=_RedirectTransport(GOOGLE_TRANSLATE_URL),
+        )
+    return translator
+
+
+def _store(word: str, translation: List[str]) -> None:
+    _cache.set(normalize_key(word), [translation, time.time()])
+
+
+def _cached(word: str) -> Optional[list]:
+    return _cache.get(normalize_key(word))
+
+
+def clear_cache() -> None:
+    """Drop cached translations."""
+    _cache.clear()
+
+
+async def _fetch(word: str) -> List[str]:
+    """Ask Google, through the circuit breaker and within the timeout."""
+    try:
+        with breaker.call():
+            async with _translator() as translator, asyncio.timeout(
+                GOOGLE_TRANSLATE_TIMEOUT
+            ):
+                with metrics.track("google_translate"):
+                    translation = await translator.translate(
+                        text=word, src="zh-CN", dest="en"
+                    )
+    except CircuitOpen as error:
+        raise TranslationUnavailable(str(error), error.retry_after) from error
+    except Exception as error:
+        raise TranslationUnavailable(
+            f"Google Translate failed: {error!r}", breaker.retry_after()
+        ) from error
+    await asyncio.to_thread(_store, word, [translation.text])
+    return [translation.text]
+
+
+async def _refresh(word: str) -> None:
+    try:
+        await _fetch(word)
+    except TranslationUnavailable:
+        # Keep serving the stale copy
+        pass
+    finally:
+        _refreshing.discard(word)
+
+
+def _refresh_in_background(word: str) -> None:
+    if word in _refreshing:
+        return
+    _refreshing.add(word)
+    task = asyncio.get_running_loop().create_task(_refresh(word))
+    # The loop only keeps weak references to tasks
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@tracing.traced()
 async def translate_google(word: str) -> List[str]:
-    async with Translator() as translator:
-        definition = translate_word(word)
-        if definition is None:
-            print("Definition is none, querying Translation service")
-            translation = await translator.translate(text=word, src="zh-CN", dest="en")
-            return [translation.text]
-        else:
-            return definition
+    dictionary = loaded_dictionary() or await asyncio.to_thread(get_dictionary)
+    definition = dictionary.lookup(word)
+    if definition is not None:
+        return definition
+    cached = await asyncio.to_thread(_cached, word)
+    if cached is not None:
+        translation, fetched_at = cached
+        if time.time() - fetched_at > TRANSLATION_TTL:
+            _refresh_in_background(word)
+        return translation
+    print("Definition is none, querying Translation service")
+    return await _fetch(word)
 
 
 if __name__ == "__main__":
@@ -26,6 +26,20 @@ export async function createOrGetFlashcard(chinese: string): Promise<Flashcard>
   return response.data;
 }
 
+export interface Suggestion {
+  simplified: string;
+  traditional: string;
+  pinyin: string;
+  definitions: string[];
+}
+
+export async function suggestWords(prefix: string, limit = 8): Promise<Suggestion[]> {
+  const response = await axios.get(`${API_BASE_URL}/suggest`, {
+    params: { prefix, limit },
+  });
+  return response.data.suggestions;
+}
+
 export async function getExamples(chinese: string, number_of_examples = 2): Promise<string> {
   const response = await axios.get(`${API_BASE_URL}/examples/${encodeURIComponent(chinese)}`, {
     params: { number_of_examples },
@@ -1,5 +1,13 @@
-import React, { useState } from 'react';
-import { createOrGetFlashcard, type Flashcard } from '../api/flashcards';
+import React, { useEffect, useState } from 'react';
+import {
+  createOrGetFlashcard,
+  suggestWords,
+  type Flashcard,
+  type Suggestion,
+} from '../api/flashcards';
+
+// Wait for a pause in typing before asking for suggestions
+const SUGGEST_DELAY_MS = 150;
 
 interface AddFlashcardProps {
   onAdd: (card: Flashcard) => void;
@@ -9,6 +17,28 @@ const AddFlashcard: React.FC<AddFlashcardProps> = ({ onAdd }) => {
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+
+  useEffect(() => {
+    const prefix = input.trim();
+    if (!prefix) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const results = await suggestWords(prefix);
+        if (!cancelled) setSuggestions(results);
+      } catch {
+        if (!cancelled) setSuggestions([]);
+      }
+    }, SUGGEST_DELAY_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [input]);
 
   const handleAdd = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -32,10 +62,18 @@ const AddFlashcard: React.FC<AddFlashcardProps> = ({ onAdd }) => {
         type="text"
         value={input}
         onChange={e => setInput(e.target.value)}
-        placeholder="Add new Chinese word"
+        placeholder="Add new Chinese word or pinyin"
         disabled={loading}
+        list="flashcard-suggestions"
         style={{ flex: 1, padding: 8, borderRadius: 4, border: '1px solid #ccc' }}
       />
+      <datalist id="flashcard-suggestions">
+        {suggestions.map(s => (
+          <option key={`${s.simplified}-${s.pinyin}`} value={s.simplified}>
+            {`${s.pinyin} — ${s.definitions.slice(0, 2).join('; ')}`}
+          </option>
+        ))}
+      </datalist>
       <button type="submit" disabled={loading || !input.trim()} style={{ padding: '8px 16px' }}>
         {loading ? 'Adding...' : 'Add'}
       </button>